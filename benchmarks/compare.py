@@ -0,0 +1,159 @@
+'''
+Performance regression gate for `slounik`: compares benchmark results (see `run.py`) against the committed baseline.
+
+Checked metrics:
+- SQL statements per 1k items of every operation (deterministic for the same fixture, so any increase is an N+1 regression);
+- throughput (items per second) of the selected operations, `tokenize` and `annotateText` by default;
+- peak RSS of the benchmark process.
+
+Only SQL statement counts are gated by default: throughput and peak RSS depend on the machine and its load, so they are reported for information
+unless a tolerance is given with `--tolerance` or `--rss-tolerance`. A gated metric fails if it is worse than the baseline by more than its tolerance
+(a share of the baseline value). The script prints a table of deltas and exits with status 1 if any gated metric fails.
+
+Usage:
+    python benchmarks/compare.py                                   # run the benchmarks with baseline fixture parameters and compare
+    python benchmarks/compare.py --current results.json            # compare existing results
+    python benchmarks/compare.py --tolerance 0.25                  # gate throughput too (same machine as the baseline only)
+    python benchmarks/compare.py --update                          # run the benchmarks and overwrite the baseline
+'''
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+benchmarkDirectory = os.path.dirname(os.path.abspath(__file__))
+defaultBaseline = os.path.join(benchmarkDirectory, 'baseline.json')
+
+# metric name: (label, True if higher is better)
+metrics = {'ItemsPerSecond': ('items/s', True),
+           'QueriesPer1kItems': ('SQL/1k items', False),
+           'PeakRSS': ('peak RSS, MiB', False)}
+
+
+def _delta(baseline, current):
+    '''
+    Relative change of a metric value.
+    '''
+    if not baseline: return 0.0 if not current else float('inf')
+    return (current - baseline) / baseline
+
+
+def compareResults(baseline, current, throughputOperations = ('tokenize', 'annotateText'), tolerance = None, sqlTolerance = 0.0, rssTolerance = None):
+    '''
+    Compare benchmark results against the baseline.
+
+    [ARGUMENTS]:
+    - `baseline` (dict) : Baseline results loaded from JSON.
+    - `current` (dict) : Current results loaded from JSON.
+    - `throughputOperations` (tuple) OPTIONAL : Operations, which throughput is checked.
+    - `tolerance` (float, NoneType) OPTIONAL : Allowed throughput decrease as a share of the baseline value, `None` to report throughput without checking it.
+    - `sqlTolerance` (float) OPTIONAL : Allowed increase of SQL statements per 1k items as a share of the baseline value.
+    - `rssTolerance` (float, NoneType) OPTIONAL : Allowed peak RSS increase as a share of the baseline value, `None` to report peak RSS without checking it.
+
+    [RETURNS]:
+    - `rows` (list) : Table rows as dicts with `Operation`, `Metric`, `Baseline`, `Current`, `Delta` and `Status` keys.
+    '''
+    rows = []
+
+    def check(operation, metric, baselineValue, currentValue, allowed):
+        if baselineValue is None or currentValue is None:
+            rows.append({'Operation': operation, 'Metric': metric, 'Baseline': baselineValue, 'Current': currentValue, 'Delta': None, 'Status': 'SKIP'})
+            return
+        delta = _delta(baselineValue, currentValue)
+        regression = -delta if metrics[metric][1] else delta
+        if allowed is None: status = 'INFO'
+        else: status = 'FAIL' if regression > allowed else 'OK'
+        rows.append({'Operation': operation, 'Metric': metric, 'Baseline': baselineValue, 'Current': currentValue, 'Delta': delta, 'Status': status})
+
+    for operation, baselineResult in baseline['Results'].items():
+        currentResult = current['Results'].get(operation)
+        if currentResult is None:
+            rows.append({'Operation': operation, 'Metric': 'ItemsPerSecond', 'Baseline': baselineResult['ItemsPerSecond'], 'Current': None, 'Delta': None, 'Status': 'MISSING'})
+            continue
+        if operation in throughputOperations:
+            check(operation, 'ItemsPerSecond', baselineResult['ItemsPerSecond'], currentResult['ItemsPerSecond'], tolerance)
+        check(operation, 'QueriesPer1kItems', baselineResult['QueriesPer1kItems'], currentResult['QueriesPer1kItems'], sqlTolerance)
+
+    check('(process)', 'PeakRSS', baseline['Meta'].get('PeakRSS'), current['Meta'].get('PeakRSS'), rssTolerance)
+
+    return rows
+
+
+def printTable(rows, file = sys.stdout):
+    '''
+    Print comparison rows as a text table.
+    '''
+    def value(row, key):
+        number = row[key]
+        if number is None: return '-'
+        if row['Metric'] == 'PeakRSS': number = number / 1048576
+        return f'{number:.1f}'
+
+    print(f'{"operation":<20} {"metric":<14} {"baseline":>12} {"current":>12} {"delta":>8}  status', file = file)
+    for row in rows:
+        delta = f'{row["Delta"]:+.1%}' if row['Delta'] is not None else '-'
+        print(f'{row["Operation"]:<20} {metrics[row["Metric"]][0]:<14} {value(row, "Baseline"):>12} {value(row, "Current"):>12} {delta:>8}  {row["Status"]}', file = file)
+
+
+def runCurrent(baseline, output):
+    '''
+    Run `run.py` with the fixture parameters of the baseline, so that SQL statement counts are comparable.
+    '''
+    meta = baseline['Meta']
+    command = [sys.executable, os.path.join(benchmarkDirectory, 'run.py'),
+               '--lemmas', str(meta['Lemmas']), '--paragraphs', str(meta['Paragraphs']), '--seed', str(meta['Seed']),
+               '--operations', ','.join(baseline['Results']), '--output', output]
+    if meta.get('ConlluTable'): command.append('--conllu-table')
+    if meta.get('FormFilter'): command.append('--form-filter')
+    if meta.get('SharedLexicon'): command.append('--shared-lexicon')
+    subprocess.run(command, check = True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Compare `slounik` benchmark results against the baseline and fail on regressions.')
+    parser.add_argument('--baseline', default = defaultBaseline, help = 'baseline JSON file path')
+    parser.add_argument('--current', default = '', help = 'current results JSON file path; if not specified, the benchmarks are run with the baseline fixture parameters')
+    parser.add_argument('--throughput', default = 'tokenize,annotateText', help = 'comma-separated operations, which throughput is checked')
+    parser.add_argument('--tolerance', type = float, default = None, help = 'allowed throughput decrease, share of the baseline (default: throughput is not gated)')
+    parser.add_argument('--sql-tolerance', type = float, default = 0.0, help = 'allowed increase of SQL statements per 1k items, share of the baseline')
+    parser.add_argument('--rss-tolerance', type = float, default = None, help = 'allowed peak RSS increase, share of the baseline (default: peak RSS is not gated)')
+    parser.add_argument('--update', action = 'store_true', help = 'overwrite the baseline with the current results instead of comparing')
+    arguments = parser.parse_args()
+
+    with open(arguments.baseline, encoding = 'utf-8') as file: baseline = json.load(file)
+
+    with tempfile.TemporaryDirectory() as directory:
+        currentPath = arguments.current
+        if not currentPath:
+            currentPath = os.path.join(directory, 'current.json')
+            runCurrent(baseline, currentPath)
+
+        if arguments.update:
+            shutil.copyfile(currentPath, arguments.baseline)
+            print(f'Baseline updated: {arguments.baseline}')
+            return
+
+        with open(currentPath, encoding = 'utf-8') as file: current = json.load(file)
+
+    # SQL statement counts are only comparable on the same fixture
+    fixtureKeys = ('Lemmas', 'Paragraphs', 'Seed', 'ConlluTable', 'FormFilter', 'SharedLexicon')
+    mismatch = [key for key in fixtureKeys if baseline['Meta'].get(key) != current['Meta'].get(key)]
+    if mismatch:
+        print(f'Fixture parameters differ from the baseline: {", ".join(mismatch)}', file = sys.stderr)
+        sys.exit(2)
+
+    rows = compareResults(baseline, current, tuple(name for name in arguments.throughput.split(',') if name),
+                          arguments.tolerance, arguments.sql_tolerance, arguments.rss_tolerance)
+    printTable(rows)
+
+    failed = [row for row in rows if row['Status'] in ('FAIL', 'MISSING')]
+    if failed:
+        print(f'\n{len(failed)} metric(s) regressed past tolerance.', file = sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
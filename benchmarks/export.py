@@ -0,0 +1,95 @@
+'''
+Export benchmark for `slounik.exportCSV()` on a synthetic fixture dictionary (see `fixture.py`).
+
+Streams a large number of `formSearch()` results (the fixture's results are repeated from a generator) into a CSV file with every compression format
+and reports rows per second, the file size and the growth of peak RSS during the export as JSON. Since rows are written incrementally,
+the peak RSS shouldn't grow with the number of rows (the xz encoder itself allocates about 100 MB once per file at the default preset).
+
+Usage:
+    python benchmarks/export.py --rows 1000000 --compression none,gzip,xz
+'''
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+try: import resource
+except ImportError: resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import slounik
+import fixture
+
+
+def peakRSS():
+    '''
+    Get peak resident set size of the current process in bytes, or `None` if `resource` module is not available on the platform.
+    '''
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Measure streaming `slounik.exportCSV()` throughput and memory use and write the results as JSON.')
+    parser.add_argument('--rows', type = int, default = 1000000, help = 'the number of exported rows (default: 1000000)')
+    parser.add_argument('--compression', default = 'none,gzip,xz', help = 'comma-separated compression formats (default: none,gzip,xz)')
+    parser.add_argument('--flush-size', type = int, default = 10000, help = 'rows written at a time (default: 10000)')
+    parser.add_argument('--lemmas', type = int, default = 5000, help = 'the number of lemmas in the fixture dictionary')
+    parser.add_argument('--seed', type = int, default = 0, help = 'random seed of the fixtures')
+    parser.add_argument('--output', default = '', help = 'JSON output file path, standard output by default')
+    arguments = parser.parse_args()
+
+    formats = [None if name == 'none' else name for name in arguments.compression.split(',') if name]
+
+    with tempfile.TemporaryDirectory() as directory:
+        databasePath = os.path.join(directory, 'dictionary.db')
+        dictionary = fixture.buildDictionary(databasePath, arguments.lemmas, arguments.seed)
+        slounik.defaults['databaseFile'] = databasePath
+        source = slounik.formSearch('*')
+
+        results = {}
+        for compression in formats:
+            exportDirectory = os.path.join(directory, compression or 'none')
+            os.mkdir(exportDirectory)
+            # the rows are generated lazily, so only the fixture results are held in memory
+            rows = itertools.islice(itertools.cycle(source), arguments.rows)
+
+            peakBefore = peakRSS()
+            start = time.perf_counter()
+            # the confirmation message is kept out of the JSON output
+            with contextlib.redirect_stdout(sys.stderr): message = slounik.exportCSV(rows, 'f', exportDirectory, compression, arguments.flush_size)
+            seconds = time.perf_counter() - start
+            if message: raise RuntimeError(message)
+
+            filePath = os.path.join(exportDirectory, os.listdir(exportDirectory)[0])
+            results[compression or 'none'] = {'Seconds': seconds,
+                                              'RowsPerSecond': arguments.rows / seconds,
+                                              'FileBytes': os.path.getsize(filePath),
+                                              'PeakRSSGrowthBytes': peakRSS() - peakBefore if peakBefore is not None else None}
+            os.remove(filePath)
+            print(f'{compression or "none":<6} {results[compression or "none"]["RowsPerSecond"]:>12.1f} rows/s {results[compression or "none"]["FileBytes"]:>14} bytes', file = sys.stderr)
+
+    output = {'Meta': {'Date': datetime.now().isoformat(timespec = 'seconds'),
+                       'Python': platform.python_version(),
+                       'Platform': platform.platform(),
+                       'Lemmas': dictionary['Lemmas'],
+                       'SourceResults': len(source),
+                       'Rows': arguments.rows,
+                       'FlushSize': arguments.flush_size,
+                       'Seed': arguments.seed},
+              'Results': results}
+
+    if arguments.output:
+        with open(arguments.output, 'w', encoding = 'utf-8') as file: json.dump(output, file, indent = 2)
+    else: print(json.dumps(output, indent = 2))
+
+
+if __name__ == '__main__':
+    main()
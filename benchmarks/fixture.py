@@ -0,0 +1,179 @@
+'''
+Synthetic fixtures for `slounik` benchmarks: a dictionary database with the schema of `assets/dictionary.db` and plain-text corpora in Belarusian.
+The shipped database is a Git LFS pointer in source checkouts, so the benchmarks generate their own data. The fixtures are deterministic for a given seed.
+'''
+import itertools
+import os
+import random
+import sqlite3
+
+# TABLE SCHEMA
+# the same column order as in `assets/dictionary.db`, including `Lowercase` & `Len` search columns
+schema = {
+    'Lemma': ('ID INTEGER PRIMARY KEY', 'Lemma TEXT', 'POS TEXT', 'Type TEXT', 'InflClass TEXT', 'Degree TEXT', 'Person INTEGER', 'Gender TEXT', 'Voice TEXT', 'Tense TEXT', 'Aspect TEXT', 'Animacy INTEGER', 'Abbr INTEGER', 'NumForm TEXT', 'VerbForm TEXT', 'Personal INTEGER', 'Origin TEXT', 'Poss INTEGER', 'Reflex INTEGER', 'SubCat TEXT', 'Lowercase TEXT', 'Len INTEGER'),
+    'Variant': ('ID INTEGER PRIMARY KEY', 'LemID INTEGER', 'Variant INTEGER'),
+    'Form': ('ID INTEGER PRIMARY KEY', 'LemID INTEGER', 'VarID INTEGER', 'Form TEXT', 'Accent TEXT', 'Gender TEXT', 'Person INTEGER', 'Cas TEXT', 'Number TEXT', 'Degree TEXT', 'Tense TEXT', 'Mood TEXT', 'VerbForm TEXT', 'Animacy INTEGER', 'Short INTEGER', 'Lowercase TEXT', 'Len INTEGER')
+    }
+
+indexes = ('CREATE INDEX FormLowercase ON Form (Lowercase)',
+           'CREATE INDEX FormForm ON Form (Form)',
+           'CREATE INDEX FormLemID ON Form (LemID)',
+           'CREATE INDEX LemmaLowercase ON Lemma (Lowercase)',
+           'CREATE INDEX LemmaLemma ON Lemma (Lemma)')
+
+# WORD MATERIAL
+syllables = ('ба', 'ва', 'га', 'да', 'жа', 'за', 'ка', 'ла', 'ма', 'на', 'па', 'ра', 'са', 'та', 'ха', 'ца', 'ча', 'ша', 
+             'бе', 'ве', 'ле', 'ме', 'не', 'ре', 'се', 'це', 'бі', 'ві', 'лі', 'мі', 'ні', 'рі', 'сі', 'ці', 
+             'бо', 'во', 'ло', 'мо', 'но', 'ро', 'со', 'то', 'бу', 'ву', 'лу', 'му', 'ну', 'ру', 'су', 'ту', 
+             'бы', 'вы', 'лы', 'мы', 'ны', 'ры', 'сы', 'ты', 'ля', 'ня', 'ся', 'дзе', 'дзя', 'аў', 'еў', 'ёр', 'юк')
+cases = ('Nom', 'Gen', 'Dat', 'Acc', 'Ins', 'Loc')
+endings = {
+    'NOUN': {'Masc': (('', 'а', 'у', '', 'ам', 'е'), ('ы', 'аў', 'ам', 'ы', 'амі', 'ах')),
+             'Fem': (('а', 'ы', 'е', 'у', 'ай', 'е'), ('ы', '', 'ам', 'ы', 'амі', 'ах')),
+             'Neut': (('о', 'а', 'у', 'о', 'ам', 'е'), ('ы', 'аў', 'ам', 'ы', 'амі', 'ах'))},
+    'ADJ': {'Masc': ('ы', 'ага', 'аму', 'ы', 'ым', 'ым'), 'Fem': ('ая', 'ай', 'ай', 'ую', 'ай', 'ай'), 'Neut': ('ае', 'ага', 'аму', 'ае', 'ым', 'ым'), 'Plur': ('ыя', 'ых', 'ым', 'ыя', 'ымі', 'ых')},
+    'VERB': (('ць', {'VerbForm': 'Inf'}), ('ю', {'Person': 1, 'Number': 'Sing', 'Tense': 'Pres'}), ('еш', {'Person': 2, 'Number': 'Sing', 'Tense': 'Pres'}), ('е', {'Person': 3, 'Number': 'Sing', 'Tense': 'Pres'}),
+             ('ем', {'Person': 1, 'Number': 'Plur', 'Tense': 'Pres'}), ('еце', {'Person': 2, 'Number': 'Plur', 'Tense': 'Pres'}), ('юць', {'Person': 3, 'Number': 'Plur', 'Tense': 'Pres'}),
+             ('ў', {'Gender': 'Masc', 'Number': 'Sing', 'Tense': 'Past'}), ('ла', {'Gender': 'Fem', 'Number': 'Sing', 'Tense': 'Past'}), ('лі', {'Number': 'Plur', 'Tense': 'Past'}))
+    }
+# part of speech distribution of generated lemmas
+partsOfSpeech = (('NOUN', 45), ('ADJ', 20), ('VERB', 20), ('PROPN', 5), ('ADV', 6), ('PRON', 1), ('ADP', 1), ('CCONJ', 1), ('PART', 1))
+# frequent invariable words added to every dictionary
+functionWords = (('і', 'CCONJ'), ('а', 'CCONJ'), ('але', 'CCONJ'), ('у', 'ADP'), ('на', 'ADP'), ('з', 'ADP'), ('да', 'ADP'), ('па', 'ADP'), ('не', 'PART'), ('ці', 'PART'), ('што', 'PRON'), ('гэта', 'PART'))
+# tokens that are not in the dictionary
+foreignWords = ('Google', 'Telegram', 'iPhone', 'YouTube', 'OK', 'Minsk', 'Wi-Fi', 'Instagram')
+punctuation = ((',', 10), ('.', 6), ('!', 1), ('?', 1), ('…', 1), (':', 1), (' -', 1), ('))', 1))
+
+
+def _stem(rng):
+    return ''.join(rng.choice(syllables) for i in range(rng.randint(1, 3)))
+
+
+def _formRows(lemID, varID, lemma, stem, pos, gender, rng):
+    '''
+    Generate Form table rows of a lemma's paradigm as dictionaries of column values.
+    '''
+    rows = []
+    accent = str(rng.randint(1, max(1, len(stem))))
+    if pos in ('NOUN', 'PROPN'):
+        for number, numberEndings in zip(('Sing', 'Plur'), endings['NOUN'][gender]):
+            for case, ending in zip(cases, numberEndings):
+                rows.append({'Form': stem + ending, 'Cas': case, 'Number': number})
+    elif pos == 'ADJ':
+        for key in ('Masc', 'Fem', 'Neut', 'Plur'):
+            for case, ending in zip(cases, endings['ADJ'][key]):
+                rows.append({'Form': stem + ending, 'Cas': case, 'Number': 'Plur' if key == 'Plur' else 'Sing', 'Gender': None if key == 'Plur' else key})
+        rows.append({'Form': stem + 'ы', 'Short': 1, 'Number': 'Sing', 'Gender': 'Masc'})
+    elif pos == 'VERB':
+        for ending, features in endings['VERB']:
+            rows.append(dict(features, Form = stem + ending))
+    elif pos == 'ADV':
+        rows.append({'Form': lemma, 'Degree': 'Pos'})
+    else:
+        rows.append({'Form': lemma})
+
+    for row in rows:
+        row.update(LemID = lemID, VarID = varID, Accent = accent)
+        # proper nouns keep the capital letter in all forms
+        if pos == 'PROPN': row['Form'] = row['Form'].capitalize()
+        row['Lowercase'] = row['Form'].lower()
+        row['Len'] = len(row['Form'])
+
+    return rows
+
+
+def buildDictionary(path, lemmas = 20000, seed = 0):
+    '''
+    Generate a synthetic dictionary database with the real `Form`, `Lemma` and `Variant` table schema.
+
+    [ARGUMENTS]:
+    - `path` (str) : OS path to the database file. An existing file is replaced.
+    - `lemmas` (int) OPTIONAL : The number of generated lemmas. Nouns and adjectives have full case paradigms, so there are about 10 forms per lemma.
+    - `seed` (int) OPTIONAL : Random seed.
+
+    [RETURNS]:
+    - `output` (dict) : `Lemmas` and `Forms` counts, and `Vocabulary`, the list of distinct forms used to generate corpora.
+    '''
+    rng = random.Random(seed)
+    if os.path.exists(path): os.remove(path)
+
+    lemmaColumns = [column.split()[0] for column in schema['Lemma']]
+    formColumns = [column.split()[0] for column in schema['Form']]
+    lemmaRows, variantRows, formRows = ([], [], [])
+
+    posChoices = [pos for pos, weight in partsOfSpeech for i in range(weight)]
+    entries = [(word, pos) for word, pos in functionWords]
+    while len(entries) < lemmas:
+        pos = rng.choice(posChoices)
+        stem = _stem(rng)
+        entries.append((stem, pos))
+
+    for lemID, (stem, pos) in enumerate(entries, 1):
+        gender = rng.choice(('Masc', 'Fem', 'Neut'))
+        paradigm = _formRows(lemID, lemID, stem, stem, pos, gender, rng)
+        lemma = paradigm[0]['Form']
+        lemmaRow = dict.fromkeys(lemmaColumns)
+        lemmaRow.update(ID = lemID, Lemma = lemma, POS = pos, Lowercase = lemma.lower(), Len = len(lemma))
+        if pos in ('NOUN', 'PROPN'): lemmaRow.update(Gender = gender, InflClass = rng.choice(('1d', '2d', '3d')), Animacy = rng.randint(0, 1))
+        elif pos == 'ADJ': lemmaRow.update(Type = rng.choice(('Qual', 'Rel', 'Poss')), Degree = 'Pos')
+        elif pos == 'VERB': lemmaRow.update(Aspect = rng.choice(('Imp', 'Perf')), SubCat = rng.choice(('Tran', 'Intr')), Reflex = rng.choice((0, 0, 0, 1)))
+        elif pos == 'PRON': lemmaRow.update(Type = 'Int')
+        lemmaRows.append(tuple(lemmaRow[column] for column in lemmaColumns))
+        variantRows.append((lemID, lemID, 1))
+        for form in paradigm:
+            formRow = dict.fromkeys(formColumns)
+            formRow.update(form)
+            formRows.append(formRow)
+
+    with sqlite3.connect(path) as connection:
+        for table, columns in schema.items(): connection.execute(f'CREATE TABLE {table} ({", ".join(columns)})')
+        connection.executemany(f'INSERT INTO Lemma VALUES ({", ".join("?" * len(lemmaColumns))})', lemmaRows)
+        connection.executemany('INSERT INTO Variant VALUES (?, ?, ?)', variantRows)
+        connection.executemany(f'INSERT INTO Form VALUES ({", ".join("?" * len(formColumns))})', 
+                               [tuple([formID] + [row[column] for column in formColumns[1:]]) for formID, row in enumerate(formRows, 1)])
+        for statement in indexes: connection.execute(statement)
+    connection.close()
+
+    vocabulary = sorted(set(row['Form'] for row in formRows))
+
+    return {'Lemmas': len(lemmaRows), 'Forms': len(formRows), 'Vocabulary': vocabulary}
+
+
+def buildCorpus(vocabulary, paragraphs = 200, seed = 0, unknownShare = 0.1):
+    '''
+    Generate a synthetic Belarusian plain text corpus from dictionary forms with Zipf-like frequencies, punctuation, numbers and unknown words.
+
+    [ARGUMENTS]:
+    - `vocabulary` (list) : Dictionary forms, as returned by `buildDictionary()`.
+    - `paragraphs` (int) OPTIONAL : The number of paragraphs, separated by `\\n`.
+    - `seed` (int) OPTIONAL : Random seed.
+    - `unknownShare` (float) OPTIONAL : The share of words that are not in the dictionary.
+
+    [RETURNS]:
+    - `text` (str) : Plain text.
+    '''
+    rng = random.Random(seed)
+    # Zipf-like weights: a few forms are very frequent, most are rare
+    ranked = list(vocabulary)
+    rng.shuffle(ranked)
+    ranked = [word for word, pos in functionWords] + ranked
+    cumulativeWeights = list(itertools.accumulate([1 / rank for rank in range(1, len(ranked) + 1)]))
+    punctuationChoices = [mark for mark, weight in punctuation for i in range(weight)]
+
+    text = []
+    for p in range(paragraphs):
+        sentences = []
+        for s in range(rng.randint(1, 6)):
+            words = []
+            for w in range(rng.randint(3, 18)):
+                roll = rng.random()
+                if roll < unknownShare / 2: words.append(rng.choice(foreignWords))
+                elif roll < unknownShare: words.append(_stem(rng) + rng.choice(('шч', 'ск', 'ль')))
+                elif roll < unknownShare + 0.04: words.append(str(rng.randint(1, 2030)))
+                else: words.append(rng.choices(ranked, cum_weights = cumulativeWeights)[0])
+                if rng.random() < 0.08: words[-1] += rng.choice(punctuationChoices[:2])
+            sentence = ' '.join(words)
+            sentences.append(sentence[0].upper() + sentence[1:] + rng.choice(('.', '.', '.', '!', '?', '…')))
+        text.append(' '.join(sentences))
+
+    return '\n'.join(text)
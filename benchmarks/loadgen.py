@@ -0,0 +1,179 @@
+'''
+Load generator for the `slounik` HTTP service (`python -m slounik.serve`).
+
+Starts the service on a synthetic fixture dictionary (see `fixture.py`) on a free local port, unless `--url` of a running service is given,
+sends requests from concurrent keep-alive clients for a fixed time and reports throughput and latency percentiles as JSON.
+
+Usage:
+    python benchmarks/loadgen.py --clients 32 --seconds 10 --endpoint conllu
+    python benchmarks/loadgen.py --url http://127.0.0.1:8080 --endpoint mixed
+'''
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+benchmarkDirectory = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, benchmarkDirectory)
+import fixture
+
+
+def percentile(values, share):
+    '''
+    Nearest-rank percentile of a sorted list.
+    '''
+    if not values: return None
+    return values[min(len(values) - 1, max(0, round(share * len(values)) - 1))]
+
+
+def startServer(databasePath, arguments):
+    '''
+    Start the service on a free port and wait until it listens.
+
+    [RETURNS]:
+    - `output` (tuple) : The service process and its base URL.
+    '''
+    command = [sys.executable, '-m', 'slounik.serve', '--database', databasePath, '--port', '0', '--stats',
+               '--threads', str(arguments.threads), '--batch-window', str(arguments.batch_window), '--cache-size', str(arguments.cache_size)]
+    if arguments.in_memory_db: command.append('--in-memory-db')
+    environment = dict(os.environ, PYTHONPATH = os.pathsep.join([os.path.dirname(benchmarkDirectory), os.environ.get('PYTHONPATH', '')]))
+    process = subprocess.Popen(command, stderr = subprocess.PIPE, text = True, env = environment)
+
+    for line in process.stderr:
+        match = re.search(r'Serving `slounik` on (http://\S+)', line)
+        if match:
+            # keep draining standard error, so that the service never blocks on it
+            threading.Thread(target = lambda: [None for _ in process.stderr], daemon = True).start()
+            return process, match.group(1)
+
+    raise RuntimeError('The service did not start.')
+
+
+def runClients(url, requests, clients, seconds, seed = 0):
+    '''
+    Send requests from concurrent keep-alive clients until the time is up.
+
+    [ARGUMENTS]:
+    - `url` (str) : Base URL of the service.
+    - `requests` (list) : Request templates as `(method, path, body)` tuples, sent in random order.
+    - `clients` (int) : The number of concurrent clients.
+    - `seconds` (float) : Test duration.
+
+    [RETURNS]:
+    - `result` (dict) : Request count, errors, throughput and latency percentiles in milliseconds.
+    '''
+    address = urllib.parse.urlsplit(url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(number):
+        rng = random.Random(seed + number)
+        connection = http.client.HTTPConnection(address.hostname, address.port, timeout = 60)
+        local, localErrors = [], 0
+        while time.perf_counter() < deadline:
+            method, path, body = rng.choice(requests)
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body = body.encode('utf-8') if body else None, headers = {'Content-Type': 'text/plain; charset=utf-8'})
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 500: localErrors += 1
+            except (OSError, http.client.HTTPException):
+                localErrors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(address.hostname, address.port, timeout = 60)
+                continue
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += localErrors
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target = client, args = (number,)) for number in range(clients)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {'Requests': len(latencies),
+            'Errors': errors[0],
+            'Seconds': elapsed,
+            'RequestsPerSecond': len(latencies) / elapsed if elapsed else None,
+            'LatencyMs': {'p50': percentile(latencies, 0.5) * 1000 if latencies else None,
+                          'p90': percentile(latencies, 0.9) * 1000 if latencies else None,
+                          'p99': percentile(latencies, 0.99) * 1000 if latencies else None,
+                          'max': latencies[-1] * 1000 if latencies else None}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Generate load on the `slounik` HTTP service and report latency and throughput as JSON.')
+    parser.add_argument('--url', default = '', help = 'base URL of a running service; if not specified, the service is started on a fixture dictionary')
+    parser.add_argument('--endpoint', choices = ('annotate', 'conllu', 'formSearch', 'lemma', 'mixed'), default = 'conllu', help = 'requests to send (default: conllu)')
+    parser.add_argument('--clients', type = int, default = 32, help = 'the number of concurrent clients, more than the service threads by default (default: 32)')
+    parser.add_argument('--seconds', type = float, default = 10, help = 'test duration (default: 10)')
+    parser.add_argument('--warmup', type = float, default = 0, help = 'seconds of load before measurement, e.g. to fill the token cache')
+    parser.add_argument('--lemmas', type = int, default = 5000, help = 'the number of lemmas in the fixture dictionary')
+    parser.add_argument('--paragraphs', type = int, default = 200, help = 'the number of paragraphs in the fixture corpus, used as request bodies')
+    parser.add_argument('--seed', type = int, default = 0, help = 'random seed of the fixtures and the request order')
+    parser.add_argument('--threads', type = int, default = 8, help = 'database threads of the started service (default: 8)')
+    parser.add_argument('--batch-window', type = float, default = 3, help = 'batching window of the started service in milliseconds')
+    parser.add_argument('--cache-size', type = int, default = 100000, help = 'token cache size of the started service')
+    parser.add_argument('--in-memory-db', action = 'store_true', help = 'start the service with an in-memory database')
+    parser.add_argument('--output', default = '', help = 'JSON output file path, standard output by default')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        databasePath = os.path.join(directory, 'dictionary.db')
+        dictionary = fixture.buildDictionary(databasePath, arguments.lemmas, arguments.seed)
+        paragraphs = [paragraph for paragraph in fixture.buildCorpus(dictionary['Vocabulary'], arguments.paragraphs, arguments.seed).split('\n') if paragraph]
+        rng = random.Random(arguments.seed)
+
+        templates = {'annotate': [('POST', '/annotate?toConllu=true', paragraph) for paragraph in paragraphs],
+                     'conllu': [('POST', '/conllu', paragraph) for paragraph in paragraphs],
+                     'formSearch': [('GET', '/formSearch?' + urllib.parse.urlencode({'query': word}), None) for word in rng.sample(dictionary['Vocabulary'], min(500, len(dictionary['Vocabulary'])))],
+                     'lemma': [('GET', f'/lemma/{lemID}?forms=true', None) for lemID in rng.sample(range(1, dictionary['Lemmas'] + 1), min(500, dictionary['Lemmas']))]}
+        templates['mixed'] = templates['conllu'] + templates['annotate'] + templates['formSearch'] + templates['lemma']
+
+        process = None
+        url = arguments.url
+        if not url: process, url = startServer(databasePath, arguments)
+
+        try:
+            if arguments.warmup: runClients(url, templates[arguments.endpoint], arguments.clients, arguments.warmup, arguments.seed + 1000)
+            result = runClients(url, templates[arguments.endpoint], arguments.clients, arguments.seconds, arguments.seed)
+
+            # service-side counters, e.g. how many requests were merged into a batch
+            address = urllib.parse.urlsplit(url)
+            connection = http.client.HTTPConnection(address.hostname, address.port, timeout = 10)
+            connection.request('GET', '/stats')
+            serverStats = json.loads(connection.getresponse().read())
+            connection.close()
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    output = {'Meta': {'Endpoint': arguments.endpoint, 'Clients': arguments.clients, 'Seconds': arguments.seconds, 'Warmup': arguments.warmup,
+                       'Lemmas': arguments.lemmas, 'Paragraphs': arguments.paragraphs, 'Seed': arguments.seed, 'URL': arguments.url or None},
+              'Results': result,
+              'Server': {'Batching': serverStats.get('Batching'), 'Queries': serverStats.get('Module', {}).get('Queries'), 'Cache': serverStats.get('Module', {}).get('Cache')}}
+
+    print(f'{result["Requests"]} requests, {result["RequestsPerSecond"]:.1f} req/s, p50 {result["LatencyMs"]["p50"] or 0:.1f} ms, p99 {result["LatencyMs"]["p99"] or 0:.1f} ms, {result["Errors"]} errors', file = sys.stderr)
+    if arguments.output:
+        with open(arguments.output, 'w', encoding = 'utf-8') as file: json.dump(output, file, indent = 2)
+    else: print(json.dumps(output, indent = 2))
+
+
+if __name__ == '__main__':
+    main()
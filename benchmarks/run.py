@@ -0,0 +1,201 @@
+'''
+Benchmark suite for `slounik` on a synthetic fixture dictionary and corpus (see `fixture.py`).
+
+Measures throughput of text processing, annotation, CoNLL-U and search functions in items (tokens, calls or lemmas) per second, 
+together with the number of SQL statements per item collected with `slounik.stats()`, and writes the results as JSON.
+
+Usage:
+    python benchmarks/run.py --lemmas 20000 --paragraphs 100 --output benchmarks/results.json
+'''
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+try: import resource
+except ImportError: resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import slounik
+import fixture
+
+
+def peakRSS():
+    '''
+    Get peak resident set size of the current process.
+
+    [RETURNS]:
+    - `peak` (int | None) : Peak RSS in bytes, or `None` if `resource` module is not available on the platform.
+    '''
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _resetModule():
+    '''
+    Reset statistics, so that every operation is measured from the same state.
+    '''
+    slounik.resetStats()
+
+
+def measure(function, items, unit):
+    '''
+    Run a benchmark operation once with statistics enabled.
+
+    [ARGUMENTS]:
+    - `function` (function) : Operation without arguments.
+    - `items` (int) : The number of processed items, used for throughput.
+    - `unit` (str) : Item name, e.g. 'tokens'.
+
+    [RETURNS]:
+    - `result` (dict) : Time, throughput, SQL statement counts and peak RSS of the process after the operation.
+    '''
+    _resetModule()
+    slounik.enableStats()
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    stats = slounik.stats()
+    slounik.enableStats(False)
+
+    return {'Items': items,
+            'Unit': unit,
+            'Seconds': seconds,
+            'ItemsPerSecond': items / seconds if seconds else None,
+            'Queries': stats['Queries'],
+            'QueriesPerSecond': stats['Queries'] / seconds if seconds else None,
+            'QueriesPer1kItems': stats['Queries'] * 1000 / items if items else None,
+            'Rows': stats['Rows'],
+            'PeakRSS': peakRSS()}
+
+
+def runBenchmarks(databasePath, text, vocabulary, lemmaCount, seed = 0, operations = None):
+    '''
+    Measure all benchmark operations on a fixture database and corpus.
+
+    [ARGUMENTS]:
+    - `databasePath` (str) : Fixture database file path.
+    - `text` (str) : Fixture corpus.
+    - `vocabulary` (list) : Dictionary forms, used for search queries.
+    - `lemmaCount` (int) : The number of lemmas in the fixture database.
+    - `seed` (int) OPTIONAL : Random seed for query sampling.
+    - `operations` (list) OPTIONAL : Names of the operations to run, all by default.
+
+    [RETURNS]:
+    - `results` (dict) : Measurement per operation name.
+    '''
+    slounik.defaults['databaseFile'] = databasePath
+    rng = random.Random(seed)
+
+    # shared inputs
+    paragraphs = [paragraph.strip() for paragraph in text.split('\n') if paragraph]
+    tokenized = [slounik.tokenize(paragraph) for paragraph in paragraphs]
+    tokenCount = sum(len([token for token in tokens if token != ' ']) for tokens in tokenized)
+    sentences = [sentence for tokens in tokenized for sentence in slounik.splitSentences(tokens)]
+    tokenSample = [token for sentence in sentences for token in sentence if token != ' '][:5000]
+    annotation = slounik.annotateText(text, toConllu = True)
+    annotatedPath = os.path.join(os.path.dirname(databasePath), 'annotated.slan')
+    slounik.saveAnnotated(annotation, annotatedPath)
+    textPath = os.path.join(os.path.dirname(databasePath), 'corpus.txt')
+    with open(textPath, 'w', encoding = 'utf-8') as file: file.write(text)
+    conlluPath = os.path.join(os.path.dirname(databasePath), 'corpus.conllu')
+    # documents with one edited paragraph each, re-annotated by a warm incremental annotator
+    annotator = slounik.IncrementalAnnotator()
+    annotator.update(text)
+    editedTexts = ['\n'.join(paragraphs[:i] + [paragraphs[i] + ' Новы сказ.'] + paragraphs[i + 1:]) for i in random.Random(seed + 1).sample(range(len(paragraphs)), min(10, len(paragraphs)))]
+    incompleteConllu = '\n\n'.join(['\n'.join([f'{i}\t{token}\t_\tX\t_\t_\t_\t_\t_\t_' for i, token in enumerate([token for token in sentence if token != ' '], 1)]) for sentence in sentences])
+    exactQueries = rng.sample(vocabulary, min(500, len(vocabulary)))
+    globQueries = [word[:3] + '*' for word in rng.sample(vocabulary, min(50, len(vocabulary)))]
+    lemIDs = rng.sample(range(1, lemmaCount + 1), min(500, lemmaCount))
+
+    benchmarks = {
+        'tokenize': (lambda: [slounik.tokenize(paragraph) for paragraph in paragraphs], tokenCount, 'tokens'),
+        'splitSentences': (lambda: [slounik.splitSentences(tokens) for tokens in tokenized], tokenCount, 'tokens'),
+        'annotateToken': (lambda: [slounik.annotateToken(token, toConllu = True) for token in tokenSample], len(tokenSample), 'tokens'),
+        'annotateText': (lambda: slounik.annotateText(text), tokenCount, 'tokens'),
+        'annotateTextConllu': (lambda: slounik.annotateText(text, toConllu = True), tokenCount, 'tokens'),
+        'accentuateText': (lambda: slounik.accentuateText(text), tokenCount, 'tokens'),
+        'lemmatize': (lambda: slounik.lemmatize(text), tokenCount, 'tokens'),
+        'lemmatizeStrings': (lambda: slounik.lemmatize(text, lemmaStrings = True), tokenCount, 'tokens'),
+        'incrementalUpdate': (lambda: [annotator.update(editedText) for editedText in editedTexts], len(editedTexts), 'calls'),
+        'annotateFile': (lambda: slounik.annotateFile(textPath, conlluPath), tokenCount, 'tokens'),
+        'annotateToArrays': (lambda: slounik.annotateToArrays(text), tokenCount, 'tokens'),
+        'generateConllu': (lambda: slounik.generateConllu(annotation), tokenCount, 'tokens'),
+        'saveAnnotated': (lambda: slounik.saveAnnotated(annotation, annotatedPath), tokenCount, 'tokens'),
+        'loadAnnotated': (lambda: slounik.loadAnnotated(annotatedPath), tokenCount, 'tokens'),
+        'completeConllu': (lambda: slounik.completeConllu(incompleteConllu), tokenCount, 'tokens'),
+        'formSearch': (lambda: [slounik.formSearch(query) for query in exactQueries], len(exactQueries), 'calls'),
+        'formSearchGlob': (lambda: [slounik.formSearch(query) for query in globQueries], len(globQueries), 'calls'),
+        'formSearchMany': (lambda: slounik.formSearchMany(exactQueries), len(exactQueries), 'calls'),
+        'formSearchManyGlob': (lambda: slounik.formSearchMany(globQueries), len(globQueries), 'calls'),
+        'formFacets': (lambda: [slounik.formFacets(query, by = ('POS', 'Case', 'Number')) for query in globQueries], len(globQueries), 'calls'),
+        'allForms': (lambda: [slounik.allForms(lemID) for lemID in lemIDs], len(lemIDs), 'lemmas'),
+        'allFormsMany': (lambda: list(slounik.allFormsMany(lemIDs)), len(lemIDs), 'lemmas'),
+        'inflect': (lambda: [slounik.inflect(lemID, Case = 'Gen', Number = 'Plur') for lemID in lemIDs], len(lemIDs), 'lemmas'),
+        'inflectMany': (lambda: slounik.inflectMany([(lemID, {'Case': 'Gen', 'Number': 'Plur'}) for lemID in lemIDs]), len(lemIDs), 'lemmas'),
+        }
+
+    results = {}
+    for name, (function, items, unit) in benchmarks.items():
+        if operations and name not in operations: continue
+        results[name] = measure(function, items, unit)
+        print(f'{name:<20} {results[name]["ItemsPerSecond"]:>12.1f} {unit}/s {results[name]["QueriesPer1kItems"]:>10.1f} queries/1k {unit}', file = sys.stderr)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Run `slounik` benchmarks on a synthetic fixture and write the results as JSON.')
+    parser.add_argument('--lemmas', type = int, default = 20000, help = 'the number of lemmas in the fixture dictionary')
+    parser.add_argument('--paragraphs', type = int, default = 100, help = 'the number of paragraphs in the fixture corpus')
+    parser.add_argument('--seed', type = int, default = 0, help = 'random seed of the fixtures')
+    parser.add_argument('--operations', default = '', help = 'comma-separated operation names to run, all by default')
+    parser.add_argument('--conllu-table', action = 'store_true', help = 'build the precomputed CoNLL-U table in the fixture database')
+    parser.add_argument('--form-filter', action = 'store_true', help = 'build the form filter for the fixture database')
+    parser.add_argument('--shared-lexicon', action = 'store_true', help = 'build the shared lexicon for the fixture database')
+    parser.add_argument('--output', default = '', help = 'JSON output file path, standard output by default')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        databasePath = os.path.join(directory, 'dictionary.db')
+        dictionary = fixture.buildDictionary(databasePath, arguments.lemmas, arguments.seed)
+        text = fixture.buildCorpus(dictionary['Vocabulary'], arguments.paragraphs, arguments.seed)
+
+        slounik.defaults['databaseFile'] = databasePath
+        slounik.defaults['conlluTable'] = False
+        slounik.dropFormFilter()
+        if arguments.conllu_table: slounik.buildConlluTable()
+        if arguments.form_filter: slounik.buildFormFilter()
+        if arguments.shared_lexicon: slounik.shareLexicon()
+
+        results = runBenchmarks(databasePath, text, dictionary['Vocabulary'], dictionary['Lemmas'], arguments.seed, [name for name in arguments.operations.split(',') if name])
+        slounik.dropLexicon()
+
+    output = {'Meta': {'Date': datetime.now().isoformat(timespec = 'seconds'),
+                       'Python': platform.python_version(),
+                       'SQLite': sqlite3.sqlite_version,
+                       'Platform': platform.platform(),
+                       'Lemmas': dictionary['Lemmas'],
+                       'Forms': dictionary['Forms'],
+                       'Paragraphs': arguments.paragraphs,
+                       'Seed': arguments.seed,
+                       'ConlluTable': arguments.conllu_table,
+                       'FormFilter': arguments.form_filter,
+                       'SharedLexicon': arguments.shared_lexicon,
+                       'PeakRSS': peakRSS()},
+              'Results': results}
+
+    if arguments.output:
+        with open(arguments.output, 'w', encoding = 'utf-8') as file: json.dump(output, file, indent = 2)
+    else: print(json.dumps(output, indent = 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+'''
+Thread-scaling benchmark for `slounik.annotateSentences()` on a synthetic fixture dictionary and corpus (see `fixture.py`).
+
+Annotates the same sentences with an increasing number of threads and reports throughput in tokens per second and the speedup over one thread as JSON.
+On regular CPython builds the GIL limits the speedup to overlapping database reads; free-threaded builds (`python3.13t`) run regex and dictionary work in parallel too.
+The output of every run is compared with the single-thread output.
+
+Usage:
+    python benchmarks/threads.py --threads 1,2,4,8 --paragraphs 200
+'''
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import slounik
+import fixture
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Measure `slounik.annotateSentences()` throughput with different numbers of threads and write the results as JSON.')
+    parser.add_argument('--threads', default = '1,2,4,8', help = 'comma-separated thread counts (default: 1,2,4,8)')
+    parser.add_argument('--lemmas', type = int, default = 20000, help = 'the number of lemmas in the fixture dictionary')
+    parser.add_argument('--paragraphs', type = int, default = 100, help = 'the number of paragraphs in the fixture corpus')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'runs per thread count, the fastest one is reported')
+    parser.add_argument('--conllu', action = 'store_true', help = 'annotate in CoNLL-U structure')
+    parser.add_argument('--seed', type = int, default = 0, help = 'random seed of the fixtures')
+    parser.add_argument('--output', default = '', help = 'JSON output file path, standard output by default')
+    arguments = parser.parse_args()
+
+    threadCounts = [int(count) for count in arguments.threads.split(',') if count]
+
+    with tempfile.TemporaryDirectory() as directory:
+        databasePath = os.path.join(directory, 'dictionary.db')
+        dictionary = fixture.buildDictionary(databasePath, arguments.lemmas, arguments.seed)
+        text = fixture.buildCorpus(dictionary['Vocabulary'], arguments.paragraphs, arguments.seed)
+
+        # an analyzer without a token cache, so that every run does the same work
+        analyzer = slounik.Analyzer(databasePath, stopWords = False)
+        sentences = [sentence for paragraph in text.split('\n') if paragraph for sentence in slounik.splitSentences(slounik.tokenize(paragraph.strip()))]
+        tokenCount = sum(len([token for token in sentence if token != ' ']) for sentence in sentences)
+        reference = analyzer.annotateSentences(sentences, arguments.conllu)
+
+        results = {}
+        for threads in threadCounts:
+            times = []
+            for _ in range(arguments.repeat):
+                start = time.perf_counter()
+                output = analyzer.annotateSentences(sentences, arguments.conllu, threads = threads)
+                times.append(time.perf_counter() - start)
+                if output != reference: raise RuntimeError(f'The output with {threads} threads differs from the single-thread output.')
+
+            results[threads] = {'Seconds': min(times), 'TokensPerSecond': tokenCount / min(times)}
+            results[threads]['Speedup'] = results[threads]['TokensPerSecond'] / results[threadCounts[0]]['TokensPerSecond']
+            print(f'{threads:>3} threads {results[threads]["TokensPerSecond"]:>12.1f} tokens/s {results[threads]["Speedup"]:>6.2f}x', file = sys.stderr)
+
+    output = {'Meta': {'Date': datetime.now().isoformat(timespec = 'seconds'),
+                       'Python': platform.python_version(),
+                       'GIL': sys._is_gil_enabled() if hasattr(sys, '_is_gil_enabled') else True,
+                       'SQLite': sqlite3.sqlite_version,
+                       'Platform': platform.platform(),
+                       'CPUs': os.cpu_count(),
+                       'Lemmas': dictionary['Lemmas'],
+                       'Paragraphs': arguments.paragraphs,
+                       'Sentences': len(sentences),
+                       'Tokens': tokenCount,
+                       'Conllu': arguments.conllu,
+                       'Seed': arguments.seed},
+              'Results': results}
+
+    if arguments.output:
+        with open(arguments.output, 'w', encoding = 'utf-8') as file: json.dump(output, file, indent = 2)
+    else: print(json.dumps(output, indent = 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+'''
+Process-scaling benchmark for text annotation in a `multiprocessing` pool on a synthetic fixture dictionary and corpus (see `fixture.py`).
+
+Annotates the same paragraphs with CoNLL-U structure on an increasing number of worker processes, with every worker reading the database file (`database`),
+its own in-memory copy of the database (`memory`, see `slounik.loadMemoryDatabase()`) or the lexicon shared by the parent process (`lexicon`, see `slounik.shareLexicon()`).
+Reports throughput in tokens per second, including worker start-up, and the memory of every worker as JSON: RSS counts the pages of the shared lexicon in every worker,
+while unique set size (USS) and proportional set size (PSS) don't, so the USS of a worker stays flat with the lexicon. USS and PSS are only read on Linux.
+The output of every run is compared with the output of the parent process.
+
+Usage:
+    python benchmarks/workers.py --workers 1,2,4,8 --modes database,memory,lexicon
+'''
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import slounik
+import fixture
+
+
+def memoryUsage():
+    '''
+    Read resident, unique and proportional set sizes of the current process in bytes from `/proc/self/smaps_rollup`, or `None` values where it is not available.
+    '''
+    usage = {'RSS': None, 'USS': None, 'PSS': None}
+    try:
+        with open('/proc/self/smaps_rollup') as file: values = {line.split(':')[0]: int(line.split()[1]) * 1024 for line in file if line.split()[-1] == 'kB'}
+    except OSError:
+        return usage
+
+    usage['RSS'], usage['PSS'] = (values.get('Rss'), values.get('Pss'))
+    usage['USS'] = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+
+    return usage
+
+
+def initWorker(databasePath, mode, lexiconName, cacheSize):
+    slounik.defaults['databaseFile'] = databasePath
+    if mode == 'memory': slounik.loadMemoryDatabase()
+    elif mode == 'lexicon': slounik.attachLexicon(lexiconName)
+    slounik.setCacheSize(cacheSize)
+
+
+def annotate(paragraph):
+    '''
+    Annotate a paragraph and report the worker's memory after it.
+    '''
+    return (slounik.annotateText(paragraph, toConllu = True), os.getpid(), memoryUsage())
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Measure annotation throughput and per-worker memory of a process pool with and without the shared lexicon and write the results as JSON.')
+    parser.add_argument('--workers', default = '1,2,4,8', help = 'comma-separated worker process counts (default: 1,2,4,8)')
+    parser.add_argument('--modes', default = 'database,memory,lexicon', help = 'comma-separated data sources of the workers (default: database,memory,lexicon)')
+    parser.add_argument('--lemmas', type = int, default = 20000, help = 'the number of lemmas in the fixture dictionary')
+    parser.add_argument('--paragraphs', type = int, default = 400, help = 'the number of paragraphs in the fixture corpus')
+    parser.add_argument('--cache-size', type = int, default = 0, help = 'token cache size of every worker (default: 0, disabled)')
+    parser.add_argument('--start-method', default = 'spawn', choices = ('spawn', 'forkserver', 'fork'), help = 'multiprocessing start method (default: spawn)')
+    parser.add_argument('--seed', type = int, default = 0, help = 'random seed of the fixtures')
+    parser.add_argument('--output', default = '', help = 'JSON output file path, standard output by default')
+    arguments = parser.parse_args()
+
+    workerCounts = [int(count) for count in arguments.workers.split(',') if count]
+    modes = [mode for mode in arguments.modes.split(',') if mode]
+    context = multiprocessing.get_context(arguments.start_method)
+
+    with tempfile.TemporaryDirectory() as directory:
+        databasePath = os.path.join(directory, 'dictionary.db')
+        dictionary = fixture.buildDictionary(databasePath, arguments.lemmas, arguments.seed)
+        text = fixture.buildCorpus(dictionary['Vocabulary'], arguments.paragraphs, arguments.seed)
+        slounik.defaults['databaseFile'] = databasePath
+
+        paragraphs = [paragraph.strip() for paragraph in text.split('\n') if paragraph]
+        tokenCount = sum(len([token for token in slounik.tokenize(paragraph) if token != ' ']) for paragraph in paragraphs)
+        reference = [slounik.annotateText(paragraph, toConllu = True) for paragraph in paragraphs]
+        if 'lexicon' in modes: print(slounik.shareLexicon(), file = sys.stderr)
+        lexiconName = slounik.lexiconInfo()['Name'] if 'lexicon' in modes else None
+
+        results = {}
+        for mode in modes:
+            results[mode] = {}
+            for workers in workerCounts:
+                start = time.perf_counter()
+                with context.Pool(workers, initializer = initWorker, initargs = (databasePath, mode, lexiconName, arguments.cache_size)) as pool:
+                    output = pool.map(annotate, paragraphs, chunksize = max(1, len(paragraphs) // (workers * 8)))
+                seconds = time.perf_counter() - start
+                if [annotation for annotation, _, _ in output] != reference: raise RuntimeError(f'The output of {workers} `{mode}` workers differs from the output of the parent process.')
+
+                # the last report of every worker
+                usage = {pid: memory for _, pid, memory in output}
+                def mean(key): return sum([memory[key] for memory in usage.values()]) / len(usage) if all(memory[key] is not None for memory in usage.values()) else None
+                results[mode][workers] = {'Seconds': seconds, 'TokensPerSecond': tokenCount / seconds, 'ReportingWorkers': len(usage),
+                                          'RSSPerWorker': mean('RSS'), 'USSPerWorker': mean('USS'), 'PSSPerWorker': mean('PSS')}
+                print(f'{mode:<9} {workers:>3} workers {results[mode][workers]["TokensPerSecond"]:>12.1f} tokens/s {(results[mode][workers]["USSPerWorker"] or 0) / 1048576:>8.1f} MB USS per worker', file = sys.stderr)
+
+        lexiconBytes = slounik.lexiconInfo()['Bytes'] if 'lexicon' in modes else None
+        slounik.dropLexicon()
+
+    output = {'Meta': {'Date': datetime.now().isoformat(timespec = 'seconds'),
+                       'Python': platform.python_version(),
+                       'Platform': platform.platform(),
+                       'CPUs': os.cpu_count(),
+                       'StartMethod': arguments.start_method,
+                       'Lemmas': dictionary['Lemmas'],
+                       'Paragraphs': len(paragraphs),
+                       'Tokens': tokenCount,
+                       'CacheSize': arguments.cache_size,
+                       'LexiconBytes': lexiconBytes,
+                       'Seed': arguments.seed},
+              'Results': results}
+
+    if arguments.output:
+        with open(arguments.output, 'w', encoding = 'utf-8') as file: json.dump(output, file, indent = 2)
+    else: print(json.dumps(output, indent = 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+'''
+Command-line bulk annotator: `python -m slounik`.
+
+Reads plain text from files or standard input and streams CoNLL-U tables or JSON Lines (one annotated paragraph per line) to standard output or to an output directory.
+Input is read and annotated in batches of paragraphs (lines), so memory usage does not depend on the input size. With `--workers`, batches are annotated by a pool of processes
+and written in the input order; at most two batches per worker are in flight at a time.
+
+Usage:
+    python -m slounik text.txt > text.conllu
+    cat *.txt | python -m slounik --format jsonl --workers 4 --cache-size 50000
+    python -m slounik corpus/*.txt --output-directory annotated --in-memory-db --stats
+'''
+import argparse
+import collections
+import contextlib
+import json
+import os
+import sys
+
+
+def _parseArguments():
+    parser = argparse.ArgumentParser(prog = 'python -m slounik', description = 'Annotate plain text with `slounik` and stream CoNLL-U or JSON Lines.')
+    parser.add_argument('files', nargs = '*', help = 'input text files, standard input if none are specified')
+    parser.add_argument('--format', choices = ('conllu', 'jsonl'), default = 'conllu', help = 'output format (default: conllu)')
+    parser.add_argument('--output-directory', default = '', help = 'write one output file per input file to this directory instead of standard output')
+    parser.add_argument('--database', default = '', help = 'database file path (default: `databasePath` in config.ini)')
+    parser.add_argument('--workers', type = int, default = 1, help = 'the number of annotating processes (default: 1)')
+    parser.add_argument('--batch-size', type = int, default = 100, help = 'the number of paragraphs annotated at a time (default: 100)')
+    parser.add_argument('--cache-size', type = int, default = None, help = 'the number of cached token annotations per worker, 0 disables the cache (default: `tokenCacheSize` in config.ini)')
+    parser.add_argument('--in-memory-db', action = 'store_true', help = 'copy the database into memory of every worker before annotation')
+    parser.add_argument('--basic', action = 'store_true', help = 'annotate only database forms, without extended token types')
+    parser.add_argument('--stats', action = 'store_true', help = 'print statistics to standard error when done')
+    arguments = parser.parse_args()
+
+    if arguments.workers < 1: parser.error('--workers must be at least 1')
+    if arguments.batch_size < 1: parser.error('--batch-size must be at least 1')
+    if arguments.cache_size is not None and arguments.cache_size < 0: parser.error('--cache-size must not be negative')
+    if arguments.output_directory and not arguments.files: parser.error('--output-directory requires input files')
+
+    return arguments
+
+
+# WORKER STATE
+# set by `_initialize()` in every worker process (or in the main process if there is one worker)
+_settings = {}
+
+def _initialize(settings):
+    '''
+    Prepare `slounik` module in a worker process.
+    '''
+    import slounik
+
+    _settings.update(settings)
+    # a connection inherited from the parent process must not be reused
+    slounik.slounik._closeConnection()
+    if settings['database']: slounik.defaults['databaseFile'] = settings['database']
+    if settings['cacheSize'] is not None: slounik.setCacheSize(settings['cacheSize'])
+    if settings['inMemory']: slounik.loadMemoryDatabase()
+    if settings['stats']: slounik.enableStats()
+
+
+def _annotateBatch(batch):
+    '''
+    Annotate a batch of paragraphs.
+
+    [ARGUMENTS]:
+    - `batch` (tuple) : The number of the first paragraph and the list of paragraphs.
+
+    [RETURNS]:
+    - `output` (tuple) : Formatted output, the number of paragraphs and statistics collected for the batch (or `None`).
+    '''
+    import slounik
+
+    firstID, paragraphs = batch
+    conllu = _settings['format'] == 'conllu'
+    annotation = slounik.annotateText('\n'.join(paragraphs), toConllu = conllu, extended = _settings['extended'])
+    # continue paragraph numbering across batches
+    annotation = {'Paragraphs': {firstID + paragraphID - 1: paragraph for paragraphID, paragraph in annotation['Paragraphs'].items()}}
+
+    if conllu: output = slounik.generateConllu(annotation) + '\n\n' if annotation['Paragraphs'] else ''
+    else: output = ''.join([json.dumps({'Paragraph': paragraphID, **paragraph}, ensure_ascii = False) + '\n' for paragraphID, paragraph in annotation['Paragraphs'].items()])
+
+    batchStats = None
+    if _settings['stats']:
+        batchStats = slounik.stats()
+        slounik.resetStats()
+
+    return output, len(annotation['Paragraphs']), batchStats
+
+
+def _batches(lines, batchSize):
+    '''
+    Group non-empty input lines into numbered batches of paragraphs, the same way `annotateText()` splits text.
+    '''
+    batch, paragraphID = [], 1
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line: continue
+        batch.append(line)
+        if len(batch) == batchSize:
+            yield paragraphID, batch
+            paragraphID += len(batch)
+            batch = []
+    if batch: yield paragraphID, batch
+
+
+def _mergeStats(total, batchStats):
+    '''
+    Add statistics of a batch to the total, summing numbers in nested dictionaries.
+    '''
+    for key, value in batchStats.items():
+        if isinstance(value, dict): _mergeStats(total.setdefault(key, {}), value)
+        elif isinstance(value, bool): total[key] = value
+        elif isinstance(value, (int, float)): total[key] = total.get(key, 0) + value
+
+
+def _annotateStream(lines, output, pool, batchSize, workers, totalStats):
+    '''
+    Annotate input lines batch by batch and write the results in input order.
+
+    [RETURNS]:
+    - `paragraphCount` (int) : The number of annotated paragraphs.
+    '''
+    paragraphCount = 0
+
+    def write(result):
+        nonlocal paragraphCount
+        text, count, batchStats = result
+        output.write(text)
+        paragraphCount += count
+        if batchStats: _mergeStats(totalStats, batchStats)
+
+    if pool is None:
+        for batch in _batches(lines, batchSize): write(_annotateBatch(batch))
+    else:
+        # a bounded window of batches in flight keeps memory usage flat
+        pending = collections.deque()
+        for batch in _batches(lines, batchSize):
+            pending.append(pool.apply_async(_annotateBatch, (batch,)))
+            if len(pending) >= workers * 2: write(pending.popleft().get())
+        while pending: write(pending.popleft().get())
+
+    output.flush()
+
+    return paragraphCount
+
+
+def main():
+    arguments = _parseArguments()
+
+    # the module is imported after argument parsing, so that `--help` does not load the database;
+    # configuration warnings printed on import must not get into the output
+    with contextlib.redirect_stdout(sys.stderr): import slounik
+
+    database = os.path.abspath(arguments.database) if arguments.database else slounik.defaults.get('databaseFile')
+    if not database or not os.path.exists(database):
+        print(f'The database file is not available: {database or "see `config.ini`"}', file = sys.stderr)
+        sys.exit(1)
+
+    settings = {'database': database, 'format': arguments.format, 'extended': not arguments.basic, 'cacheSize': arguments.cache_size, 'inMemory': arguments.in_memory_db, 'stats': arguments.stats}
+    extension = '.conllu' if arguments.format == 'conllu' else '.jsonl'
+    totalStats = {}
+    paragraphCount = 0
+    pool = None
+
+    if arguments.workers > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(arguments.workers, initializer = _initialize, initargs = (settings,))
+    else: _initialize(settings)
+
+    try:
+        if not arguments.files:
+            paragraphCount += _annotateStream(sys.stdin, sys.stdout, pool, arguments.batch_size, arguments.workers, totalStats)
+        else:
+            if arguments.output_directory: os.makedirs(arguments.output_directory, exist_ok = True)
+            for path in arguments.files:
+                with open(path, encoding = 'utf-8') as inputFile:
+                    if arguments.output_directory:
+                        outputPath = os.path.join(arguments.output_directory, os.path.splitext(os.path.basename(path))[0] + extension)
+                        with open(outputPath, 'w', encoding = 'utf-8') as outputFile:
+                            paragraphCount += _annotateStream(inputFile, outputFile, pool, arguments.batch_size, arguments.workers, totalStats)
+                    else: paragraphCount += _annotateStream(inputFile, sys.stdout, pool, arguments.batch_size, arguments.workers, totalStats)
+    except BrokenPipeError:
+        # the reading end of a pipeline was closed, e.g. by `head`
+        sys.stderr.close()
+        sys.exit(1)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    if arguments.stats:
+        totalStats['Paragraphs'] = paragraphCount
+        print(json.dumps(totalStats, ensure_ascii = False, indent = 2), file = sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+'''
+Asyncio interface: `slounik.aio`.
+
+Coroutine versions of search and annotation functions for applications built on an event loop. Database queries and regex work run on a bounded pool of threads,
+each with its own database connection, so the event loop is never blocked. The number of calls submitted to the pool at a time is limited per event loop (back-pressure),
+and identical concurrent calls share one database query: while a search for the same arguments is in flight, other callers wait for its result instead of querying again.
+
+Usage:
+    import asyncio
+    from slounik import aio
+
+    async def main():
+        results, annotation = await asyncio.gather(aio.aformSearch('мова'), aio.aannotateText('Тэкст для аналізу.', toConllu = True))
+        print(await aio.agenerateConllu(annotation))
+
+    asyncio.run(main())
+'''
+import asyncio
+import concurrent.futures
+import contextvars
+import copy
+import re
+import threading
+import weakref
+
+import slounik
+
+
+# EXECUTOR & LIMITS
+# the pool is created on first use, see `setLimits()`
+_executor = None
+_executorLock = threading.Lock()
+_limits = {'workers': 8, 'maxPending': 64}
+# semaphores and in-flight calls of every event loop
+_loopStates = weakref.WeakKeyDictionary()
+# calls that were served by an in-flight call with the same arguments
+counters = {'Calls': 0, 'Coalesced': 0}
+
+def setLimits(workers = 8, maxPending = 64):
+    '''
+    Set the size of the thread pool and the back-pressure limit. The current pool finishes its queued calls in the background.
+
+    [ARGUMENTS]:
+    - `workers` (int) OPTIONAL : The number of threads that run database queries and annotation, each with its own database connection.
+    - `maxPending` (int) OPTIONAL : The maximum number of calls submitted to the pool at a time per event loop. Further calls wait without blocking the event loop.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    global _executor
+
+    if not isinstance(workers, int) or workers < 1: return 'Invalid number of workers.'
+    if not isinstance(maxPending, int) or maxPending < 1: return 'Invalid back-pressure limit.'
+
+    with _executorLock:
+        if _executor is not None: _executor.shutdown(wait = False)
+        _executor = None
+        _limits.update({'workers': workers, 'maxPending': maxPending})
+    # running loops get a semaphore with the new limit, while their in-flight calls are still shared
+    for state in list(_loopStates.values()): state['Semaphore'] = asyncio.Semaphore(maxPending)
+
+    return f'The thread pool size was set to {workers}, at most {maxPending} calls are submitted at a time.'
+
+
+def _getExecutor():
+    global _executor
+
+    with _executorLock:
+        if _executor is None: _executor = concurrent.futures.ThreadPoolExecutor(_limits['workers'], thread_name_prefix = 'slounik-aio')
+        return _executor
+
+
+def _loopState():
+    '''
+    Get the back-pressure semaphore and the in-flight calls of the running event loop.
+    '''
+    loop = asyncio.get_running_loop()
+    state = _loopStates.get(loop)
+    if state is None: state = _loopStates[loop] = {'Semaphore': asyncio.Semaphore(_limits['maxPending']), 'InFlight': {}, 'Tokens': {}}
+
+    return state
+
+
+async def _run(function, *args, **kwargs):
+    '''
+    Run a function on the thread pool once a back-pressure slot is free, in a copy of the caller's context, so that it uses the settings and the token cache
+    of the caller, e.g. of an `Analyzer`.
+    '''
+    context = contextvars.copy_context()
+    async with _loopState()['Semaphore']:
+        return await asyncio.get_running_loop().run_in_executor(_getExecutor(), lambda: context.run(function, *args, **kwargs))
+
+
+async def _coalesced(key, coroutine):
+    '''
+    Await a coroutine created by `coroutine()`, unless a call with the same key is in flight, in which case wait for its result instead.
+    Every caller but the first gets a copy of the result, so that callers can modify their results independently.
+    '''
+    inFlight = _loopState()['InFlight']
+    counters['Calls'] += 1
+
+    task = inFlight.get(key)
+    owner = task is None
+    if owner:
+        task = inFlight[key] = asyncio.ensure_future(coroutine())
+        task.add_done_callback(lambda done: inFlight.pop(key, None) if inFlight.get(key) is done else None)
+    else: counters['Coalesced'] += 1
+
+    # a cancelled caller does not cancel the call for the others
+    result = await asyncio.shield(task)
+
+    return result if owner else copy.deepcopy(result)
+
+
+def _kwargsKey(kwargs):
+    # calls with different settings (the `Analyzer` of the caller's context, if any) are never coalesced
+    return (slounik.slounik._activeAnalyzer.get(),) + tuple(sorted(kwargs.items()))
+
+
+# SEARCH
+
+async def aformSearch(query, keepLetterCase = False, fastMode = False, **kwargs):
+    '''
+    Coroutine version of `formSearch()` with the same arguments and output.
+    '''
+    return await _coalesced(('formSearch', query, keepLetterCase, fastMode, _kwargsKey(kwargs)), lambda: _run(slounik.formSearch, query, keepLetterCase, fastMode, **kwargs))
+
+
+async def alemmaSearch(query, keepLetterCase = False, fastMode = False, **kwargs):
+    '''
+    Coroutine version of `lemmaSearch()` with the same arguments and output.
+    '''
+    return await _coalesced(('lemmaSearch', query, keepLetterCase, fastMode, _kwargsKey(kwargs)), lambda: _run(slounik.lemmaSearch, query, keepLetterCase, fastMode, **kwargs))
+
+
+async def aformByID(formID, toConllu = False, **kwargs):
+    '''
+    Coroutine version of `formByID()` with the same arguments and output.
+    '''
+    return await _coalesced(('formByID', formID, toConllu, _kwargsKey(kwargs)), lambda: _run(slounik.formByID, formID, toConllu, **kwargs))
+
+
+# ANNOTATION
+
+def _uncachedWords(text, toConllu, extended):
+    '''
+    Find the distinct word-like tokens of a text that have no cached annotation.
+    '''
+    words = set()
+    for paragraph in text.split('\n'):
+        tokens = slounik.tokenize(paragraph.strip()) if paragraph else ()
+        words.update([token for token in tokens if re.fullmatch(slounik.tokenCategories['word'], token)])
+
+    return slounik.slounik._uncachedTokens(words, toConllu, extended)
+
+
+async def _prefetchWords(words, toConllu, extended):
+    '''
+    Annotate word-like tokens into the token cache in bulk with `annotateTokens()`. Tokens that are already being looked up for another call are awaited instead.
+    '''
+    tokenTasks = _loopState()['Tokens']
+    keys = {word: (word, toConllu, extended, _kwargsKey({})) for word in words}
+
+    waiting = set([tokenTasks[key] for key in keys.values() if key in tokenTasks])
+    newWords = tuple([word for word, key in keys.items() if key not in tokenTasks])
+    if newWords:
+        task = asyncio.ensure_future(_run(slounik.annotateTokens, newWords, toConllu, extended))
+        for word in newWords: tokenTasks[keys[word]] = task
+
+        def release(done):
+            for word in newWords:
+                if tokenTasks.get(keys[word]) is done: del tokenTasks[keys[word]]
+        task.add_done_callback(release)
+        waiting.add(task)
+
+    # the text is annotated from the cache even if a bulk lookup failed, falling back to per-token queries
+    if waiting: await asyncio.gather(*[asyncio.shield(task) for task in waiting], return_exceptions = True)
+
+
+async def aannotateText(text, toConllu = False, extended = True):
+    '''
+    Coroutine version of `annotateText()` with the same arguments and output.
+    Concurrent calls with the same text share one annotation. While the token cache is enabled (see `setCacheSize()`), the words of concurrently annotated texts
+    are looked up in bulk, and a word that is already being looked up for another text is not queried again.
+    '''
+    if not isinstance(text, str): return None
+
+    async def annotate():
+        if slounik.slounik._cacheState()['Size']:
+            words = await _run(_uncachedWords, text, toConllu, extended)
+            if words: await _prefetchWords(words, toConllu, extended)
+        return await _run(slounik.annotateText, text, toConllu, extended)
+
+    return await _coalesced(('annotateText', text, toConllu, extended, _kwargsKey({})), annotate)
+
+
+async def agenerateConllu(annotatedText):
+    '''
+    Coroutine version of `generateConllu()` with the same arguments and output.
+    '''
+    return await _run(slounik.generateConllu, annotatedText)
@@ -0,0 +1,283 @@
+'''
+Local HTTP annotation service: `python -m slounik.serve`.
+
+One process keeps the database connections, the token cache and, optionally, an in-memory copy of the database warm for all clients. Only the standard library is used.
+
+Endpoints (responses are JSON in UTF-8 unless stated otherwise):
+- `POST /annotate` : `annotateText()` output for the plain text request body. Query parameters: `toConllu`, `extended`.
+- `POST /conllu` : CoNLL-U table (`text/plain`) for the plain text request body. Query parameters: `extended`.
+- `GET /formSearch?query=...` : `formSearch()` output. Query parameters: `keepLetterCase`, `fastMode` and search attributes, e.g. `POS=NOUN&Case=Gen`.
+- `GET /lemma/{id}` : `lemmaByID()` output, or `allForms()` output with `forms=true`.
+- `GET /stats` : request, batching and cache counters.
+
+Annotation requests that arrive within the batching window (a few milliseconds) are merged: the distinct uncached words of all of them are looked up in the database at once,
+and every request is then annotated from the data of its batch, whether the token cache is enabled or not. Identical concurrent search requests share one database query.
+Every connection has its own thread, while database work runs on a fixed pool of threads, so that idle keep-alive connections do not hold up other clients.
+
+Usage:
+    python -m slounik.serve --port 8080 --in-memory-db
+    curl --data-binary @text.txt 'http://127.0.0.1:8080/conllu'
+'''
+import argparse
+import concurrent.futures
+import contextlib
+import http.server
+import json
+import re
+import sys
+import threading
+import time
+import urllib.parse
+
+with contextlib.redirect_stdout(sys.stderr): import slounik
+
+
+# MICRO-BATCHING
+class MicroBatcher:
+    '''
+    Merge the words of annotation requests that arrive within `window` seconds into one bulk database lookup.
+    '''
+    def __init__(self, window = 0.003):
+        self.window = window
+        self.lock = threading.Lock()
+        self.pending = []
+        self.wakeup = threading.Event()
+        self.counters = {'Requests': 0, 'Batches': 0, 'Tokens': 0, 'DistinctTokens': 0}
+        threading.Thread(target = self._run, name = 'slounik-batcher', daemon = True).start()
+
+    def submit(self, words, toConllu, extended):
+        '''
+        Wait until the words are looked up in the database together with the words of other requests of the same batch.
+        Returns the data of the batch for `annotateToken()` (see `slounik._prefetch()`), or `None` if the lookup failed.
+        '''
+        item = {'Words': words, 'toConllu': toConllu, 'extended': extended, 'Done': threading.Event(), 'Prefetched': None}
+        with self.lock: self.pending.append(item)
+        self.wakeup.set()
+        item['Done'].wait()
+
+        return item['Prefetched']
+
+    def _run(self):
+        while True:
+            self.wakeup.wait()
+            # requests arriving within the window join the batch
+            time.sleep(self.window)
+            with self.lock:
+                pending, self.pending = self.pending, []
+                self.wakeup.clear()
+
+            # the thread has to survive any failure, otherwise later requests would wait forever
+            try: self._process(pending)
+            except Exception as exception: print(f'Batching failed: {exception!r}', file = sys.stderr)
+
+    def _process(self, pending):
+        groups, prefetched = ({}, {})
+        try:
+            # cached words are annotated from the token cache, the others are looked up once per annotation structure
+            for item in pending: groups.setdefault(item['toConllu'], set()).update(slounik.slounik._uncachedTokens(item['Words'], item['toConllu'], item['extended']))
+            for toConllu, words in groups.items(): prefetched[toConllu] = slounik.slounik._prefetch(words, toConllu) if words else None
+        except Exception as exception:
+            print(f'Batch lookup failed: {exception!r}', file = sys.stderr)
+        finally:
+            # waiting requests are released even if the lookup failed; they are then annotated without batch data
+            for item in pending: item['Prefetched'] = prefetched.get(item['toConllu']); item['Done'].set()
+            with self.lock:
+                self.counters['Requests'] += len(pending)
+                self.counters['Batches'] += 1
+                self.counters['Tokens'] += sum([len(item['Words']) for item in pending])
+                self.counters['DistinctTokens'] += sum([len(words) for words in groups.values()])
+
+    def snapshot(self):
+        with self.lock: return dict(self.counters)
+
+
+# IN-FLIGHT COALESCING
+_inFlight = {}
+_inFlightLock = threading.Lock()
+
+def _coalesced(key, function):
+    '''
+    Call `function`, unless a call with the same key is already running, in which case wait for its result instead.
+    '''
+    with _inFlightLock:
+        future = _inFlight.get(key)
+        owner = future is None
+        if owner: future = _inFlight[key] = concurrent.futures.Future()
+
+    if owner:
+        try: future.set_result(function())
+        except Exception as exception: future.set_exception(exception)
+        finally:
+            with _inFlightLock: del _inFlight[key]
+
+    return future.result()
+
+
+def _value(text):
+    '''
+    Convert a query string value into the Python type expected by search functions.
+    '''
+    if text.lower() in ('true', 'yes'): return True
+    if text.lower() in ('false', 'no'): return False
+    # ASCII digits only: `str.isdigit()` accepts characters like '²' that `int()` rejects
+    if re.fullmatch(r'-?[0-9]+', text): return int(text)
+    return text
+
+
+def _annotate(text, toConllu, extended, prefetched):
+    '''
+    Annotate the text from the data of its batch, see `MicroBatcher.submit()`.
+    '''
+    with slounik.slounik._prefetchedData(prefetched): return slounik.annotateText(text, toConllu, extended)
+
+
+# REQUEST HANDLING
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'slounik'
+    # headers and body are written separately, which Nagle's algorithm would delay until the client acknowledges the headers
+    disable_nagle_algorithm = True
+    # idle keep-alive connections are closed after this many seconds
+    timeout = 30
+    maxBodySize = 10485760
+
+    def log_message(self, format, *args):
+        if self.server.verbose: super().log_message(format, *args)
+
+    def _send(self, status, body, contentType = 'application/json; charset=utf-8'):
+        if not isinstance(body, (bytes, str)): body = json.dumps(body, ensure_ascii = False)
+        if isinstance(body, str): body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', contentType)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, {'Error': message})
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > self.maxBodySize: return None
+        return self.rfile.read(length).decode('utf-8', errors = 'replace')
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        parameters = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        self.server.count('Requests')
+
+        try:
+            if url.path == '/formSearch':
+                query = parameters.pop('query', '')
+                if not query: return self._error(400, 'The `query` parameter is required.')
+                options = {key: _value(value) for key, value in parameters.items()}
+                result = _coalesced(('formSearch', query, tuple(sorted(options.items()))), lambda: self.server.call(slounik.formSearch, query, **options))
+                if isinstance(result, str): return self._error(400, result)
+                if isinstance(result, Exception): return self._error(500, repr(result))
+                self._send(200, result)
+
+            elif url.path.startswith('/lemma/'):
+                lemID = url.path[len('/lemma/'):]
+                if not re.fullmatch(r'[0-9]+', lemID): return self._error(400, 'Invalid lemma ID.')
+                forms = _value(parameters.get('forms', 'false')) == True
+                result = _coalesced(('lemma', int(lemID), forms), lambda: self.server.call(slounik.allForms if forms else slounik.lemmaByID, int(lemID)))
+                if result is None: return self._error(404, 'The lemma ID does not exist.')
+                if isinstance(result, Exception): return self._error(500, repr(result))
+                self._send(200, result)
+
+            elif url.path == '/stats':
+                self._send(200, {'Server': self.server.snapshot(), 'Batching': self.server.batcher.snapshot(), 'Module': slounik.stats()})
+
+            else: self._error(404, 'Unknown endpoint.')
+
+        except Exception as exception:
+            self._error(500, repr(exception))
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        parameters = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        self.server.count('Requests')
+
+        if url.path not in ('/annotate', '/conllu'): return self._error(404, 'Unknown endpoint.')
+        text = self._body()
+        if text is None:
+            # the unread body would be taken for the next request of a keep-alive connection
+            self.close_connection = True
+            return self._error(413, 'The request body is too large.')
+
+        try:
+            conllu = url.path == '/conllu'
+            toConllu = conllu or _value(parameters.get('toConllu', 'false')) == True
+            extended = _value(parameters.get('extended', 'true')) == True
+
+            # look up the words together with concurrent requests, then annotate from the data of the batch
+            words = set([token for paragraph in text.split('\n') for token in slounik.tokenize(paragraph.strip()) if re.fullmatch(slounik.tokenCategories['word'], token)])
+            prefetched = self.server.batcher.submit(words, toConllu, extended) if words else None
+            annotation = self.server.call(_annotate, text, toConllu, extended, prefetched)
+
+            if conllu: self._send(200, slounik.generateConllu(annotation), 'text/plain; charset=utf-8')
+            else: self._send(200, annotation)
+
+        except Exception as exception:
+            self._error(500, repr(exception))
+
+
+class Server(http.server.ThreadingHTTPServer):
+    '''
+    HTTP server with a thread per connection and a fixed pool of database threads, so that their database connections stay open between requests.
+    '''
+    # connection bursts of many clients are queued instead of refused
+    request_queue_size = 128
+
+    def __init__(self, address, threads = 8, window = 0.003, verbose = False):
+        super().__init__(address, Handler)
+        self.executor = concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix = 'slounik-database')
+        self.batcher = MicroBatcher(window)
+        self.verbose = verbose
+        self.counters = {'Requests': 0}
+        self.countersLock = threading.Lock()
+
+    def count(self, key):
+        with self.countersLock: self.counters[key] += 1
+
+    def snapshot(self):
+        with self.countersLock: return dict(self.counters)
+
+    def call(self, function, *args, **kwargs):
+        '''
+        Run a database call on the pool of database threads and wait for its result.
+        '''
+        return self.executor.submit(function, *args, **kwargs).result()
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait = False, cancel_futures = True)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog = 'python -m slounik.serve', description = 'Serve `slounik` annotation and search over HTTP on a local address.')
+    parser.add_argument('--host', default = '127.0.0.1', help = 'address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type = int, default = 8080, help = 'port to listen on (default: 8080)')
+    parser.add_argument('--database', default = '', help = 'database file path (default: `databasePath` in config.ini)')
+    parser.add_argument('--threads', type = int, default = 8, help = 'the number of database threads (default: 8)')
+    parser.add_argument('--batch-window', type = float, default = 3, help = 'time in milliseconds during which annotation requests are merged (default: 3)')
+    parser.add_argument('--cache-size', type = int, default = 100000, help = 'the number of cached token annotations (default: 100000)')
+    parser.add_argument('--in-memory-db', action = 'store_true', help = 'copy the database into memory on start')
+    parser.add_argument('--stats', action = 'store_true', help = 'collect module statistics, see `/stats`')
+    parser.add_argument('--verbose', action = 'store_true', help = 'log every request to standard error')
+    arguments = parser.parse_args()
+
+    if arguments.database: slounik.defaults['databaseFile'] = arguments.database
+    if arguments.in_memory_db: print(slounik.loadMemoryDatabase(), file = sys.stderr)
+    slounik.setCacheSize(arguments.cache_size)
+    if arguments.stats: slounik.enableStats()
+
+    server = Server((arguments.host, arguments.port), arguments.threads, arguments.batch_window / 1000, arguments.verbose)
+    print(f'Serving `slounik` on http://{arguments.host}:{server.server_address[1]}', file = sys.stderr, flush = True)
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,31 @@
 import sqlite3
+import array
 import re
 import csv
+import json
+import gzip
+import lzma
 import os
 import configparser
+import hashlib
+import math
+import mmap
+import struct
+import sys
+import time
+import atexit
+import functools
+import logging
+import logging.handlers
+import threading
+import copy
+import itertools
+import contextlib
+import contextvars
+import types
+import concurrent.futures
+from multiprocessing import shared_memory, resource_tracker
+from collections import OrderedDict
 from datetime import datetime
 
 # DEFAULTS
@@ -19,10 +42,20 @@ def _loadDefaults():
             - `List` (list) : The list of lemma IDs as integers to be used for filtering.
             - `String` (str) : The list of lemma IDs as a string to be used in SQL search statements.
         - `stopWordsFile` (str): Stop-words file path.
+        - `conlluTable` (bool) : Whether the database contains precomputed CoNLL-U values, used by `formByID()`.
+        - `formFilter` (bool) : Whether the form filter is loaded or built on import, see `buildFormFilter()`.
+        - `formFilterFile` (str) : Form filter snapshot file path.
+        - `formFilterRate` (float) : Target false-positive rate of the form filter.
+        - `slowQueryThreshold` (float, NoneType) : Slow-query log threshold in milliseconds, `None` if the log is disabled.
+        - `slowQueryFile` (str, NoneType) : Slow-query log file path, `None` if records are only passed to `slounik.slowQueries` logger.
+        - `memoryDatabase` (bool) : Whether the database is copied into memory on import, see `loadMemoryDatabase()`.
+        - `tokenCacheSize` (int) : The number of token annotations kept in the cache, see `setCacheSize()`.
     """
-    defaults = {'stopWords': {'List': [], 'String': ''}}
+    defaults = {'stopWords': {'List': [], 'String': ''}, 'conlluTable': False}
     lemIDlist = None
-    defaults['configPath'] = os.path.abspath('config.ini')
+    # relative paths are resolved from the module directory, so that the module can be imported from any working directory
+    moduleDirectory = os.path.dirname(os.path.abspath(__file__))
+    defaults['configPath'] = os.path.join(moduleDirectory, 'config.ini')
 
     with open(defaults['configPath']) as configFile:
         config = configparser.ConfigParser()
@@ -30,22 +63,29 @@ def _loadDefaults():
 
     # database file path
     databasePath = config.get('Paths', 'databasePath')
-    databasePathAbs = os.path.abspath(databasePath)
+    databasePathAbs = os.path.abspath(os.path.join(moduleDirectory, databasePath))
     if os.path.exists(databasePathAbs): defaults['databaseFile'] = databasePathAbs
     else: print(f'Invalid database file path in `config.ini`: {databasePathAbs}')
 
+    # is there a precomputed CoNLL-U table? (see `buildConlluTable()`)
+    if 'databaseFile' in defaults:
+        try:
+            with sqlite3.connect(defaults['databaseFile']) as connection:
+                defaults['conlluTable'] = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'Conllu'").fetchone() is not None
+        except sqlite3.Error: pass
+
     # export file directory
     exportDirectoryPath = config.get('Paths', 'exportDirectoryPath')
-    exportDirectoryPathAbs = os.path.abspath(exportDirectoryPath)
+    exportDirectoryPathAbs = os.path.abspath(os.path.join(moduleDirectory, exportDirectoryPath))
     if os.path.exists(exportDirectoryPathAbs): defaults['exportDirectory'] = exportDirectoryPathAbs
-    else: print(f'Invalid export directory path in `config.ini`: {databasePathAbs}')
+    else: print(f'Invalid export directory path in `config.ini`: {exportDirectoryPathAbs}')
 
     # are stop-words enabled?
     enableStopWords = config.get('StopWords', 'enableStopWords')
     if enableStopWords == 'yes':
         # get the stop-word file path
         stopWordsPath = config.get('StopWords', 'stopWordsPath')
-        stopWordsPathAbs = os.path.abspath(stopWordsPath)
+        stopWordsPathAbs = os.path.abspath(os.path.join(moduleDirectory, stopWordsPath))
         
         # read the file
         if os.path.exists(stopWordsPathAbs):
@@ -56,6 +96,21 @@ def _loadDefaults():
                 lemIDlist = sorted(list(set([int(lemID) for lemID in fileList if lemID.isdigit()])))
                 if lemIDlist: defaults['stopWords'] = {'List': lemIDlist, 'String': ', '.join([str(lemID) for lemID in lemIDlist])}
 
+    # is the form filter enabled? (the section is optional in older `config.ini` versions)
+    defaults['formFilter'] = config.get('FormFilter', 'enableFormFilter', fallback = 'no') == 'yes'
+    defaults['formFilterFile'] = os.path.abspath(os.path.join(moduleDirectory, config.get('FormFilter', 'formFilterPath', fallback = '../slounik/assets/form_filter.bin')))
+    defaults['formFilterRate'] = config.getfloat('FormFilter', 'falsePositiveRate', fallback = 0.01)
+
+    # is the slow-query log enabled? (an empty threshold disables it)
+    slowQueryThreshold = config.get('SlowQueryLog', 'thresholdMs', fallback = '')
+    defaults['slowQueryThreshold'] = float(slowQueryThreshold) if slowQueryThreshold else None
+    slowQueryPath = config.get('SlowQueryLog', 'logPath', fallback = '')
+    defaults['slowQueryFile'] = os.path.abspath(os.path.join(moduleDirectory, slowQueryPath)) if slowQueryPath else None
+
+    # connection & cache settings
+    defaults['memoryDatabase'] = config.get('Database', 'loadToMemory', fallback = 'no') == 'yes'
+    defaults['tokenCacheSize'] = config.getint('Database', 'tokenCacheSize', fallback = 0)
+
     return defaults
 
 # load defaults
@@ -72,7 +127,9 @@ DBcolumns = {
     # same column lists as strings for SQL statements
     'SQL': {
         'form': 'ID, LemID, VarID, Form, Accent, Gender, Person, Cas, Number, Degree, Tense, Mood, VerbForm, Animacy, Short',
-        'lemma': 'ID, Lemma, POS, Type, InflClass, Degree, Person, Gender, Voice, Tense, Aspect, Animacy, Abbr, NumForm, VerbForm, Personal, Origin, Poss, Reflex, SubCat'
+        'lemma': 'ID, Lemma, POS, Type, InflClass, Degree, Person, Gender, Voice, Tense, Aspect, Animacy, Abbr, NumForm, VerbForm, Personal, Origin, Poss, Reflex, SubCat',
+        # form columns prefixed with the table name, for statements that join other tables
+        'joinedForm': 'Form.ID, Form.LemID, Form.VarID, Form.Form, Form.Accent, Form.Gender, Form.Person, Form.Cas, Form.Number, Form.Degree, Form.Tense, Form.Mood, Form.VerbForm, Form.Animacy, Form.Short'
         },
     # used to map arbitrary search keyword arguments to SQL 
     'search': {
@@ -138,6 +195,563 @@ abbreviations = {
 
 
 
+# INSTRUMENTATION
+# opt-in counters and stage timers, see `enableStats()` and `stats()`
+statsEnabled = False
+_stats = {'Queries': 0, 'Rows': 0, 'Tokens': {}, 'FormFilter': {}, 'Cache': {}, 'Stages': {}}
+# counters are updated from many threads during thread-pool annotation, see `annotateSentences()`
+_statsLock = threading.Lock()
+
+def _count(group, key, number = 1):
+    '''
+    Increase a counter of `stats()` output.
+
+    [ARGUMENTS]:
+    - `group` (str) : Counter group, e.g. 'Tokens'.
+    - `key` (str) : Counter name within the group, e.g. 'punct'.
+    - `number` (int) OPTIONAL : Increment.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use. Calls must be guarded by `if statsEnabled`.
+    '''
+    with _statsLock: _stats[group][key] = _stats[group].get(key, 0) + number
+
+
+def _timed(stage):
+    '''
+    Decorate a function so that its calls and wall time are accumulated under `stage` key in `stats()` output. Nested stages are timed inclusively.
+    If statistics are disabled, the only overhead is one flag check per call.
+
+    [ARGUMENTS]:
+    - `stage` (str) : Stage name.
+
+    [RETURNS]:
+    - `decorator` (function) : Function decorator.
+
+    [USAGE]:
+    This function is used to instrument module functions and is not intended for stand-alone use.
+    '''
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not statsEnabled: return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                with _statsLock:
+                    stageData = _stats['Stages'].setdefault(stage, {'Calls': 0, 'Seconds': 0.0})
+                    stageData['Calls'] += 1
+                    stageData['Seconds'] += seconds
+        return wrapper
+    return decorator
+
+
+def enableStats(enabled = True):
+    '''
+    Turn statistics collection on or off. Collected values are kept until `resetStats()` is called.
+
+    [ARGUMENTS]:
+    - `enabled` (bool) OPTIONAL : `True` to collect statistics, `False` to stop.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    global statsEnabled
+    statsEnabled = bool(enabled)
+
+    return f'Statistics collection was {'enabled' if statsEnabled else 'disabled'}.'
+
+
+def stats():
+    '''
+    Request the statistics collected since the last `resetStats()` call while collection was enabled with `enableStats()`.
+
+    [RETURNS]:
+    - `output` (dict) : A snapshot of the statistics with the following keys:
+        - `Enabled` (bool) : Whether collection is currently enabled.
+        - `Queries` (int) : The number of executed SQL statements.
+        - `Rows` (int) : The number of fetched rows, including rows streamed in batches (e.g. by `buildConlluTable()` and `shareLexicon()`).
+        - `Tokens` (dict) : The number of annotated tokens per category, see `tokenCategories`. Word-like tokens are counted as 'word', tokens without a category as 'other'.
+        - `FormFilter` (dict) : The number of word-like tokens that passed or were rejected by the form filter.
+        - `Cache` (dict) : Cache hits and misses.
+        - `Stages` (dict) : Calls and accumulated wall time in seconds per stage: `tokenize`, `splitSentences`, `annotateToken`, `formSearch`, `formByID`, `generateConllu`, as well as `lookup` (database lookup of word-like tokens), `prefetch` (bulk lookup in `annotateTokens()`), `UDify` (search result conversion), `conllify` (CoNLL-U formatting) and `SQL` (statement execution and fetching). Nested stages are timed inclusively.
+    '''
+    return {'Enabled': statsEnabled,
+            'Queries': _stats['Queries'],
+            'Rows': _stats['Rows'],
+            'Tokens': dict(_stats['Tokens']),
+            'FormFilter': dict(_stats['FormFilter']),
+            'Cache': dict(_stats['Cache']),
+            'Stages': {stage: dict(stageData) for stage, stageData in _stats['Stages'].items()}}
+
+
+def resetStats():
+    '''
+    Reset all collected statistics to zero. Collection remains enabled or disabled.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    _stats['Queries'], _stats['Rows'] = (0, 0)
+    for group in ('Tokens', 'FormFilter', 'Cache', 'Stages'): _stats[group].clear()
+
+    return 'Statistics were reset.'
+
+
+
+
+# SLOW-QUERY LOG
+# statements slower than the threshold are logged with their query plan and summarized by shape, see `setSlowQueryLog()`
+slowQueryThreshold = None
+slowQueryLogger = logging.getLogger('slounik.slowQueries')
+_slowQueries = {}
+_slowQueryHandler = None
+# literal values inlined into SQL statements
+_literalPattern = re.compile(r'"[^"]*"|\'[^\']*\'|(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])')
+
+def _logSlowQuery(cursor, statement, seconds, rows):
+    '''
+    Record a slow statement: pass it with its query plan to `slounik.slowQueries` logger and add it to the summary of its shape.
+
+    [ARGUMENTS]:
+    - `cursor` (sqlite3.Cursor) : The cursor that executed the statement.
+    - `statement` (str) : SQL statement.
+    - `seconds` (float) : Execution and fetching time.
+    - `rows` (int, NoneType) : The number of fetched rows, `None` if the rows were not fetched.
+
+    [USAGE]:
+    This function is used as an interim operation in `_query()` and is not intended for stand-alone use.
+    '''
+    # the stop-word list is the same in every statement, so it is labelled instead of listed
+    labelledStatement = statement.replace(_settings()['stopWords']['String'], 'stopWords') if _settings()['stopWords']['String'] else statement
+    # the shape is the statement with literal values (search query, filters, IDs) replaced by placeholders
+    shape = ' '.join(_literalPattern.sub('?', labelledStatement).split())
+    parameters = tuple([literal.strip('"\'') for literal in _literalPattern.findall(labelledStatement)])
+    try: plan = tuple([row[-1] for row in cursor.connection.execute(f'EXPLAIN QUERY PLAN {statement}').fetchall()])
+    except sqlite3.Error: plan = ()
+
+    slowQueryLogger.warning('Slow query (%.1f ms, %s rows): %s | parameters: %s | plan: %s', seconds * 1000, rows, shape, parameters, '; '.join(plan))
+
+    with _statsLock:
+        summary = _slowQueries.setdefault(shape, {'Shape': shape, 'Count': 0, 'Seconds': 0.0, 'MaxSeconds': 0.0, 'Rows': 0, 'Parameters': parameters, 'Plan': plan})
+        summary['Count'] += 1
+        summary['Seconds'] += seconds
+        summary['Rows'] += rows or 0
+        if seconds > summary['MaxSeconds']: summary['MaxSeconds'], summary['Parameters'] = (seconds, parameters)
+
+
+def setSlowQueryLog(threshold = 1000, path = None, maxBytes = 10485760, backupCount = 3):
+    '''
+    Enable or disable the slow-query log. Every statement executed by the module that takes longer than the threshold is passed to `slounik.slowQueries` logger (Python `logging`) with its parameters, time, the number of rows and `EXPLAIN QUERY PLAN` output, and added to `slowQuerySummary()`.
+    Defaults can be set in `config.ini`.
+
+    [ARGUMENTS]:
+    - `threshold` (int, float, NoneType) OPTIONAL : Threshold in milliseconds. `None` disables the log.
+    - `path` (str) OPTIONAL : OS path to a log file, rotated at `maxBytes` size with `backupCount` backups. If not specified, records are only passed to the logger and its handlers.
+    - `maxBytes` (int) OPTIONAL : Log file size limit in bytes.
+    - `backupCount` (int) OPTIONAL : The number of rotated log files to keep.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    global slowQueryThreshold, _slowQueryHandler
+
+    if threshold is not None and (isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold < 0): return 'Invalid threshold.'
+    
+    # replace the previously attached log file
+    if _slowQueryHandler is not None:
+        slowQueryLogger.removeHandler(_slowQueryHandler)
+        _slowQueryHandler.close()
+        _slowQueryHandler = None
+
+    if threshold is None:
+        slowQueryThreshold = None
+        return 'The slow-query log was disabled.'
+
+    slowQueryThreshold = threshold / 1000
+    if path:
+        _slowQueryHandler = logging.handlers.RotatingFileHandler(path, maxBytes = maxBytes, backupCount = backupCount, encoding = 'utf-8')
+        _slowQueryHandler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slowQueryLogger.addHandler(_slowQueryHandler)
+        return f'Statements slower than {threshold} ms are logged to {os.path.abspath(path)}.'
+
+    return f'Statements slower than {threshold} ms are logged to `slounik.slowQueries` logger.'
+
+
+def slowQuerySummary(top = 10, reset = False):
+    '''
+    Summarize the slow statements recorded since the slow-query log was enabled, grouped by query shape, i.e. the statement with literal values replaced by `?` placeholders.
+
+    [ARGUMENTS]:
+    - `top` (int) OPTIONAL : The number of shapes to return.
+    - `reset` (bool) OPTIONAL : Whether the recorded statements are cleared afterwards.
+
+    [RETURNS]:
+    - `output` (tuple) : Query shapes sorted by total time, worst first, each represented by a dictionary with the following keys:
+        - `Shape` (str) : The statement with placeholders.
+        - `Count` (int) : The number of slow executions.
+        - `Seconds` (float) : Total time.
+        - `MaxSeconds` (float) : The time of the slowest execution.
+        - `Rows` (int) : Total number of fetched rows.
+        - `Parameters` (tuple) : Literal values of the slowest execution, e.g. the search query and filter values.
+        - `Plan` (tuple) : `EXPLAIN QUERY PLAN` output lines.
+    '''
+    output = tuple([dict(summary) for summary in sorted(_slowQueries.values(), key = lambda summary: summary['Seconds'], reverse = True)[:top]])
+    if reset == True: _slowQueries.clear()
+
+    return output
+
+
+
+
+# CONNECTIONS & CACHE
+# every thread keeps one open connection instead of connecting per call, see `_connect()`
+_threadData = threading.local()
+# in-memory copy of the database file, see `loadMemoryDatabase()`
+memoryDatabase = None
+# least recently used token annotations (and accent data of `accentuateText()`) of module-level calls, see `setCacheSize()`
+_tokenCache = {'Cache': OrderedDict(), 'Accents': OrderedDict(), 'Size': 0, 'Lock': threading.Lock()}
+# the `Analyzer` whose methods are running in the current thread or task, `None` for module-level calls
+_activeAnalyzer = contextvars.ContextVar('slounikAnalyzer', default = None)
+
+def _settings():
+    '''
+    Get the settings used by the current call: the settings of the running `Analyzer` method, or `defaults` for module-level calls.
+
+    [RETURNS]:
+    - `settings` (dict, MappingProxyType) : Settings with at least `databaseFile`, `stopWords` and `conlluTable` keys, see `_loadDefaults()`.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    analyzer = _activeAnalyzer.get()
+
+    return defaults if analyzer is None else analyzer.config
+
+
+def _cacheState():
+    '''
+    Get the token cache used by the current call: the cache of the running `Analyzer` method, or the module-level cache.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    analyzer = _activeAnalyzer.get()
+
+    return _tokenCache if analyzer is None else analyzer._state['Cache']
+
+
+def _analyzerGenerator(generator):
+    '''
+    Run a generator with the settings of the calling `Analyzer`: generators run after the call that created them returns, so the analyzer is set again for every step.
+
+    [ARGUMENTS]:
+    - `generator` (generator) : A generator that has not been started.
+
+    [RETURNS]:
+    - `output` (generator) : The items of `generator`.
+
+    [USAGE]:
+    This function is used as an interim operation in functions that return generators and is not intended for stand-alone use.
+    '''
+    analyzer = _activeAnalyzer.get()
+
+    def generate():
+        try:
+            while True:
+                token = _activeAnalyzer.set(analyzer)
+                try: item = next(generator)
+                except StopIteration: return
+                finally: _activeAnalyzer.reset(token)
+                yield item
+        finally:
+            generator.close()
+
+    return generate()
+
+
+def _connect():
+    '''
+    Get the database connection of the current thread, opening it on first use. The connection is reopened if `defaults['databaseFile']` changes, and points to the in-memory copy of the database while it is loaded.
+    Methods of an `Analyzer` use its own connections.
+
+    [RETURNS]:
+    - `connection` (sqlite3.Connection) : Open database connection.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use. The connection is used as a context manager in place of `sqlite3.connect()`, so it is committed, but not closed, after each call.
+    '''
+    analyzer = _activeAnalyzer.get()
+    threadData = _threadData if analyzer is None else analyzer._state['Connections']
+    databaseFile = _settings()['databaseFile']
+
+    if memoryDatabase and memoryDatabase['File'] == databaseFile: target = memoryDatabase['URI']
+    else: target = databaseFile
+
+    connection = getattr(threadData, 'connection', None)
+    if connection is None or threadData.target != target:
+        if connection is not None: connection.close()
+        connection = sqlite3.connect(target, uri = target.startswith('file:'))
+        threadData.connection, threadData.target = (connection, target)
+
+    return connection
+
+
+def _closeConnection():
+    '''
+    Close the database connection of the current thread, e.g. in a child process that inherited it.
+    '''
+    connection = getattr(_threadData, 'connection', None)
+    if connection is not None: connection.close()
+    _threadData.connection, _threadData.target = (None, None)
+
+
+# thread pool of `annotateSentences()`, kept between calls so that its threads keep their connections open
+_pool = {'Executor': None, 'Threads': 0, 'Lock': threading.Lock()}
+
+def _threadPoolMap(threads, function, items):
+    '''
+    Submit a function call for every item to the shared thread pool with the given number of threads, replacing the current pool if its size differs.
+    The calls are submitted while the pool is locked, so a replaced pool still runs the calls submitted to it by other threads before it shuts down.
+
+    [RETURNS]:
+    - `results` (iterator) : Results in the order of the items, see `concurrent.futures.Executor.map()`.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    with _pool['Lock']:
+        if _pool['Executor'] is None or _pool['Threads'] != threads:
+            if _pool['Executor'] is not None: _pool['Executor'].shutdown(wait = False)
+            _pool['Executor'], _pool['Threads'] = (concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix = 'slounik'), threads)
+
+        return _pool['Executor'].map(function, items)
+
+
+def loadMemoryDatabase():
+    '''
+    Copy the database file into memory, so that all searches run without disk access. The copy is shared by all threads of the process and takes about as much memory as the database file.
+    It is used until `dropMemoryDatabase()` is called or `defaults['databaseFile']` changes. The database file itself is not modified, so tables built with `buildConlluTable()` afterwards require reloading the copy.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be copied.
+    '''
+    global memoryDatabase
+
+    if 'databaseFile' not in defaults: return 'The database file is not set.'
+
+    # shared cache lets connections of all threads open the same in-memory database by name
+    uri = f'file:slounik-{os.getpid()}-{time.time_ns()}?mode=memory&cache=shared'
+    try:
+        # the holder connection keeps the in-memory database alive
+        holder = sqlite3.connect(uri, uri = True, check_same_thread = False)
+        source = sqlite3.connect(defaults['databaseFile'])
+        source.backup(holder)
+        source.close()
+    except sqlite3.Error as exception:
+        return exception
+
+    dropMemoryDatabase()
+    memoryDatabase = {'File': defaults['databaseFile'], 'URI': uri, 'Connection': holder}
+
+    return f'The database was loaded into memory: {defaults['databaseFile']}'
+
+
+def dropMemoryDatabase():
+    '''
+    Free the in-memory copy of the database, so that searches read the database file again.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    global memoryDatabase
+
+    if memoryDatabase is None: return 'The database is not loaded into memory.'
+    # connections of other threads keep the copy open until they reconnect
+    _closeConnection()
+    memoryDatabase['Connection'].close()
+    memoryDatabase = None
+
+    return 'The in-memory database was dropped.'
+
+
+def setCacheSize(size = 10000):
+    '''
+    Set the number of token annotations kept in the cache. While the cache is enabled, `annotateToken()` (and thus text annotation) returns a copy of a cached annotation for a repeated token instead of searching the database.
+    The least recently used annotations are discarded when the cache is full. Cache hits and misses are counted in `stats()` output. The accent data of words stressed by `accentuateText()` is cached separately with the same size.
+
+    [ARGUMENTS]:
+    - `size` (int) OPTIONAL : The maximum number of cached annotations, `0` disables the cache.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    if not isinstance(size, int) or size < 0: return 'Invalid cache size.'
+    with _tokenCache['Lock']:
+        _tokenCache['Size'] = size
+        for cache in (_tokenCache['Cache'], _tokenCache['Accents']):
+            while len(cache) > size: cache.popitem(last = False)
+
+    return f'The token cache size was set to {size}.' if size else 'The token cache was disabled.'
+
+
+def clearCache():
+    '''
+    Remove all annotations from the token cache, e.g. after the database or stop words were changed.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    with _tokenCache['Lock']:
+        _tokenCache['Cache'].clear()
+        _tokenCache['Accents'].clear()
+
+    return 'The token cache was cleared.'
+
+
+def warmup(source, top = 10000, toConllu = None, extended = True):
+    '''
+    Fill the token cache with the annotations of the most frequent tokens, e.g. right after start-up, so that common words are annotated from the cache from the first call.
+    Distinct word-like tokens are looked up in the database in bulk, once for both annotation structures. The cache has to be enabled, see `setCacheSize()`.
+
+    [ARGUMENTS]:
+    - `source` (str, dict, list, tuple) : Token frequencies.
+      [VALUE OPTIONS]:
+        - Text (str) : A sample corpus. Its tokens are counted after tokenization.
+        - Frequencies (dict) : Token counts, e.g. `{'і': 5120, 'у': 4871}`.
+        - Frequency list (list, tuple) : `(token, count)` pairs, or tokens ordered from the most frequent one.
+    - `top` (int) OPTIONAL : The number of the most frequent tokens to annotate. It is limited by the cache size.
+    - `toConllu` (bool, NoneType) OPTIONAL: The structure of cached annotations, see `annotateToken()`.
+      [VALUE OPTIONS]:
+        - `None` DEFAULT : Both structures are cached.
+        - False : Only annotations in the structure of database search output are cached.
+        - True : Only annotations with CoNLL-U structure are cached.
+    - `extended` (bool) OPTIONAL: This attribute indicates whether additional token types are included in the search, see `annotateToken()`.
+
+    [RETURNS]:
+    - `message` (str) : The number of cached annotations, or error message.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    tokenCache = _cacheState()
+    if not tokenCache['Size']: return 'The token cache is disabled.'
+    if not isinstance(top, int) or top < 1: return 'Invalid number of tokens.'
+    structures = (False, True) if toConllu is None else (toConllu,)
+
+    # TOKEN FREQUENCIES
+    counts = {}
+    if isinstance(source, str):
+        for paragraph in source.split('\n'):
+            for token in tokenize(paragraph.strip()) if paragraph else ():
+                if token != ' ': counts[token] = counts.get(token, 0) + 1
+    elif isinstance(source, dict): counts = source
+    elif isinstance(source, (list, tuple)):
+        for rank, item in enumerate(source):
+            # tokens without counts are ranked by their position
+            if isinstance(item, str): counts.setdefault(item, -rank)
+            elif isinstance(item, (list, tuple)) and len(item) == 2: counts[item[0]] = item[1]
+            else: return 'Invalid frequency list format.'
+    else: return 'Invalid source format.'
+
+    try: tokens = [token for token in sorted(counts, key = counts.get, reverse = True) if isinstance(token, str) and token and token != ' ']
+    except TypeError: return 'Invalid frequency list format.'
+    # every structure takes a share of the cache
+    tokens = tokens[:min(top, tokenCache['Size'] // len(structures))]
+
+    # BULK DATABASE LOOKUP
+    words = set([token for token in tokens if re.fullmatch(tokenCategories['word'], token)])
+    lookup = _lookupForms(words) if words else {}
+    if not isinstance(lookup, dict): return lookup
+    formIDs = [formID for formIDs in lookup.values() if formIDs for formID in formIDs]
+
+    for structure in structures:
+        forms = _formsByIDs(formIDs, structure)
+        if not isinstance(forms, dict): return forms
+        # prefetched data is read by `annotateToken()` in the same thread, see `annotateTokens()`
+        _threadData.prefetched = {'Lookup': lookup, 'Forms': forms, 'toConllu': structure}
+        try:
+            # the most frequent tokens are annotated last, so that they are the last to be discarded from the cache
+            for token in reversed(tokens): annotateToken(token, structure, extended)
+        finally:
+            _threadData.prefetched = None
+
+    return f'{len(tokens) * len(structures)} token annotations were cached.'
+
+
+def saveCache(path):
+    '''
+    Save the token cache to a file, so that a restarted process can load it with `loadCache()` instead of filling it again.
+    The file is gzip-compressed JSON with the annotations of the current database file in least recently used order.
+
+    [ARGUMENTS]:
+    - `path` (str) : OS path to the target file.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation or error message.
+    '''
+    tokenCache = _cacheState()
+    databaseFile, stopWords = (_settings().get('databaseFile'), _settings()['stopWords']['String'])
+    if not databaseFile: return 'The database file is not set.'
+
+    # cached annotations are never modified, so they can be written after the lock is released
+    with tokenCache['Lock']: entries = [[key[0], key[1], key[2], category, output] for key, (category, output) in tokenCache['Cache'].items() if key[3:] == (databaseFile, stopWords)]
+
+    # the annotations are only valid for the same database file state and stop words
+    snapshot = {'Format': 'slounik-cache', 'Version': 1, 'Signature': list(_databaseSignature(databaseFile)), 'StopWords': stopWords, 'Entries': entries}
+    with gzip.open(path, 'wt', encoding = 'utf-8') as file: json.dump(snapshot, file, ensure_ascii = False)
+
+    return f'{os.path.abspath(path)} was created.'
+
+
+def loadCache(path):
+    '''
+    Load token annotations saved by `saveCache()` into the token cache. Snapshots of a different database file state or different stop words are rejected.
+    If the file has more annotations than the cache size, the most recently used ones are loaded.
+
+    [ARGUMENTS]:
+    - `path` (str) : OS path to the file.
+
+    [RETURNS]:
+    - `message` (str) : The number of loaded annotations, or error message.
+    '''
+    if not isinstance(path, str) or not os.path.isfile(path): return 'The token cache was not loaded. Invalid file path.'
+    tokenCache = _cacheState()
+    if not tokenCache['Size']: return 'The token cache is disabled.'
+    databaseFile, stopWords = (_settings().get('databaseFile'), _settings()['stopWords']['String'])
+    if not databaseFile: return 'The database file is not set.'
+
+    try:
+        with gzip.open(path, 'rt', encoding = 'utf-8') as file: snapshot = json.load(file)
+    except (OSError, EOFError, ValueError):
+        return 'The token cache was not loaded. Invalid file format.'
+    if not isinstance(snapshot, dict) or snapshot.get('Format') != 'slounik-cache' or snapshot.get('Version') != 1: return 'The token cache was not loaded. Invalid file format.'
+    if snapshot.get('Signature') != list(_databaseSignature(databaseFile)) or snapshot.get('StopWords') != stopWords:
+        return 'The token cache was not loaded. The snapshot does not match the database file or stop words.'
+
+    entries = []
+    try:
+        for token, toConllu, extended, category, output in snapshot['Entries'][-tokenCache['Size']:]:
+            # JSON object keys are strings, while result IDs are integers
+            if 'Results' in output: output['Results'] = {int(resultID): result for resultID, result in output['Results'].items()}
+            entries.append(((token, toConllu, extended, databaseFile, stopWords), (category, output)))
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return 'The token cache was not loaded. Invalid file format.'
+
+    with tokenCache['Lock']:
+        for key, value in entries:
+            tokenCache['Cache'][key] = value
+            tokenCache['Cache'].move_to_end(key)
+        while len(tokenCache['Cache']) > tokenCache['Size']: tokenCache['Cache'].popitem(last = False)
+
+    return f'{len(entries)} token annotations were loaded from {os.path.abspath(path)}.'
+
+
+
+
 # SERVICE FUNCTIONS (NOT FOR DIRECT USE)
 
 def _boolly(value, direction):
@@ -168,6 +782,75 @@ def _boolly(value, direction):
     elif direction == 6: return {False: 0, True: 1}[value]
 
 
+def _query(cursor, statement, fetch = 'all'):
+    '''
+    Execute an SQL statement and fetch the response. All database requests of the module pass through this function, so that they can be counted, timed and logged if slow.
+
+    [ARGUMENTS]:
+    - `cursor` (sqlite3.Cursor) : Database cursor.
+    - `statement` (str) : SQL statement.
+    - `fetch` (str, NoneType) OPTIONAL : Fetching mode.
+      [VALUE OPTIONS]:
+        - 'all' DEFAULT : All rows are fetched.
+        - 'one' : The first row is fetched.
+        - `None` : Nothing is fetched, the rows can be read from the cursor with `_fetchBatches()`, which counts them.
+
+    [RETURNS]:
+    - `response` (list, tuple, NoneType) : Fetched rows, a single row, or `None` if there is no row or nothing was fetched.
+    
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    if not statsEnabled and slowQueryThreshold is None:
+        cursor.execute(statement)
+        if fetch == 'all': return cursor.fetchall()
+        elif fetch == 'one': return cursor.fetchone()
+        else: return None
+
+    start = time.perf_counter()
+    cursor.execute(statement)
+    response, rows = (None, None)
+    if fetch == 'all': response = cursor.fetchall(); rows = len(response)
+    elif fetch == 'one': response = cursor.fetchone(); rows = 1 if response else 0
+    seconds = time.perf_counter() - start
+
+    if statsEnabled:
+        with _statsLock:
+            _stats['Queries'] += 1
+            _stats['Rows'] += rows or 0
+            stageData = _stats['Stages'].setdefault('SQL', {'Calls': 0, 'Seconds': 0.0})
+            stageData['Calls'] += 1
+            stageData['Seconds'] += seconds
+
+    if slowQueryThreshold is not None and seconds >= slowQueryThreshold: _logSlowQuery(cursor, statement, seconds, rows)
+
+    return response
+
+
+def _fetchBatches(cursor, size = 10000):
+    '''
+    Read the rows of a statement executed by `_query()` with `fetch == None` in batches, counting them in the statistics (see `enableStats()`), so that streamed scans are not missed.
+
+    [ARGUMENTS]:
+    - `cursor` (sqlite3.Cursor) : Database cursor.
+    - `size` (int) OPTIONAL : The number of rows in a batch.
+
+    [RETURNS]:
+    - `batches` (generator) : Lists of rows.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    while rows := cursor.fetchmany(size):
+        if statsEnabled:
+            with _statsLock: _stats['Rows'] += len(rows)
+        yield rows
+
+
+# forms are only found if their lemma exists; appended to the stop-word filter, which replaced a `Lemma` sub-query with the same effect
+_lemmaExistsSQL = ' AND EXISTS (SELECT 1 FROM Lemma WHERE Lemma.ID = Form.LemID)'
+
+
 def _generateSearchSQL(kwargDictionary):
     '''
     Generate SQL search arguments from a dictionary of user-generated keyword attributes passed as Form or Lemma search filters. 
@@ -186,13 +869,15 @@ def _generateSearchSQL(kwargDictionary):
     for key, value in kwargDictionary.items():
         if isinstance(value, bool): kwargStrings += (' = '.join((key, str(_boolly(kwargDictionary[key], 6)))),)
         elif isinstance(value, int): kwargStrings += (' = '.join((key, str(kwargDictionary[key]))),)
-        elif isinstance(value, str): kwargStrings += (' = '.join((key, ''.join(('\"', kwargDictionary[key], '\"')))),)
+        # strings are SQL literals with quotes doubled, so that a value can not end the literal or be taken for a column name
+        elif isinstance(value, str): kwargStrings += (' = '.join((key, ''.join(("'", kwargDictionary[key].replace("'", "''"), "'")))),)
 
     searchFiltersSQL = ' AND '.join(kwargStrings)
     
     return searchFiltersSQL
 
 
+@_timed('UDify')
 def _UDify(data, level):
     '''
     Converting a database search result into a Python dictionary using Universal Dependencies notation, depending on the specified level. 
@@ -238,225 +923,1476 @@ def _UDify(data, level):
     return output if output else None
 
 
+@_timed('conllify')
+def _conllify(formValue, lemValue, includeForm = True):
+    '''
+    Convert a Form table row and its Lemma table row into CoNLL-U `FORM`, `LEMMA`, `UPOS` & `FEATS` values.
 
+    [ARGUMENTS]:
+    - `formValue` (tuple) : Form table row with the columns listed in `DBcolumns['SQL']['form']`.
+    - `lemValue` (tuple) : Lemma table row with the columns listed in `DBcolumns['SQL']['lemma']`.
+    - `includeForm` (bool) OPTIONAL : Whether `FORM` value is included in the output.
 
-# UTILITY FUNCTIONS
+    [RETURNS]:
+    - `output` (dict) : CoNLL-U values of the form, `UPOS` is omitted if the lemma has no part of speech.
 
-def setStopWords():
+    [USAGE]:
+    This function is used as an interim operation in `formByID()` and `buildConlluTable()`, and is not intended for stand-alone use.
     '''
-    Set stop-words, i.e. the list of comma-separated lemma IDs in string format, to be excluded from database search results. 
-    
-    [ARGUMENTS]:
-    - `lemIDlist` (NoneType, tuple, str) : Stop-word list source. If not specified, the default `stopWordsPath` value is used as the file path. Defaults can be modified using `config.ini`.
-      [VALUE OPTIONS]:
-        - File path (str) : OS path to a TXT file with comma-separated lemma IDs.
-        - IDs (tuple) - Lemma IDs in integer format.
-        - `None` (NoneType) - Removes all stop words.
+    output, features = ({}, {})
+
+    # FORM DATA
+    if includeForm == True: output['FORM'] = formValue[3] 
+    # detect non-empty values excluding redundant attributes
+    for i, value in [item for item in enumerate(formValue[5:]) if item[1]]:
+        # rename Cas to Case (restricted word in SQLite)
+        if i == 2: features['Case'] = value
+        # integer to UD `Animacy` value string
+        elif i == 8: features['Animacy'] = _boolly(value, 3)
+        # integer to UD "boolean" string
+        elif i == 9: features['Short'] = _boolly(value, 0)
+        # add other values without modification
+        else: features[DBcolumns['schema']['form'][5:][i]] = value
+
+    # LEMMA DATA
+    output['LEMMA'] = lemValue[1]
+    # detect non-empty values excluding redundant attributes
+    for i, value in [item for item in enumerate(lemValue[2:]) if item[1]]:
+        # UPOS value
+        if i == 0: output['UPOS'] = value
+        # convert `Type` label to POS-specific, e.g., NumType
+        elif i == 1: features[f'{lemValue[2].title()}Type'] = value
+        # integer to UD `Animacy` value string
+        elif i == 9: features['Animacy'] = _boolly(value, 3)
+        # integers to UD "boolean" strings
+        elif i in (10, 13, 15, 16): features[DBcolumns['schema']['lemma'][2:][i]] = _boolly(value, 0)
+        # add other values without modification
+        else: features[DBcolumns['schema']['lemma'][2:][i]] = value
+
+    # joining FEATS key-value pairs
+    if features: output['FEATS'] = '|'.join([''.join([key, '=', str(features[key])])for key in sorted(features.keys())])
+    else: output['FEATS'] = '_'
 
-    [RETURNS]:
-    - `stopWords` VAR VALUE (dict) : Populates `stopWords` value with a dictionary with the following keys:
-        - `List` (list) : The list of integers.
-        - `String` (str) : The list in string format to be appended to SQL search statements.  
+    return output
+
+
+def _paradigm(response):
     '''
-    global stopWords
-    
-    if lemIDs == None:
-        stopWords = {'List': [], 'String': ''}
-        return 'The stop-word list was emptied.'
-        
-    elif isinstance(lemIDs, tuple):
-        lemIDlist = sorted(list(set([lemID for lemID in lemIDs if isinstance(lemID, int)])))
-        if not lemIDlist:
-            return 'The stop-word list was not updated: No valid values were found.'
-        else:
-            stopWords = {'List': lemIDlist,
-                         'String': ', '.join([str(lemID) for lemID in lemIDlist])}
-            if len(lemIDs) != len(lemIDlist):
-                return 'The stop-word list was updated. Some of the submitted values were removed due to duplication or invalid format.'
-            else:
-                return 'The stop-word list was updated.'
-   
-    elif isinstance(lemIDs, str) and lemIDs.endswith('.txt'):
-        if not os.path.exists(lemIDs):
-            return 'The stop-word list was not updated. Invalid file path.'
-        else:
-            with open(lemIDs, 'r+', encoding = 'utf-8') as file:
-                fileContents = file.read()
-                fileList = [item.strip() for item in fileContents.split(',')]
-                lemIDlist = sorted(list(set([int(lemID) for lemID in fileList if lemID.isdigit()])))
-                             
-            if not lemIDlist:
-                return f'The stop-word list was not updated with values from {os.path.abspath(lemIDs)}. No valid values were found.'
-            else:
-                stopWords = {'List': lemIDlist,
-                             'String': ', '.join([str(lemID) for lemID in lemIDlist])}
-                if len(fileList) != len(lemIDlist):
-                    return f'The stop-word list was updated with values from {os.path.abspath(lemIDs)}. Some values were removed due to duplication or invalid format.'
-                else:
-                    return f'The stop-word list was updated with values from {os.path.abspath(lemIDs)}.'
+    Convert lemma and form rows into the output structure of `allForms()`.
 
-    else:
-        return 'Unsupported list format.'
+    [ARGUMENTS]:
+    - `response` (dict) : Database rows with the following keys:
+        - `lemma` (tuple) : Lemma table row.
+        - `forms` (tuple, list) : `(variant, Form table row)` pairs in form ID order.
 
-    return message
+    [RETURNS]:
+    - `output` (dict) : Lemma attributes under `LemmaData` key and forms grouped by variant under `Variants` key.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    output = {'LemmaData': {}, 'Variants': ()}
+    # annotate lemma attributes
+    output['LemmaData'] = _UDify(response['lemma'], 'l')
+    # generate form tuples (paradigms) grouped by variant
+    variants = {}
+    for form in response['forms']:
+        if form[0] not in variants.keys(): variants[form[0]] = (_UDify(form[1], 'f'),)
+        else: variants[form[0]] += (_UDify(form[1], 'f'),)           
+    # add form groups to the output
+    for variant in sorted(variants.keys()):
+        output['Variants'] += ({'Variant': variant, 'Paradigm': variants[variant]},)
 
+    return output
 
-def accentuate(form, accentData):
+
+def _searchFilterSQL(kwargs, leadingWildcard = False):
     '''
-    Add word stress diacritic marks to a word form. The mark used is Unicode `\u0301`.
+    Generate the SQL filter of form search statements from search attributes (keyword arguments) and stop words.
 
     [ARGUMENTS]:
-    - `form` (str) : Word form as it is stored in `Form` column of `Form` database table and outputted under ['FormData']['Form'] key of a form dictionary.
-    - `accentData` (str) : Accent position data as it is stored in `Accent` column of Form table and outputted under ['FormData']['Accent'] key of a form dictionary. Numbering starts with 1.
+    - `kwargs` (dict) : Form and lemma attributes in `keyword = value` format, see `formSearch()`. Unknown keywords are skipped.
+    - `leadingWildcard` (bool) OPTIONAL : Whether the search query starts with a wildcard, which affects index use.
 
     [RETURNS]:
-    - `accentedForm` (str) : The inputted word form with diacritic marks.
+    - `filterSQL` (str) : SQL conditions to be appended to `WHERE` clause, starting with ` AND`, or an empty string.
     OR
-    - `None` (NoneType) : Returned if the submitted data is invalid.
+    - `None` (NoneType) : Returned if a dual-use attribute is not prefixed with 'f_' or 'l_'.
+
+    [USAGE]:
+    This function is used as an interim operation in `formSearch()` and `formSearchMany()` and is not intended for stand-alone use.
     '''
-    # validate arguments
-    if not isinstance(form, str): return None
-    if (isinstance(accentData, str) and any(c for c in accentData if c not in '0123456789-')) or (isinstance(accentData, int)) or (accentData in (0, '0')): return None
+    # Separate form & lemma key-argument pairs, skipping unknown keywords
+    formKwargs = {}
+    lemKwargs = {}
+    for keyword in kwargs.keys():
+        # flag ambiguous attributes
+        if keyword.lower() in DBcolumns['search']['dual']: return None
+        # substitute UD attributes that are reserved words in SQLite
+        elif keyword.lower() == 'case': formKwargs['Cas'] = kwargs[keyword]
+        elif keyword.lower() == 'length': formKwargs['Len'] = kwargs[keyword]
+        # mapping `AdjType`, `NumType`, `PronType` to `Type` column in Lemma table
+        elif 'type' in keyword.lower(): lemKwargs['Type'] = kwargs[keyword]
+        # separate attributes by their presense in Form or Lemma table columns (excluding dual)
+        elif keyword.lower() in DBcolumns['search']['form']: formKwargs[keyword] = kwargs[keyword]
+        elif keyword.lower() in DBcolumns['search']['lemma']: lemKwargs[keyword] = kwargs[keyword]
+        # parse prefixed dual-use attributes
+        elif '_' in keyword:
+            keywordParts = keyword.lower().split('_')
+            if len(keywordParts) == 2:
+                if keywordParts[0] == 'f' and keywordParts[1] in DBcolumns['search']['dual']: formKwargs[keywordParts[1]] = kwargs[keyword]
+                elif keywordParts[0] == 'l' and keywordParts[1] in DBcolumns['search']['dual']: lemKwargs[keywordParts[1]] = kwargs[keyword]
+                
+    # Generate SQL arguments as strings
+    lemSearchSQL = _generateSearchSQL(lemKwargs) if lemKwargs else ''
+    formSearchSQL = _generateSearchSQL(formKwargs) if formKwargs else ''
+    stopWordSQL = f'ID NOT IN ({_settings()['stopWords']['String']})' if _settings()['stopWords']['String'] else ''
     
-    accentedForm = None
+    # Generate Lemma table sub-query if necessary
+    # (unless the query starts with a wildcard, unary `+` keeps SQLite on the `Lowercase`/`Form` index instead of `LemID`;
+    # stop words alone are filtered on `LemID` directly, so the whole Lemma table isn't scanned per search,
+    # and forms without a lemma row are skipped by a primary key lookup, as they were by the sub-query)
+    lemIDColumn = 'LemID' if leadingWildcard else '+LemID'
+    lemmaSubquery = ''
+    if lemSearchSQL and stopWordSQL: lemmaSubquery = f' AND {lemIDColumn} IN (SELECT ID FROM Lemma WHERE {lemSearchSQL} AND {stopWordSQL})' 
+    elif lemSearchSQL: lemmaSubquery = f' AND {lemIDColumn} IN (SELECT ID FROM Lemma WHERE {lemSearchSQL})' 
+    elif stopWordSQL: lemmaSubquery = f' AND {lemIDColumn} NOT IN ({_settings()['stopWords']['String']}){_lemmaExistsSQL}' 
 
-    # simple word stress
-    if '-' not in form and '-' not in accentData:
-        if len(form) >= int(accentData):
-            accentedForm = ''.join([form[:int(accentData)], u'\u0301', form[int(accentData):]])
-    # compound word stress
-    else:
-        positions = [int(p) for p in accentData.split('-')]
-        parts = form.split('-')
-        if (len(parts) != len(positions)) or (all(p == 0 for p in positions)): return None
-            
-        accentedParts = ()
-        for i, position in enumerate(positions):
-            if position != 0: accentedParts += (''.join([parts[i][:position], u'\u0301', parts[i][position:]])),
-            else: accentedParts += (parts[i]),
+    return f'{f' AND {formSearchSQL}' if formSearchSQL else ''}{lemmaSubquery}'
+
+
+def _lemmaFilterSQL(kwargs):
+    '''
+    Generate the SQL filter of lemma search statements from search attributes (keyword arguments) and stop words.
+
+    [ARGUMENTS]:
+    - `kwargs` (dict) : Lemma attributes in `keyword = value` format, see `lemmaSearch()`. Unknown keywords are skipped.
+
+    [RETURNS]:
+    - `filterSQL` (str) : SQL conditions to be appended to `WHERE` clause, starting with ` AND`, or an empty string.
+
+    [USAGE]:
+    This function is used as an interim operation in `lemmaSearch()` and `lemmaFacets()` and is not intended for stand-alone use.
+    '''
+    # Parse keyword agruments, skipping unknown keywords
+    lemKwargs = {}
+    for keyword in kwargs.keys():
+        # substitute UD attributes that are reserved words in SQLite
+        if keyword.lower() == 'length': lemKwargs['Len'] = kwargs[keyword]
+        # mapping `AdjType`, `NumType`, `PronType` to `Type` column in Lemma table
+        elif 'type' in keyword.lower(): lemKwargs['Type'] = kwargs[keyword]
+        # collect lemma attributes
+        elif keyword.lower() in DBcolumns['search']['lemma'] or keyword.lower() in DBcolumns['search']['dual']: lemKwargs[keyword] = kwargs[keyword]
                 
-        accentedForm = '-'.join(accentedParts)
+    # Generate SQL arguments as strings
+    lemSearchSQL = _generateSearchSQL(lemKwargs) if lemKwargs else ''
+    stopWordSQL = f'ID NOT IN ({_settings()['stopWords']['String']})' if _settings()['stopWords']['String'] else ''
+
+    return f'{f' AND {lemSearchSQL}' if lemSearchSQL else ''}{f' AND {stopWordSQL}' if stopWordSQL else ''}'
+
+
+def _facetColumns(attributes, level):
+    '''
+    Map facet attribute names to the database columns they are counted by.
+
+    [ARGUMENTS]:
+    - `attributes` (tuple) : Attribute names as they are used as search keywords, e.g. 'POS', 'Case', 'f_Gender'.
+    - `level` (str) : The table of search results.
+      [VALUE OPTIONS]:
+        - 'f' : Form table; both form and lemma attributes can be used, dual-use attributes have to be prefixed with 'f_' or 'l_'.
+        - 'l' : Lemma table; only lemma attributes can be used, without prefixes.
+
+    [RETURNS]:
+    - `columns` (tuple) : `(table, column, isBoolean)` tuple for each attribute, where `table` is 'Form' or 'Lemma'.
+    OR
+    - `message` (str) : Returned if an attribute is unknown or ambiguous.
+
+    [USAGE]:
+    This function is used as an interim operation in `formFacets()` and `lemmaFacets()` and is not intended for stand-alone use.
+    '''
+    columns = ()
+    for attribute in attributes:
+        keyword = attribute.lower() if isinstance(attribute, str) else ''
+        table = None
+        if level == 'f':
+            # the same keyword mapping as in `_searchFilterSQL()`
+            if keyword in DBcolumns['search']['dual']: return 'Ambiguous facet attributes. Request `help(formFacets)` for details.'
+            elif keyword == 'case': table, column = ('Form', 'Cas')
+            elif keyword == 'length': table, column = ('Form', 'Len')
+            elif 'type' in keyword: table, column = ('Lemma', 'Type')
+            elif keyword in DBcolumns['search']['form']: table, column = ('Form', keyword)
+            elif keyword in DBcolumns['search']['lemma']: table, column = ('Lemma', keyword)
+            elif keyword[:2] in ('f_', 'l_') and keyword[2:] in DBcolumns['search']['dual']: table, column = ('Form' if keyword[0] == 'f' else 'Lemma', keyword[2:])
+        elif level == 'l':
+            # the same keyword mapping as in `_lemmaFilterSQL()`
+            if keyword == 'length': table, column = ('Lemma', 'Len')
+            elif 'type' in keyword: table, column = ('Lemma', 'Type')
+            elif keyword in DBcolumns['search']['lemma'] or keyword in DBcolumns['search']['dual']: table, column = ('Lemma', keyword)
+        if table is None: return f'Unknown facet attribute: {attribute!r}. Request `help({'formFacets' if level == 'f' else 'lemmaFacets'})` for details.'
+
+        columns += ((table, column, column in ('animacy', 'short', 'abbr', 'personal', 'poss', 'reflex')),)
+
+    return columns
+
+
+def _facetCounts(response, columns):
+    '''
+    Convert grouped count rows into facet dictionary keys and counts, converting "Boolean" integers to Python format.
+    A single attribute is keyed by its value, several attributes by a tuple of values.
+    '''
+    output = {}
+    for row in response:
+        key = tuple([_boolly(value, 5) if isBoolean and value in (0, 1) else value for value, (_, _, isBoolean) in zip(row, columns)])
+        output[key if len(key) > 1 else key[0]] = row[-1]
+
+    return output if output else None
+
+
+def _filterPositions(word, size, hashes):
+    '''
+    Calculate the bit positions of a word in the form filter using double hashing.
+
+    [ARGUMENTS]:
+    - `word` (str) : Lowercase word form.
+    - `size` (int) : The number of bits in the filter.
+    - `hashes` (int) : The number of positions per word.
+
+    [RETURNS]:
+    - `positions` (list) : Bit positions.
+
+    [USAGE]:
+    This function is used as an interim operation in form filter functions and is not intended for stand-alone use.
+    '''
+    digest = hashlib.blake2b(word.encode('utf-8'), digest_size = 16).digest()
+    first, second = struct.unpack('<QQ', digest)
+    
+    return [(first + i * second) % size for i in range(hashes)]
+
+
+def _knownForm(token):
+    '''
+    Check a word-like token against the form filter before a database search. 
+    
+    [ARGUMENTS]:
+    - `token` (str) : A word-like token.
+
+    [RETURNS]:
+    - `False` (bool) : The token is definitely not in `Form` table.
+    OR
+    - `True` (bool) : The token might be in `Form` table, or the form filter is not loaded.
+
+    [USAGE]:
+    This function is used as an interim operation in `annotateToken()` and is not intended for stand-alone use.
+    '''
+    # the filter describes the forms of one database file
+    if formFilter is None or formFilter['File'] != _settings().get('databaseFile'): return True
+
+    # the same normalization as in case-insensitive `formSearch()`
+    word = token.lower()
+    if word.startswith('ў'): word = 'у' + word[1:]
+
+    bits = formFilter['Bits']
+    for position in _filterPositions(word, formFilter['Size'], formFilter['Hashes']):
+        if not bits[position >> 3] & (1 << (position & 7)):
+            if statsEnabled: _count('FormFilter', 'Rejected')
+            return False
+
+    if statsEnabled: _count('FormFilter', 'Passed')
+
+    return True
+
+
+
+@_timed('lookup')
+def _lookupForm(token):
+    '''
+    Find the form IDs of a word-like token with the same result as a case-sensitive `formSearch()` followed by a case-insensitive one if the former has no results, but in a single query. 
+    Case-insensitive matches are requested together with a flag for case-sensitive match, and the precedence is resolved in Python.
+
+    [ARGUMENTS]:
+    - `token` (str) : A word-like token.
+
+    [RETURNS]:
+    - `output` (tuple) : Integer form IDs sorted alphabetically by form: case-sensitive matches if there are any, otherwise case-insensitive matches.
+    OR
+    - `None` (NoneType) : Returned if there are no matches.
+
+    [USAGE]:
+    This function is used as an interim operation in `annotateToken()` and is not intended for stand-alone use.
+    '''
+    # the same validity check and `Ў` replacement as in `formSearch()`
+    if any(character for character in token if character not in validQueryCharacters): return None
+    if token.startswith('ў'): token = 'у' + token[1:]
+    elif token.startswith('Ў'): token = 'У' + token[1:]
+
+    # forms are found in the shared lexicon without a database search, see `shareLexicon()`
+    with _usedLexicon(not any(character in token for character in '*?[')) as lexicon:
+        if lexicon is not None: return _lexiconLookup(lexicon, token)
+
+    # Stop words are filtered on `LemID` directly (a `Lemma` sub-query would scan the whole table per token);
+    # unary `+` keeps SQLite from choosing the `LemID` index over the `Lowercase` one; results with the same form are ordered by lemma, like in `formSearch()`
+    stopWordSQL = f' AND +LemID NOT IN ({_settings()['stopWords']['String']}){_lemmaExistsSQL}' if _settings()['stopWords']['String'] else ''
+    statement = f'''SELECT ID, Form GLOB \"{token}\" FROM Form 
+                    WHERE Lowercase GLOB \"{token.lower()}\"{stopWordSQL} ORDER BY Form, LemID, ID'''
+
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+            response = _query(cursor, statement, 'all')
+
+    except sqlite3.Error as exception:
+        return exception
+
+    # case-sensitive matches take precedence
+    output = tuple([result[0] for result in response if result[1]]) or tuple([result[0] for result in response])
+
+    return output if output else None
+
+
+
+def _chunks(values, size = 500):
+    '''
+    Split any iterable into chunks lazily, so that `IN (...)` lists of bulk statements stay within SQLite limits.
+    '''
+    iterator = iter(values)
+    while chunk := tuple(itertools.islice(iterator, size)): yield chunk
+
+
+def _lookupForms(tokens, lemmas = False):
+    '''
+    Find the form IDs of many word-like tokens with the same result as `_lookupForm()` for each token, but in one statement per chunk of tokens.
+
+    [ARGUMENTS]:
+    - `tokens` (iterable) : Word-like tokens.
+    - `lemmas` (bool) OPTIONAL : Whether the distinct lemma IDs of the matching forms are returned instead of form IDs, in the order of the forms. Glob patterns are not supported in this mode.
+
+    [RETURNS]:
+    - `output` (dict) : Integer form (or lemma) IDs (tuple) or `None` for each distinct token.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    output = {}
+    queries = {}
+    for token in set(tokens):
+        # the same validity check and `Ў` replacement as in `_lookupForm()`
+        if any(character for character in token if character not in validQueryCharacters): output[token] = None; continue
+        # glob patterns can't be matched in bulk (word-like tokens never contain them)
+        if any(character in token for character in '*?['): output[token] = _lookupForm(token) if not lemmas else None; continue
+        if token.startswith('ў'): queries[token] = 'у' + token[1:]
+        elif token.startswith('Ў'): queries[token] = 'У' + token[1:]
+        else: queries[token] = token
+
+    # forms are found in the shared lexicon without a database search, see `shareLexicon()`
+    with _usedLexicon() as lexicon:
+        if lexicon is not None:
+            for token, query in queries.items(): output[token] = _lexiconLookup(lexicon, query, lemmas)
+            return output
+
+    stopWordSQL = f' AND +LemID NOT IN ({_settings()['stopWords']['String']}){_lemmaExistsSQL}' if _settings()['stopWords']['String'] else ''
+    rows = {}
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+            for chunk in _chunks(sorted(set([query.lower() for query in queries.values()]))):
+                lowercaseSQL = ', '.join(["'" + lowercase.replace("'", "''") + "'" for lowercase in chunk])
+                # the same order as in `_lookupForm()`
+                for formID, form, lowercase, lemID in _query(cursor, f'SELECT ID, Form, Lowercase, LemID FROM Form WHERE Lowercase IN ({lowercaseSQL}){stopWordSQL} ORDER BY Form, LemID, ID', 'all'):
+                    rows.setdefault(lowercase, []).append((lemID if lemmas else formID, form))
+
+    except sqlite3.Error as exception:
+        return exception
+
+    # case-sensitive matches take precedence
+    for token, query in queries.items():
+        matches = rows.get(query.lower(), [])
+        output[token] = tuple([matchID for matchID, form in matches if form == query]) or tuple([matchID for matchID, form in matches]) or None
+        if lemmas and output[token]: output[token] = tuple(dict.fromkeys(output[token]))
+
+    return output
+
+
+def _conlluValues(cursor, formIDs, includeForm = False):
+    '''
+    Read precomputed CoNLL-U values of forms from `Conllu` table, see `buildConlluTable()`, with the same result as `formByID()` with `toConllu == True`.
+
+    [ARGUMENTS]:
+    - `cursor` (sqlite3.Cursor) : Cursor of an open database connection.
+    - `formIDs` (iterable) : Integer form IDs.
+    - `includeForm` (bool) OPTIONAL : Whether `FORM` value is included in the output.
+
+    [RETURNS]:
+    - `output` (dict) : CoNLL-U values for each form ID that is in the table.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    output = {}
+    formIDSQL = ', '.join([str(formID) for formID in formIDs])
+
+    if includeForm == True: rows = _query(cursor, f'SELECT Conllu.ID, Form.Form, Conllu.LEMMA, Conllu.UPOS, Conllu.FEATS FROM Conllu JOIN Form ON Form.ID = Conllu.ID WHERE Conllu.ID IN ({formIDSQL})', 'all')
+    else: rows = _query(cursor, f'SELECT ID, NULL, LEMMA, UPOS, FEATS FROM Conllu WHERE ID IN ({formIDSQL})', 'all')
+
+    for formID, form, lemma, upos, feats in rows:
+        value = {'FORM': form} if includeForm == True else {}
+        value['LEMMA'] = lemma
+        # `UPOS` is omitted if the lemma has no part of speech
+        if upos: value['UPOS'] = upos
+        value['FEATS'] = feats
+        output[formID] = value
+
+    return output
+
+
+def _formsByIDs(formIDs, toConllu = False):
+    '''
+    Request the data of many forms with the same result as `formByID()` for each form (with `includeForm == False` if `toConllu == True`), but in a few statements per chunk of form IDs.
+
+    [ARGUMENTS]:
+    - `formIDs` (iterable) : Integer form IDs.
+    - `toConllu` (bool) OPTIONAL : Output format, see `formByID()`.
+
+    [RETURNS]:
+    - `output` (dict) : `formByID()` output for each existing form ID.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    output = {}
+
+    # read CoNLL-U values from the shared lexicon if it is loaded, see `shareLexicon()`
+    with _usedLexicon(toConllu == True) as lexicon:
+        if lexicon is not None:
+            for formID in set(formIDs):
+                conllu = _lexiconConllu(lexicon, formID)
+                if conllu is not None: output[formID] = conllu
+            return output
+
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+            for chunk in _chunks(sorted(set(formIDs))):
+                # read precomputed CoNLL-U values if `Conllu` table was built
+                if toConllu == True and _settings()['conlluTable'] == True:
+                    output.update(_conlluValues(cursor, chunk))
+                    continue
+
+                formIDSQL = ', '.join([str(formID) for formID in chunk])
+                formValues = _query(cursor, f'SELECT {DBcolumns['SQL']['form']} FROM Form WHERE ID IN ({formIDSQL})', 'all')
+                if not formValues: continue
+                lemIDSQL = ', '.join(set([str(formValue[1]) for formValue in formValues]))
+                lemValues = {lemValue[0]: lemValue for lemValue in _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID IN ({lemIDSQL})', 'all')}
+
+                if toConllu == True:
+                    for formValue in formValues:
+                        if formValue[1] in lemValues: output[formValue[0]] = _conllify(formValue, lemValues[formValue[1]], includeForm = False)
+                else:
+                    varIDSQL = ', '.join(set([str(formValue[2]) for formValue in formValues]))
+                    varValues = dict(_query(cursor, f'SELECT ID, Variant FROM Variant WHERE ID IN ({varIDSQL})', 'all'))
+                    for formValue in formValues:
+                        if formValue[1] in lemValues and formValue[2] in varValues:
+                            output[formValue[0]] = {'FormData': _UDify(formValue, 'f'), 'LemmaData': _UDify(lemValues[formValue[1]], 'l'), 'Variant': varValues[formValue[2]]}
+
+    except sqlite3.Error as exception:
+        return exception
+
+    return output
+
+
+def _distinctConllu(formIDs):
+    '''
+    Request the CoNLL-U values of a token's matches from `Conllu` table, with the same result as `formByID()` with `toConllu == True` and `includeForm == False`
+    for each form followed by skipping duplicates, but in one statement. Duplicates are skipped by their `LEMMA`, `UPOS` & `FEATS` values.
+
+    [ARGUMENTS]:
+    - `formIDs` (iterable) : Integer form IDs in match order.
+
+    [RETURNS]:
+    - `output` (list) : Distinct values in the order of their first match, with `None` in place of forms missing from the table.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    output, added = ([], set())
+
+    try:
+        with _connect() as connection: values = _conlluValues(connection.cursor(), formIDs)
+    except sqlite3.Error as exception:
+        return exception
+
+    for formID in formIDs:
+        value = values.get(formID)
+        key = (value['LEMMA'], value.get('UPOS'), value['FEATS']) if value is not None else None
+        if key in added: continue
+        added.add(key)
+        output.append(value)
+
+    return output
+
+
+def _formAnalyses(formIDs):
+    '''
+    Request lemma IDs and CoNLL-U `UPOS` & `FEATS` values of many forms, with the same values as `formByID()` with `toConllu == True`, in a few statements per chunk of form IDs.
+
+    [ARGUMENTS]:
+    - `formIDs` (iterable) : Integer form IDs.
+
+    [RETURNS]:
+    - `output` (dict) : `(lemID, upos, feats)` tuple for each existing form ID, `upos` is '_' if the lemma has no part of speech.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+
+    [USAGE]:
+    This function is used as an interim operation in `annotateToArrays()` and is not intended for stand-alone use.
+    '''
+    output = {}
+
+    # read lemma IDs and CoNLL-U values from the shared lexicon if it is loaded, see `shareLexicon()`
+    with _usedLexicon() as lexicon:
+        if lexicon is not None:
+            forms = lexicon['Tables']['Forms']
+            for formID in set(formIDs):
+                conllu = _lexiconConllu(lexicon, formID)
+                if conllu is not None: output[formID] = (forms[formID * 2], conllu.get('UPOS', '_'), conllu['FEATS'])
+            return output
+
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+            for chunk in _chunks(sorted(set(formIDs))):
+                formIDSQL = ', '.join([str(formID) for formID in chunk])
+
+                # read precomputed CoNLL-U values if `Conllu` table was built, see `buildConlluTable()`
+                if _settings()['conlluTable'] == True:
+                    for formID, lemID, upos, feats in _query(cursor, f'SELECT Conllu.ID, Form.LemID, Conllu.UPOS, Conllu.FEATS FROM Conllu JOIN Form ON Form.ID = Conllu.ID WHERE Conllu.ID IN ({formIDSQL})', 'all'):
+                        output[formID] = (lemID, upos or '_', feats)
+                    continue
+
+                formValues = _query(cursor, f'SELECT {DBcolumns['SQL']['form']} FROM Form WHERE ID IN ({formIDSQL})', 'all')
+                if not formValues: continue
+                lemIDSQL = ', '.join(set([str(formValue[1]) for formValue in formValues]))
+                lemValues = {lemValue[0]: lemValue for lemValue in _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID IN ({lemIDSQL})', 'all')}
+
+                for formValue in formValues:
+                    if formValue[1] in lemValues:
+                        conllu = _conllify(formValue, lemValues[formValue[1]], includeForm = False)
+                        output[formValue[0]] = (formValue[1], conllu.get('UPOS', '_'), conllu['FEATS'])
+
+    except sqlite3.Error as exception:
+        return exception
+
+    return output
+
+
+@_timed('prefetch')
+def _prefetch(tokens, toConllu = False):
+    '''
+    Look up word-like tokens and request the data of all their forms in bulk, so that `annotateToken()` can use it instead of per-token statements.
+
+    [ARGUMENTS]:
+    - `tokens` (iterable) : Word-like tokens.
+    - `toConllu` (bool) OPTIONAL : Output format of form data, see `formByID()`.
+
+    [RETURNS]:
+    - `output` (dict) : Prefetched data with the following keys:
+        - `Lookup` (dict) : `_lookupForm()` output for each token.
+        - `Forms` (dict) : `formByID()` output for each found form ID.
+        - `toConllu` (bool) : Output format of form data.
+    OR
+    - `None` (NoneType) : Returned if the database could not be read.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    lookup = _lookupForms(tokens)
+    if not isinstance(lookup, dict): return None
+    forms = _formsByIDs([formID for formIDs in lookup.values() if formIDs for formID in formIDs], toConllu)
+    if not isinstance(forms, dict): return None
+
+    return {'Lookup': lookup, 'Forms': forms, 'toConllu': toConllu}
+
+
+@contextlib.contextmanager
+def _prefetchedData(prefetched):
+    '''
+    Let `annotateToken()` read data prefetched by `_prefetch()` in the current thread, e.g. data of a batch of texts looked up in another thread, instead of per-token statements.
+    Tokens missing from the prefetched data, or all tokens if it is `None`, are looked up as usual.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    _threadData.prefetched = prefetched
+    try: yield
+    finally: _threadData.prefetched = None
+
+
+
+# UTILITY FUNCTIONS
+
+def setStopWords():
+    '''
+    Set stop-words, i.e. the list of comma-separated lemma IDs in string format, to be excluded from database search results. 
+    
+    [ARGUMENTS]:
+    - `lemIDlist` (NoneType, tuple, str) : Stop-word list source. If not specified, the default `stopWordsPath` value is used as the file path. Defaults can be modified using `config.ini`.
+      [VALUE OPTIONS]:
+        - File path (str) : OS path to a TXT file with comma-separated lemma IDs.
+        - IDs (tuple) - Lemma IDs in integer format.
+        - `None` (NoneType) - Removes all stop words.
+
+    [RETURNS]:
+    - `stopWords` VAR VALUE (dict) : Populates `stopWords` value with a dictionary with the following keys:
+        - `List` (list) : The list of integers.
+        - `String` (str) : The list in string format to be appended to SQL search statements.  
+    '''
+    global stopWords
+    
+    if lemIDs == None:
+        stopWords = {'List': [], 'String': ''}
+        return 'The stop-word list was emptied.'
+        
+    elif isinstance(lemIDs, tuple):
+        lemIDlist = sorted(list(set([lemID for lemID in lemIDs if isinstance(lemID, int)])))
+        if not lemIDlist:
+            return 'The stop-word list was not updated: No valid values were found.'
+        else:
+            stopWords = {'List': lemIDlist,
+                         'String': ', '.join([str(lemID) for lemID in lemIDlist])}
+            if len(lemIDs) != len(lemIDlist):
+                return 'The stop-word list was updated. Some of the submitted values were removed due to duplication or invalid format.'
+            else:
+                return 'The stop-word list was updated.'
+   
+    elif isinstance(lemIDs, str) and lemIDs.endswith('.txt'):
+        if not os.path.exists(lemIDs):
+            return 'The stop-word list was not updated. Invalid file path.'
+        else:
+            with open(lemIDs, 'r+', encoding = 'utf-8') as file:
+                fileContents = file.read()
+                fileList = [item.strip() for item in fileContents.split(',')]
+                lemIDlist = sorted(list(set([int(lemID) for lemID in fileList if lemID.isdigit()])))
+                             
+            if not lemIDlist:
+                return f'The stop-word list was not updated with values from {os.path.abspath(lemIDs)}. No valid values were found.'
+            else:
+                stopWords = {'List': lemIDlist,
+                             'String': ', '.join([str(lemID) for lemID in lemIDlist])}
+                if len(fileList) != len(lemIDlist):
+                    return f'The stop-word list was updated with values from {os.path.abspath(lemIDs)}. Some values were removed due to duplication or invalid format.'
+                else:
+                    return f'The stop-word list was updated with values from {os.path.abspath(lemIDs)}.'
+
+    else:
+        return 'Unsupported list format.'
+
+    return message
+
+
+def accentuate(form, accentData):
+    '''
+    Add word stress diacritic marks to a word form. The mark used is Unicode `\u0301`.
+
+    [ARGUMENTS]:
+    - `form` (str) : Word form as it is stored in `Form` column of `Form` database table and outputted under ['FormData']['Form'] key of a form dictionary.
+    - `accentData` (str) : Accent position data as it is stored in `Accent` column of Form table and outputted under ['FormData']['Accent'] key of a form dictionary. Numbering starts with 1.
+
+    [RETURNS]:
+    - `accentedForm` (str) : The inputted word form with diacritic marks.
+    OR
+    - `None` (NoneType) : Returned if the submitted data is invalid.
+    '''
+    # validate arguments
+    if not isinstance(form, str): return None
+    if (isinstance(accentData, str) and any(c for c in accentData if c not in '0123456789-')) or (isinstance(accentData, int)) or (accentData in (0, '0')): return None
+    
+    accentedForm = None
+
+    # simple word stress
+    if '-' not in form and '-' not in accentData:
+        if len(form) >= int(accentData):
+            accentedForm = ''.join([form[:int(accentData)], u'\u0301', form[int(accentData):]])
+    # compound word stress
+    else:
+        positions = [int(p) for p in accentData.split('-')]
+        parts = form.split('-')
+        if (len(parts) != len(positions)) or (all(p == 0 for p in positions)): return None
+            
+        accentedParts = ()
+        for i, position in enumerate(positions):
+            if position != 0: accentedParts += (''.join([parts[i][:position], u'\u0301', parts[i][position:]])),
+            else: accentedParts += (parts[i]),
+                
+        accentedForm = '-'.join(accentedParts)
+
+    return accentedForm
+
+
+def _stressAll(token, variants):
+    '''
+    Add the word stress marks of all accent data variants to a word-like token, see `accentuate()`. Invalid or mismatching variants are ignored.
+    '''
+    parts = token.split('-')
+    marks = [set() for _ in parts]
+    for accentData in variants:
+        if any(character not in '0123456789-' for character in accentData): continue
+        positions = accentData.split('-')
+        if len(positions) != len(parts): continue
+        for i, position in enumerate(positions):
+            if position and 0 < int(position) <= len(parts[i]): marks[i].add(int(position))
+
+    return '-'.join([''.join([character + u'\u0301' if j + 1 in marks[i] else character for j, character in enumerate(part)]) for i, part in enumerate(parts)])
+
+
+def accentuateText(text, ambiguity = 'first'):
+    '''
+    Add word stress diacritic marks to all words of a plain text, e.g. for text-to-speech. The mark used is Unicode `\u0301`.
+    The accent data of all distinct word types is requested in bulk, with a few statements for all of them, and is kept in the token cache if it is enabled (see `setCacheSize()`).
+    Words are matched as in `annotateToken()`: case-sensitive matches if there are any, otherwise case-insensitive matches, without stop words. 
+    Everything but the stressed words, including spacing and line breaks, is kept as it is.
+
+    [ARGUMENTS]:
+    - `text` (str) : Plain text.
+    - `ambiguity` (str) OPTIONAL : How words with different word stress in different matches (e.g. homographs) are stressed.
+      [VALUE OPTIONS]:
+        - 'first' DEFAULT : The stress of the first match, in the order of `formSearch()` results.
+        - 'all' : The stress marks of all matches are added to the word.
+        - 'skip' : The word is left without stress marks.
+
+    [RETURNS]:
+    - `output` (str) : The text with stress marks. Words without matches or accent data are left as they are.
+    OR
+    - `None` (NoneType) : Returned if an argument is invalid.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    if not isinstance(text, str) or ambiguity not in ('first', 'all', 'skip'): return None
+
+    lines = text.split('\n')
+    tokenized = [tokenize(line) for line in lines]
+    words = set([token for tokens in tokenized for token in tokens if re.fullmatch(tokenCategories['word'], token)])
+
+    # CACHED ACCENT DATA
+    tokenCache = _cacheState()
+    # stop words are a part of cache keys, since they change the matches
+    databaseFile, stopWords = (_settings().get('databaseFile'), _settings()['stopWords']['String'])
+    accents = {}
+    if tokenCache['Size']:
+        with tokenCache['Lock']:
+            for word in words:
+                cached = tokenCache['Accents'].get((word, databaseFile, stopWords))
+                if cached is not None:
+                    accents[word] = cached
+                    tokenCache['Accents'].move_to_end((word, databaseFile, stopWords))
+
+    # BULK DATABASE LOOKUP
+    missing = words - accents.keys()
+    if missing:
+        lookup = _lookupForms(missing)
+        if not isinstance(lookup, dict): return lookup
+        accentValues = {}
+        try:
+            with _connect() as connection:
+                cursor = connection.cursor()
+                for chunk in _chunks(sorted(set([formID for formIDs in lookup.values() if formIDs for formID in formIDs]))):
+                    accentValues.update(_query(cursor, f'SELECT ID, Accent FROM Form WHERE ID IN ({', '.join([str(formID) for formID in chunk])})', 'all'))
+        except sqlite3.Error as exception:
+            return exception
+
+        # distinct accent data of the matches in match order
+        for word in missing: accents[word] = tuple(dict.fromkeys([str(accentValues[formID]) for formID in lookup[word] or () if accentValues.get(formID)]))
+
+        if tokenCache['Size']:
+            with tokenCache['Lock']:
+                for word in missing: tokenCache['Accents'][(word, databaseFile, stopWords)] = accents[word]
+                while len(tokenCache['Accents']) > tokenCache['Size']: tokenCache['Accents'].popitem(last = False)
+
+    # STRESSED TEXT
+    stressed = {}
+    for word, variants in accents.items():
+        if not variants or (len(variants) > 1 and ambiguity == 'skip'): continue
+        if len(variants) > 1 and ambiguity == 'all': stressed[word] = _stressAll(word, variants)
+        # matches can differ from the word in letter case only, so the stress positions are the same
+        else: stressed[word] = accentuate(word, variants[0]) or word
+
+    output = []
+    for line, tokens in zip(lines, tokenized):
+        # tokens cover the stripped line without gaps
+        stripped = line.strip()
+        start = line.find(stripped) if stripped else len(line)
+        output.append(line[:start] + ''.join([stressed.get(token, token) for token in tokens]) + line[start + len(stripped):])
+
+    return '\n'.join(output)
+
+
+def exportCSV(data, level, directory = defaults.get('exportDirectory'), compression = None, flushSize = 10000):
+    '''
+    Export `formSearch()` or `lemmaSearch()` search results into a CSV file in the specified directory of local file system.
+    Results are converted and written incrementally, `flushSize` rows at a time, so any iterable of results, e.g. a generator, can be exported with constant memory use.
+     
+    [ARGUMENTS]:
+    - `data` (iterable) : `formSearch()` or `lemmaSearch()` functions' output, or any other iterable of their search results.
+    - `level` (str) : Input data structure.
+      [VALUE OPTIONS]:
+        - 'f' : Form, for `formSearch()` results.
+        - 'l' : Lemma, for `lemmaSearch()` results.
+    - `directory` (str) OPTIONAL : OS path to the target directory. If not specified, the default `exportPath` value is used.
+    - `compression` (str) OPTIONAL : File compression.
+      [VALUE OPTIONS]:
+        - `None` DEFAULT : Plain CSV file.
+        - 'gzip' : gzip-compressed file with `.csv.gz` extension.
+        - 'xz' : xz-compressed file with `.csv.xz` extension, smaller but slower to write.
+    - `flushSize` (int) OPTIONAL : The number of rows converted and written at a time, `10000` by default.
+
+    [RETURNS]:
+    `Slounik_Export_{YYYY-MM-DD_HH-MM-SS}.csv` (File) OS : CSV file with the inputted data generated in the specified directory of local file system.
+    OR
+    - `message` (str) : Returned if an argument is invalid.
+    '''
+    columns = ('Lemma_ID', 
+               'Lemma', 
+               'POS',
+               'Lemma_Type',
+               'Lemma_InflClass',
+               'Lemma_Degree',
+               'Lemma_Person',
+               'Lemma_Gender',
+               'Lemma_Voice',
+               'Lemma_Tense',
+               'Lemma_Aspect',
+               'Lemma_Animacy',
+               'Lemma_Abbr',
+               'Lemma_NumForm',
+               'Lemma_VerbForm',
+               'Lemma_Personal',
+               'Lemma_Origin',
+               'Lemma_Poss',
+               'Lemma_Reflex',
+               'Lemma_SubCat',
+               'Variant',
+               'Form_ID',
+               'Form',
+               'Form_Accent',
+               'Form_Gender',
+               'Form_Person',
+               'Form_Cas',
+               'Form_Number',
+               'Form_Degree',
+               'Form_Tense',
+               'Form_Mood',
+               'Form_VerbForm',
+               'Form_Animacy',
+               'Form_Short')
+    # file openers by compression format, all in text mode
+    openers = {None: (open, '.csv'), 'gzip': (gzip.open, '.csv.gz'), 'xz': (lzma.open, '.csv.xz')}
+    
+    #VALIDITY CHECK
+    if not directory or not os.path.exists(directory): return 'Invalid directory path.'
+    if isinstance(data, (str, bytes, dict)) or not hasattr(data, '__iter__'): return 'Invalid data format.'
+    if compression not in openers: return 'Invalid compression format.'
+    if not isinstance(flushSize, int) or flushSize < 1: return 'Invalid flush size.'
+
+    # form attributes exported as columns, excluding redundant LemID and VarID
+    formAttributes = [formAttribute for i, formAttribute in enumerate(DBcolumns['schema']['form']) if i not in (1, 2)]
+
+    def _makeRow(result, mode):
+        '''
+        Convert a single search result into a list mapped to CSV file row.
+
+        [ARGUMENTS]:
+        - `result` (dict) : The search result of `formSearch()` or `lemSearch()` function.
+        - `mode` (str) : The flag that determines the data structure.
+          [VALUE OPTIONS]:
+            - 'f' - Form, for `formSearch()` results
+            - 'l' - Lemma, for `lemmaSearch()` results
+        
+        [RETURNS]:
+        - `row` (list) : CSV table row.
+
+        [USAGE]:
+        This function is used as an interim operation in `exportCSV()` and is not intended for stand-alone use.
+        '''
+        # FORM LEVEL - combines Form & Lemma attributes
+        if mode == 'f':
+            # lemma attribute columns correspond to lemSchema, including empty, then the variant value and form attribute columns corresponding to formSchema
+            return ([result['LemmaData'].get(lemAttribute) for lemAttribute in DBcolumns['schema']['lemma']]
+                    + [result['Variant']]
+                    + [result['FormData'].get(formAttribute) for formAttribute in formAttributes])
+    
+        # LEMMA LEVEL
+        elif mode == 'l':
+            # lemma attribute columns correspond to lemSchema, including empty; form attributes are empty by definition
+            return [result.get(attribute) for attribute in DBcolumns['schema']['lemma']] + [None] * 14
+
+        return []
+
+    # GENERATE FILE
+    opener, extension = openers[compression]
+    filename = os.path.join(directory, ''.join(('Slounik_Export_', datetime.now().strftime('%Y-%m-%d_%H-%M-%S'), extension)))
+    
+    with opener(filename, 'wt', newline='', encoding='utf-8') as file:
+        wr = csv.writer(file, delimiter=',')
+        wr.writerow(columns)
+        # only one chunk of converted rows is kept in memory at a time
+        for chunk in _chunks(data, flushSize): wr.writerows([_makeRow(entry, level) for entry in chunk])
+
+    print(f'{os.path.abspath(filename)} was created.')
+
+
+def buildConlluTable():
+    '''
+    Precompute CoNLL-U `LEMMA`, `UPOS` & `FEATS` values for every form and store them in `Conllu` table of the database file. 
+    Once the table exists, `formByID()` with `toConllu == True` (and thus CoNLL-U annotation) reads these values directly instead of formatting them on every call.
+    The table has to be rebuilt if `Form` or `Lemma` tables are modified. If the database is loaded into memory, it is reloaded afterwards, see `loadMemoryDatabase()`.
+    Called from an `Analyzer` method, the table is built in the database file of the analyzer; its read-only settings are not updated, so a new `Analyzer` has to be created to use the table.
+
+    [RETURNS]:
+    - `message` (str) : The number of stored forms.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be updated.
+    '''
+    formColumns = ', '.join([f'Form.{column}' for column in DBcolumns['schema']['form']])
+    lemColumns = ', '.join([f'Lemma.{column}' for column in DBcolumns['schema']['lemma']])
+    databaseFile = _settings()['databaseFile']
+    formCount = 0
+
+    try:
+        # the database file itself is written to, not its in-memory copy
+        with sqlite3.connect(databaseFile) as connection:
+            readCursor = connection.cursor()
+            writeCursor = connection.cursor()
+            
+            _query(writeCursor, 'DROP TABLE IF EXISTS Conllu', None)
+            _query(writeCursor, 'CREATE TABLE Conllu (ID INTEGER PRIMARY KEY, LEMMA TEXT, UPOS TEXT, FEATS TEXT)', None)
+
+            # convert form & lemma rows in batches to keep memory usage flat
+            _query(readCursor, f'SELECT {formColumns}, {lemColumns} FROM Form JOIN Lemma ON Form.LemID = Lemma.ID', None)
+            for rows in _fetchBatches(readCursor):
+                values = []
+                for row in rows:
+                    conlluValue = _conllify(row[:len(DBcolumns['schema']['form'])], row[len(DBcolumns['schema']['form']):], includeForm = False)
+                    values.append((row[0], conlluValue['LEMMA'], conlluValue.get('UPOS'), conlluValue['FEATS']))
+                writeCursor.executemany('INSERT INTO Conllu VALUES (?, ?, ?, ?)', values)
+                formCount += len(values)
+
+    except sqlite3.Error as exception:
+        return exception
+
+    if databaseFile == defaults['databaseFile']: defaults['conlluTable'] = True
+    if memoryDatabase and memoryDatabase['File'] == databaseFile: loadMemoryDatabase()
+
+    return f'CoNLL-U values of {formCount} forms were stored in `Conllu` table.'
+
+
+
+
+# FORM FILTER
+# Bloom filter over `Lowercase` column of `Form` table, used to skip database search for out-of-vocabulary tokens
+formFilter = None
+
+def _databaseSignature(databaseFile = None):
+    '''
+    Identify the current database file state by its size and modification time, so that a stale form filter or token cache snapshot is not loaded.
+
+    [ARGUMENTS]:
+    - `databaseFile` (str) OPTIONAL : Database file path. If not specified, `defaults['databaseFile']` is used.
+
+    [RETURNS]:
+    - `signature` (tuple) : File size and modification time in nanoseconds.
+
+    [USAGE]:
+    This function is used as an interim operation in form filter and token cache functions and is not intended for stand-alone use.
+    '''
+    status = os.stat(databaseFile or defaults['databaseFile'])
+
+    return (status.st_size, status.st_mtime_ns)
+
+
+def buildFormFilter(falsePositiveRate = defaults['formFilterRate'], path = None):
+    '''
+    Build the form filter, a Bloom filter of all lowercase forms in the database. 
+    While it is loaded, `annotateToken()` skips database search for word-like tokens that are definitely not in the database. 
+    Tokens that are in the database always pass, and a small share of other tokens (false positives) are searched as usual, so the annotation is unaffected.
+
+    [ARGUMENTS]:
+    - `falsePositiveRate` (float) OPTIONAL : Target share of out-of-vocabulary tokens that pass the filter. Lower values take more memory. The default is set in `config.ini`.
+    - `path` (str) OPTIONAL : OS path to save the filter snapshot to, see `saveFormFilter()`.
+
+    [RETURNS]:
+    - `message` (str) : Filter size summary.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    global formFilter
+
+    if not (isinstance(falsePositiveRate, float) and 0 < falsePositiveRate < 1): return 'Invalid false-positive rate.'
+
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+            count = _query(cursor, 'SELECT COUNT(DISTINCT Lowercase) FROM Form', 'one')[0]
+
+            # optimal bit array size and number of hash functions for the target rate
+            size = max(8, math.ceil(-count * math.log(falsePositiveRate) / math.log(2) ** 2))
+            hashes = max(1, round(size / max(count, 1) * math.log(2)))
+            bits = bytearray((size + 7) // 8)
+
+            _query(cursor, 'SELECT DISTINCT Lowercase FROM Form', None)
+            for rows in _fetchBatches(cursor):
+                for row in rows:
+                    for position in _filterPositions(row[0], size, hashes): bits[position >> 3] |= 1 << (position & 7)
+
+    except sqlite3.Error as exception:
+        return exception
+
+    formFilter = {'Bits': bits, 'Size': size, 'Hashes': hashes, 'Count': count, 'Signature': _databaseSignature(), 'File': defaults['databaseFile']}
+    
+    if path: saveFormFilter(path)
+
+    return f'The form filter was built: {count} forms, {len(bits)} bytes.'
+
+
+def saveFormFilter(path = defaults['formFilterFile']):
+    '''
+    Save the loaded form filter to a snapshot file, so that it does not have to be rebuilt on import.
+
+    [ARGUMENTS]:
+    - `path` (str) OPTIONAL : OS path to the snapshot file. If not specified, the default `formFilterPath` value from `config.ini` is used.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation or error message.
+    '''
+    if formFilter is None: return 'The form filter is not loaded.'
+
+    with open(path, 'wb') as file:
+        file.write(struct.pack('<4sQQQqq', b'SLFF', formFilter['Size'], formFilter['Hashes'], formFilter['Count'], *formFilter['Signature']))
+        file.write(formFilter['Bits'])
+
+    return f'{os.path.abspath(path)} was created.'
+
+
+def loadFormFilter(path = defaults['formFilterFile']):
+    '''
+    Load the form filter from a snapshot file created by `saveFormFilter()`. Snapshots of a different database file state are rejected.
+
+    [ARGUMENTS]:
+    - `path` (str) OPTIONAL : OS path to the snapshot file. If not specified, the default `formFilterPath` value from `config.ini` is used.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation or error message.
+    '''
+    global formFilter
+
+    if not os.path.exists(path): return 'The form filter was not loaded. Invalid file path.'
+
+    with open(path, 'rb') as file:
+        header = file.read(struct.calcsize('<4sQQQqq'))
+        bits = bytearray(file.read())
+
+    if len(header) != struct.calcsize('<4sQQQqq') or header[:4] != b'SLFF': return 'The form filter was not loaded. Invalid file format.'
+    magic, size, hashes, count, *signature = struct.unpack('<4sQQQqq', header)
+    if tuple(signature) != _databaseSignature(): return 'The form filter was not loaded. The snapshot does not match the database file.'
+    if len(bits) != (size + 7) // 8: return 'The form filter was not loaded. Invalid file format.'
+
+    formFilter = {'Bits': bits, 'Size': size, 'Hashes': hashes, 'Count': count, 'Signature': tuple(signature), 'File': defaults['databaseFile']}
+
+    return f'The form filter was loaded from {os.path.abspath(path)}.'
+
+
+def formFilterInfo():
+    '''
+    Describe the loaded form filter.
+
+    [RETURNS]:
+    - `output` (dict) : Filter parameters with the following keys:
+        - `Forms` (int) : The number of distinct lowercase forms in the filter.
+        - `Bits` (int) : Bit array size.
+        - `Hashes` (int) : The number of bit positions per form.
+        - `Bytes` (int) : Memory taken by the bit array.
+        - `FalsePositiveRate` (float) : Expected share of out-of-vocabulary tokens that pass the filter.
+    OR
+    - `None` (NoneType) : Returned if the form filter is not loaded.
+    '''
+    if formFilter is None: return None
+
+    falsePositiveRate = (1 - math.exp(-formFilter['Hashes'] * formFilter['Count'] / formFilter['Size'])) ** formFilter['Hashes']
+
+    return {'Forms': formFilter['Count'], 
+            'Bits': formFilter['Size'], 
+            'Hashes': formFilter['Hashes'], 
+            'Bytes': len(formFilter['Bits']), 
+            'FalsePositiveRate': falsePositiveRate}
+
+
+def dropFormFilter():
+    '''
+    Unload the form filter, so that every word-like token is searched in the database.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    global formFilter
+    formFilter = None
+
+    return 'The form filter was unloaded.'
+
+
+
+# SHARED LEXICON
+# form lookup rows and CoNLL-U values of all forms in one `multiprocessing.shared_memory` block, built once by a parent process and read by its worker processes
+# instead of the database: every distinct string is stored once in a string table, and keys, rows and forms are native uint32 tables, so the block is read without parsing
+_lexiconHeader = '=4sIIIIII'
+# code of an absent form
+_lexiconNone = 0xFFFFFFFF
+sharedLexicon = None
+# guards `sharedLexicon` and the number of calls reading each lexicon, see `_usedLexicon()`
+_lexiconLock = threading.Lock()
+
+def _openLexicon(block, owner):
+    '''
+    Map the tables of a shared lexicon block, see `shareLexicon()`.
+
+    [ARGUMENTS]:
+    - `block` (SharedMemory) : Shared memory block.
+    - `owner` (bool) : Whether the block was created by the current process, so that it is removed by `dropLexicon()`.
+
+    [RETURNS]:
+    - `lexicon` (dict) : Lexicon state with `Block`, `Name`, `File`, `Owner`, `PID`, `Tables`, `Blob`, `Counts`, `Users` and `Dropped` keys.
+    OR
+    - `None` (NoneType) : Returned if the block has an invalid format.
+
+    [USAGE]:
+    This function is used as an interim operation in shared lexicon functions and is not intended for stand-alone use.
+    '''
+    view = block.buf
+    headerSize = struct.calcsize(_lexiconHeader)
+    if len(view) < headerSize: return None
+    magic, version, strings, blobSize, keys, rows, forms = struct.unpack_from(_lexiconHeader, view)
+    if magic != b'SLLX' or version != 1: return None
+
+    # uint32 tables in block order; blocks can be rounded up to the page size
+    sizes = (('StringOffsets', strings + 1), ('Keys', keys), ('KeyStarts', keys + 1), ('Rows', rows * 3), ('Forms', forms * 2))
+    if len(view) < headerSize + sum([size for _, size in sizes]) * 4 + blobSize: return None
+    tables = {}
+    position = headerSize
+    for name, size in sizes:
+        tables[name] = view[position:position + size * 4].cast('I')
+        position += size * 4
+
+    lexicon = {'Block': block, 'Name': block.name, 'Owner': owner, 'PID': os.getpid(), 'Tables': tables, 'Blob': view[position:position + blobSize],
+               'Counts': {'Keys': keys, 'Rows': rows, 'Strings': strings}, 'Users': 0, 'Dropped': False}
+    # the first string is the database file path
+    lexicon['File'] = _lexiconString(lexicon, 0)
+
+    return lexicon
+
+
+def _lexiconString(lexicon, code):
+    offsets = lexicon['Tables']['StringOffsets']
+    return str(lexicon['Blob'][offsets[code]:offsets[code + 1]], 'utf-8')
+
+
+@contextlib.contextmanager
+def _usedLexicon(enabled = True):
+    '''
+    Use the shared lexicon if it describes the database of the current call. The lexicon stays readable until the block ends, even if it is dropped by another thread meanwhile.
+
+    [ARGUMENTS]:
+    - `enabled` (bool) OPTIONAL : Whether the lexicon is used; if not, `None` is provided.
+
+    [RETURNS]:
+    - `lexicon` (dict) : Shared lexicon, see `_openLexicon()`.
+    OR
+    - `None` (NoneType) : Provided if the lexicon is not loaded, not enabled or describes another database.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    lexicon = None
+    if enabled and sharedLexicon is not None:
+        with _lexiconLock:
+            if sharedLexicon is not None and sharedLexicon['File'] == _settings().get('databaseFile'):
+                lexicon = sharedLexicon
+                lexicon['Users'] += 1
+
+    try: yield lexicon
+    finally:
+        if lexicon is not None:
+            with _lexiconLock:
+                lexicon['Users'] -= 1
+                # the last call closes a dropped lexicon
+                if lexicon['Dropped'] and not lexicon['Users']: _closeLexicon(lexicon)
+
+
+def _closeLexicon(lexicon):
+    '''
+    Release the tables of a dropped shared lexicon and close its block. Called with `_lexiconLock` held, once no call reads the lexicon.
+
+    [USAGE]:
+    This function is used as an interim operation in shared lexicon functions and is not intended for stand-alone use.
+    '''
+    # the block can only be closed once no table refers to it
+    for table in lexicon['Tables'].values(): table.release()
+    lexicon['Blob'].release()
+    lexicon['Block'].close()
+
+
+def _setLexicon(lexicon):
+    '''
+    Replace the loaded shared lexicon. The previous lexicon is closed once no call reads it, and its block is removed if the current process built it.
+
+    [ARGUMENTS]:
+    - `lexicon` (dict, NoneType) : The new lexicon, see `_openLexicon()`, or `None`.
+
+    [RETURNS]:
+    - `previous` (dict, NoneType) : The replaced lexicon.
+
+    [USAGE]:
+    This function is used as an interim operation in shared lexicon functions and is not intended for stand-alone use.
+    '''
+    global sharedLexicon
+
+    with _lexiconLock:
+        previous, sharedLexicon = (sharedLexicon, lexicon)
+        if previous is not None:
+            previous['Dropped'] = True
+            if not previous['Users']: _closeLexicon(previous)
+
+    # the name is removed at once, while open mappings stay readable; forked processes inherit the lexicon of the building process, but don't own it
+    if previous is not None and previous['Owner'] and previous['PID'] == os.getpid():
+        # workers sharing the resource tracker of this process may have unregistered the block, see `attachLexicon()`, and `unlink()` unregisters it again
+        if os.name == 'posix': resource_tracker.register(previous['Block']._name, 'shared_memory')
+        previous['Block'].unlink()
+
+    return previous
+
+
+@functools.lru_cache(maxsize = 16)
+def _stopWordIDs(string):
+    '''
+    Convert a stop-word `String` value into a set of lemma IDs, see `defaults`.
+    '''
+    return frozenset([int(lemID) for lemID in string.split(',') if lemID.strip()])
+
+
+def _lexiconLookup(lexicon, token, lemmas = False):
+    '''
+    Find the form IDs of a word-like token in the shared lexicon with the same result as `_lookupForm()`.
+
+    [ARGUMENTS]:
+    - `lexicon` (dict) : Shared lexicon, see `_usedLexicon()`.
+    - `token` (str) : A word-like token without glob characters, after the `Ў` replacement of `_lookupForm()`.
+    - `lemmas` (bool) OPTIONAL : Whether the distinct lemma IDs of the matches are returned instead of form IDs, see `_lookupForms()`.
+
+    [RETURNS]:
+    - `output` (tuple) : Integer form (or lemma) IDs: case-sensitive matches if there are any, otherwise case-insensitive matches.
+    OR
+    - `None` (NoneType) : Returned if there are no matches.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    tables, blob = (lexicon['Tables'], lexicon['Blob'])
+    offsets, keys, starts, rows = (tables['StringOffsets'], tables['Keys'], tables['KeyStarts'], tables['Rows'])
+
+    # binary search over keys sorted by their UTF-8 bytes, like SQLite `BINARY` collation
+    target = token.lower().encode('utf-8')
+    low, high = (0, len(keys))
+    while low < high:
+        middle = (low + high) // 2
+        if blob[offsets[keys[middle]]:offsets[keys[middle] + 1]].tobytes() < target: low = middle + 1
+        else: high = middle
+    if low == len(keys) or blob[offsets[keys[low]]:offsets[keys[low] + 1]] != target: return None
+
+    # stop words are filtered on the lemma ID of each row, together with forms without a lemma row, like in `_lookupForm()`
+    stopWords = _stopWordIDs(_settings()['stopWords']['String'])
+    forms = tables['Forms']
+    matches = [(rows[row + 1] if lemmas else rows[row], rows[row + 2]) for row in range(starts[low] * 3, starts[low + 1] * 3, 3)
+               if not stopWords or (rows[row + 1] not in stopWords and forms[rows[row] * 2] != _lexiconNone)]
+
+    # case-sensitive matches take precedence
+    form = token.encode('utf-8')
+    output = tuple([matchID for matchID, code in matches if blob[offsets[code]:offsets[code + 1]] == form]) or tuple([matchID for matchID, code in matches])
+    if lemmas: output = tuple(dict.fromkeys(output))
+
+    return output if output else None
+
+
+def _lexiconConllu(lexicon, formID):
+    '''
+    Read the CoNLL-U values of a form from the shared lexicon, the same as `formByID()` output with `toConllu == True` and `includeForm == False`.
+
+    [RETURNS]:
+    - `output` (dict) : `LEMMA`, `UPOS` and `FEATS` values, `UPOS` is omitted if the lemma has no part of speech.
+    OR
+    - `None` (NoneType) : Returned if the form is not in the lexicon.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    forms = lexicon['Tables']['Forms']
+    if not 0 <= formID < len(forms) // 2 or forms[formID * 2 + 1] == _lexiconNone: return None
+    lemma, upos, feats = _lexiconString(lexicon, forms[formID * 2 + 1]).split('\t')
+
+    return {'LEMMA': lemma, 'UPOS': upos, 'FEATS': feats} if upos else {'LEMMA': lemma, 'FEATS': feats}
+
+
+def shareLexicon():
+    '''
+    Build the shared lexicon: form lookup rows and CoNLL-U values of all forms in the database, stored in one shared memory block that other processes attach to with `attachLexicon()`.
+    While the lexicon is loaded, `annotateToken()` (and thus text annotation) finds the forms of word-like tokens and, with `toConllu == True`, their CoNLL-U values in the lexicon 
+    instead of searching the database, so worker processes of a pool neither copy the data nor warm up their own SQLite page cache. The annotation is unaffected.
+    Stop words are applied on lookup, so the lexicon serves any stop words. It has to be rebuilt if the database is modified.
+
+    [RETURNS]:
+    - `message` (str) : Lexicon size summary.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    if 'databaseFile' not in defaults: return 'The database file is not set.'
+
+    strings = {defaults['databaseFile']: 0}
+    def code(value):
+        if value not in strings: strings[value] = len(strings)
+        return strings[value]
+
+    keys, keyStarts, rows = (array.array('I'), array.array('I'), array.array('I'))
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+
+            # lookup rows grouped by lowercase form, in the order of `_lookupForm()` results
+            _query(cursor, 'SELECT Lowercase, Form, LemID, ID FROM Form ORDER BY Lowercase, Form, LemID, ID', None)
+            previous = None
+            for response in _fetchBatches(cursor):
+                for lowercase, form, lemID, formID in response:
+                    if lowercase != previous: keys.append(code(lowercase)); keyStarts.append(len(rows) // 3); previous = lowercase
+                    rows.extend((formID, lemID, code(form)))
+            keyStarts.append(len(rows) // 3)
+
+            # `LemID` and CoNLL-U values of every form by form ID, tab-separated with an empty `UPOS` if the lemma has no part of speech
+            forms = array.array('I', [_lexiconNone]) * (((_query(cursor, 'SELECT MAX(ID) FROM Form', 'one')[0] or 0) + 1) * 2)
+            if defaults['conlluTable'] == True:
+                _query(cursor, 'SELECT Conllu.ID, Form.LemID, Conllu.LEMMA, Conllu.UPOS, Conllu.FEATS FROM Conllu JOIN Form ON Form.ID = Conllu.ID', None)
+                for response in _fetchBatches(cursor):
+                    for formID, lemID, lemma, upos, feats in response: forms[formID * 2], forms[formID * 2 + 1] = (lemID, code(f'{lemma}\t{upos or ''}\t{feats}'))
+            else:
+                lemValues = {lemValue[0]: lemValue for lemValue in _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma', 'all')}
+                _query(cursor, f'SELECT {DBcolumns['SQL']['form']} FROM Form', None)
+                for response in _fetchBatches(cursor):
+                    for formValue in response:
+                        if formValue[1] not in lemValues: continue
+                        conllu = _conllify(formValue, lemValues[formValue[1]], includeForm = False)
+                        forms[formValue[0] * 2], forms[formValue[0] * 2 + 1] = (formValue[1], code(f'{conllu['LEMMA']}\t{conllu.get('UPOS', '')}\t{conllu['FEATS']}'))
+
+    except sqlite3.Error as exception:
+        return exception
+
+    blob = bytearray()
+    stringOffsets = array.array('I', [0])
+    for value in strings:
+        blob += value.encode('utf-8')
+        stringOffsets.append(len(blob))
+
+    # GENERATE BLOCK
+    header = struct.pack(_lexiconHeader, b'SLLX', 1, len(strings), len(blob), len(keys), len(rows) // 3, len(forms) // 2)
+    parts = [header] + [memoryview(table).cast('B') for table in (stringOffsets, keys, keyStarts, rows, forms)] + [blob]
+    block = shared_memory.SharedMemory(create = True, size = sum([len(part) for part in parts]))
+    position = 0
+    for part in parts:
+        block.buf[position:position + len(part)] = part
+        position += len(part)
+
+    _setLexicon(_openLexicon(block, owner = True))
+
+    return f'The lexicon was shared: {len(rows) // 3} forms, {block.size} bytes.'
+
+
+def attachLexicon(name):
+    '''
+    Attach to the shared lexicon built by `shareLexicon()` in another process, e.g. in the initializer of a worker process pool. The block is only read and not copied.
+    Processes forked after `shareLexicon()` inherit the lexicon and don't have to attach.
+
+    [ARGUMENTS]:
+    - `name` (str) : Shared memory block name, see `lexiconInfo()`.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation or error message.
+
+    [USAGE]:
+    multiprocessing.Pool(4, initializer = attachLexicon, initargs = (lexiconInfo()['Name'],))
+    '''
+    if not isinstance(name, str) or not name: return 'Invalid block name.'
+    lexicon = sharedLexicon
+    if lexicon is not None and lexicon['Name'] == name: return f'The shared lexicon is attached: {name}'
+
+    try:
+        try: block = shared_memory.SharedMemory(name, track = False)
+        except TypeError:
+            block = shared_memory.SharedMemory(name)
+            # before Python 3.13, attached blocks are registered for cleanup, so the block would be removed when a worker exits
+            if os.name == 'posix': resource_tracker.unregister(block._name, 'shared_memory')
+    except (OSError, ValueError):
+        return 'The shared lexicon was not found.'
+
+    lexicon = _openLexicon(block, owner = False)
+    if lexicon is None: block.close(); return 'Invalid shared lexicon format.'
+    _setLexicon(lexicon)
 
-    return accentedForm
+    return f'The shared lexicon is attached: {name}'
 
 
-def exportCSV(data, level, directory = defaults['exportDirectory']):
+def lexiconInfo():
     '''
-    Export `formSearch()` or `lemmaSearch()` search results into a CSV file in the specified directory of local file system.
-     
-    [ARGUMENTS]:
-    - `data` (dict) : `formSearch()` or `lemmaSearch()` functions' output.
-    - `level` (str) : Input data structure.
-      [VALUE OPTIONS]:
-        - 'f' : Form, for `formSearch()` results.
-        - 'l' : Lemma, for `lemmaSearch()` results.
-    - `path` (str) OPTIONAL : OS path to the target directory. If not specified, the default `exportPath` value is used.
+    Describe the loaded shared lexicon.
 
     [RETURNS]:
-    `Slounik_Export_{YYYY-MM-DD_HH-MM-SS}.csv` (File) OS : CSV file with the inputted data generated in the specified directory of local file system.
+    - `output` (dict) : Lexicon parameters with the following keys:
+        - `Name` (str) : Shared memory block name, passed to `attachLexicon()`.
+        - `File` (str) : The database file the lexicon was built from.
+        - `Forms` (int) : The number of forms.
+        - `LowercaseForms` (int) : The number of distinct lowercase forms.
+        - `Bytes` (int) : Shared memory block size.
+        - `Owner` (bool) : Whether the block was built by the current process.
+    OR
+    - `None` (NoneType) : Returned if the shared lexicon is not loaded.
     '''
-    rows = ()
-    columns = ('Lemma_ID', 
-               'Lemma', 
-               'POS',
-               'Lemma_Type',
-               'Lemma_InflClass',
-               'Lemma_Degree',
-               'Lemma_Person',
-               'Lemma_Gender',
-               'Lemma_Voice',
-               'Lemma_Tense',
-               'Lemma_Aspect',
-               'Lemma_Animacy',
-               'Lemma_Abbr',
-               'Lemma_NumForm',
-               'Lemma_VerbForm',
-               'Lemma_Personal',
-               'Lemma_Origin',
-               'Lemma_Poss',
-               'Lemma_Reflex',
-               'Lemma_SubCat',
-               'Variant',
-               'Form_ID',
-               'Form',
-               'Form_Accent',
-               'Form_Gender',
-               'Form_Person',
-               'Form_Cas',
-               'Form_Number',
-               'Form_Degree',
-               'Form_Tense',
-               'Form_Mood',
-               'Form_VerbForm',
-               'Form_Animacy',
-               'Form_Short')
-    
-    #VALIDITY CHECK
-    if not os.path.exists(directory): dirCheck = False; return 'Invalid directory path.'
-    else: dirCheck = True
+    lexicon = sharedLexicon
+    if lexicon is None: return None
 
-    if not isinstance(data, tuple): dataCheck = False; return 'Invalid data format.'
-    else: dataCheck = True
-    
-    if dirCheck and dataCheck:
-        def _makeRow(result, mode):
-            '''
-            Convert a single search result into a tuple mapped to CSV file row.
-
-            [ARGUMENTS]:
-            - `result` (dict) : The search result of `formSearch()` or `lemSearch()` function.
-            - `mode` (str) : The flag that determines the data structure.
-              [VALUE OPTIONS]:
-                - 'f' - Form, for `formSearch()` results
-                - 'l' - Lemma, for `lemmaSearch()` results
-            
-            [RETURNS]:
-            - `row` (tuple) : CSV table row.
+    return {'Name': lexicon['Name'],
+            'File': lexicon['File'],
+            'Forms': lexicon['Counts']['Rows'],
+            'LowercaseForms': lexicon['Counts']['Keys'],
+            'Bytes': lexicon['Block'].size,
+            'Owner': lexicon['Owner'] and lexicon['PID'] == os.getpid()}
 
-            [USAGE]:
-            This function is used as an interim operation in `exportCSV()` and is not intended for stand-alone use.
-            '''
-            row = ()
-            
-            # FORM LEVEL - combines Form & Lemma attributes
-            if mode == 'f':
-                # lemma attribute columns correspond to lemSchema, including empty
-                for lemAttribute in DBcolumns['schema']['lemma']:
-                    if lemAttribute in result['LemmaData']: row += (result['LemmaData'][lemAttribute],)
-                    else: row += (None,)
-                # variant value
-                row += (entry['Variant'],)
-                # form attribute columns correspond to formSchema, including empty
-                for i, formAttribute in [item for item in enumerate(DBcolumns['schema']['form']) if item[0] not in (1, 2)]:
-                    if formAttribute in result['FormData']: row += (result['FormData'][formAttribute],)
-                    else: row += (None,)
-        
-            # LEMMA LEVEL
-            elif mode == 'l':
-                # lemma attribute columns correspond to lemSchema, including empty
-                for attribute in DBcolumns['schema']['lemma']:
-                    if attribute in entry: row += (entry[attribute],)
-                    else: row += (None,)
-                # form attributes are empty by definition
-                row += (None,) * 14
-    
-            return row
-    
-        # GENERATE FILE
-        for entry in data: rows += (_makeRow(entry, level),)
-        filename = os.path.join(directory, ''.join(('Slounik_Export_', datetime.now().strftime('%Y-%m-%d_%H-%M-%S'), '.csv')))
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as file:
-            wr = csv.writer(file, delimiter=',')
-            wr.writerow(columns)
-            wr.writerows(rows)
-    
-        print(f'{os.path.abspath(filename)} was created.')
+
+def dropLexicon():
+    '''
+    Detach from the shared lexicon, so that forms are searched in the database again. The process that built the lexicon also removes the block; 
+    attached processes keep reading it until they drop it themselves. Calls of other threads that are reading the lexicon finish with it.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation message.
+    '''
+    if _setLexicon(None) is None: return 'The shared lexicon is not loaded.'
+
+    return 'The shared lexicon was dropped.'
+
+# the block of the building process is removed on exit
+atexit.register(dropLexicon)
 
 
 
 # CORE FUNCTIONALITY
 
+@_timed('formSearch')
 def formSearch(query, keepLetterCase = False, fastMode = False, **kwargs):
     '''
     Find all forms than match the query and return their full form, lemma and variant data.
@@ -507,60 +2443,30 @@ def formSearch(query, keepLetterCase = False, fastMode = False, **kwargs):
     if query.startswith('ў'): query = 'у' + query[1:]
     elif query.startswith('Ў'): query = 'У' + query[1:]
     
-    # Separate form & lemma key-argument pairs, skipping unknown keywords
-    formKwargs = {}
-    lemKwargs = {}
-    for keyword in kwargs.keys():
-        # flag ambiguous attributes
-        if keyword.lower() in DBcolumns['search']['dual']: return 'Ambiguous search keywords. Request `help(formSearch)` for details.'
-        # substitute UD attributes that are reserved words in SQLite
-        elif keyword.lower() == 'case': formKwargs['Cas'] = kwargs[keyword]
-        elif keyword.lower() == 'length': formKwargs['Len'] = kwargs[keyword]
-        # mapping `AdjType`, `NumType`, `PronType` to `Type` column in Lemma table
-        elif 'type' in keyword.lower(): lemKwargs['Type'] = kwargs[keyword]
-        # separate attributes by their presense in Form or Lemma table columns (excluding dual)
-        elif keyword.lower() in DBcolumns['search']['form']: formKwargs[keyword] = kwargs[keyword]
-        elif keyword.lower() in DBcolumns['search']['lemma']: lemKwargs[keyword] = kwargs[keyword]
-        # parse prefixed dual-use attributes
-        elif '_' in keyword:
-            keywordParts = keyword.lower().split('_')
-            if len(keywordParts) == 2:
-                if keywordParts[0] == 'f' and keywordParts[1] in DBcolumns['search']['dual']: formKwargs[keywordParts[1]] = kwargs[keyword]
-                elif keywordParts[0] == 'l' and keywordParts[1] in DBcolumns['search']['dual']: lemKwargs[keywordParts[1]] = kwargs[keyword]
-                
-    # Generate SQL arguments as strings
-    lemSearchSQL = _generateSearchSQL(lemKwargs) if lemKwargs else ''
-    formSearchSQL = _generateSearchSQL(formKwargs) if formKwargs else ''
-    stopWordSQL = f'ID NOT IN ({defaults['stopWords']['String']})' if defaults['stopWords']['String'] else ''
-    
-    # Generate Lemma table sub-query if necessary
-    lemmaSubquery = ''
-    if lemSearchSQL and stopWordSQL: lemmaSubquery = f' AND LemID IN (SELECT ID FROM Lemma WHERE {lemSearchSQL} AND {stopWordSQL})' 
-    elif lemSearchSQL or stopWordSQL: lemmaSubquery = f' AND LemID IN (SELECT ID FROM Lemma WHERE {lemSearchSQL}{stopWordSQL})' 
+    # Generate SQL filters from keyword arguments
+    filterSQL = _searchFilterSQL(kwargs, query[:1] in ('*', '?', '['))
+    if filterSQL is None: return 'Ambiguous search keywords. Request `help(formSearch)` for details.'
 
     # Assemble the statement
     statement = f'''SELECT {DBcolumns['SQL']['form'] if fastMode == False else 'ID'} FROM Form 
                     WHERE {'Lowercase' if keepLetterCase == False else 'Form'} GLOB \"{query.lower() if keepLetterCase == False else query}\"
-                    {f' AND {formSearchSQL} ' if formSearchSQL else ''} {lemmaSubquery} ORDER BY Form'''
+                    {filterSQL} ORDER BY Form, LemID, ID'''
     
     # DATABASE QUERY
     try:
-        with sqlite3.connect(defaults['databaseFile']) as connection:
+        with _connect() as connection:
             cursor = connection.cursor()
             response = ()
            
             # request matching Form table rows
-            cursor.execute(statement) 
-            formValues = cursor.fetchall()
+            formValues = _query(cursor, statement, 'all')
             
             if formValues:
                 if fastMode == False:
                     # provide lemma and variant data for each search result
                     for formValue in formValues: 
-                        cursor.execute(f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {formValue[1]}')
-                        lemValue = cursor.fetchall()[0]
-                        cursor.execute(f'SELECT Variant FROM Variant WHERE ID = {formValue[2]}')
-                        varValue = cursor.fetchall()[0][0]
+                        lemValue = _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {formValue[1]}', 'all')[0]
+                        varValue = _query(cursor, f'SELECT Variant FROM Variant WHERE ID = {formValue[2]}', 'all')[0][0]
 
                         response += ((formValue, lemValue, varValue),)
                         
@@ -586,6 +2492,160 @@ def formSearch(query, keepLetterCase = False, fastMode = False, **kwargs):
     return output
 
 
+def formSearchMany(queries, keepLetterCase = False, fastMode = False, **kwargs):
+    '''
+    Run many form searches at once with the same result as `formSearch()` for each query. 
+    Exact queries are resolved together with one statement per chunk of queries. Glob patterns are grouped by their literal prefix (the characters before the first wildcard), 
+    so that patterns sharing an index range, as well as all patterns starting with a wildcard, are matched in one pass over the table.
+    Lemma and variant data of all results are requested in bulk.
+
+    [ARGUMENTS]:
+    - `queries` (iterable) : Word forms and glob patterns, see `formSearch()`.
+    - `keepLetterCase` (bool) OPTIONAL : Case sensitivity of the search, see `formSearch()`.
+    - `fastMode` (bool) OPTIONAL : Output format, see `formSearch()`.
+    - Attribute (keyword argument) OPTIONAL : Form or lemma database attributes applied to all queries, see `formSearch()`.
+    - `chunkSize` (int) OPTIONAL : The number of exact queries or patterns matched with one statement, `500` by default.
+
+    [RETURNS]:
+    - `output` (dict) : `formSearch()` output for each distinct query.
+    OR
+    - `message` (str) : Returned if search keywords are ambiguous, see `formSearch()`.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    chunkSize = kwargs.pop('chunkSize', 500)
+    # the same validation and `Ў` replacement as in `formSearch()`, resulting in the values compared with `Lowercase` or `Form` column
+    column = 'Lowercase' if keepLetterCase == False else 'Form'
+    output = {}
+    exactQueries = {}
+    patterns = {}
+    for query in queries:
+        if not isinstance(query, str) or query in output: continue
+        output[query] = None
+        if any(character for character in query if character not in validQueryCharacters): continue
+        value = 'у' + query[1:] if query.startswith('ў') else 'У' + query[1:] if query.startswith('Ў') else query
+        if keepLetterCase == False: value = value.lower()
+        if any(character in value for character in '*?['): patterns.setdefault(value, []).append(query)
+        else: exactQueries.setdefault(value, []).append(query)
+
+    exactFilterSQL = _searchFilterSQL(kwargs, False)
+    wildcardFilterSQL = _searchFilterSQL(kwargs, True)
+    if exactFilterSQL is None: return 'Ambiguous search keywords. Request `help(formSearch)` for details.'
+
+    # group patterns under the shortest literal prefix that starts their own prefix, so that each index range is read once
+    prefixGroups = {}
+    for pattern in sorted(patterns, key = lambda pattern: (len(re.split(r'[*?\[]', pattern)[0]), pattern)):
+        prefix = re.split(r'[*?\[]', pattern)[0]
+        groupPrefix = next((groupPrefix for groupPrefix in prefixGroups if prefix.startswith(groupPrefix)), prefix)
+        prefixGroups.setdefault(groupPrefix, []).append(pattern)
+
+    def quote(value): return "'" + value.replace("'", "''") + "'"
+    formColumns = DBcolumns['SQL']['form'] if fastMode == False else 'ID'
+
+    # matching Form table rows per exact query or pattern, in the order of `formSearch()`
+    matches = {}
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+
+            for chunk in _chunks(sorted(exactQueries), chunkSize):
+                statement = f'SELECT {formColumns}, {column} FROM Form WHERE {column} IN ({', '.join([quote(value) for value in chunk])}){exactFilterSQL} ORDER BY Form, LemID, ID'
+                for row in _query(cursor, statement, 'all'): matches.setdefault(row[-1], []).append(row[:-1])
+
+            for prefix, groupPatterns in prefixGroups.items():
+                for chunk in _chunks(groupPatterns, chunkSize):
+                    # match flags of every pattern are computed by SQLite, so the globbing semantics are the same as in `formSearch()`
+                    flagSQL = ', '.join([f'{column} GLOB {quote(pattern)}' for pattern in chunk])
+                    prefixSQL = f'{column} GLOB {quote(prefix + '*')} AND ' if prefix else ''
+                    statement = f'''SELECT {formColumns}, {flagSQL} FROM Form 
+                                    WHERE {prefixSQL}({' OR '.join([f'{column} GLOB {quote(pattern)}' for pattern in chunk])}){exactFilterSQL if prefix else wildcardFilterSQL} ORDER BY Form, LemID, ID'''
+                    width = len(formColumns.split(', '))
+                    for row in _query(cursor, statement, 'all'):
+                        for pattern, flag in zip(chunk, row[width:]):
+                            if flag: matches.setdefault(pattern, []).append(row[:width])
+
+            # provide lemma and variant data for all search results
+            lemValues, varValues = ({}, {})
+            if fastMode == False and matches:
+                formValues = [formValue for formValues in matches.values() for formValue in formValues]
+                for chunk in _chunks(sorted(set([formValue[1] for formValue in formValues])), chunkSize):
+                    for lemValue in _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID IN ({', '.join([str(lemID) for lemID in chunk])})', 'all'): lemValues[lemValue[0]] = lemValue
+                for chunk in _chunks(sorted(set([formValue[2] for formValue in formValues])), chunkSize):
+                    varValues.update(_query(cursor, f'SELECT ID, Variant FROM Variant WHERE ID IN ({', '.join([str(varID) for varID in chunk])})', 'all'))
+
+    except sqlite3.Error as exception:
+        return exception
+
+    # ANNOTATION OF RESULTS
+    # every query gets its own result dictionaries
+    for value, valueQueries in list(exactQueries.items()) + list(patterns.items()):
+        if value not in matches: continue
+        for query in valueQueries:
+            if fastMode == True: output[query] = tuple([formValue[0] for formValue in matches[value]])
+            else: output[query] = tuple([{'FormData': _UDify(formValue, 'f'), 'LemmaData': _UDify(lemValues[formValue[1]], 'l'), 'Variant': varValues[formValue[2]]} for formValue in matches[value]])
+
+    return output
+
+
+def formFacets(query, by = ('POS',), keepLetterCase = False, **kwargs):
+    '''
+    Count the forms that match the query, grouped by the values of one or several attributes, e.g. by part of speech, case and number.
+    Matching forms are counted with one `GROUP BY` statement instead of requesting their data; the query, filters, letter case and stop words work as in `formSearch()`.
+
+    [ARGUMENTS]:
+    - `query` (str) : A word form or glob pattern, see `formSearch()`.
+    - `by` (str, tuple) OPTIONAL : Facet attribute or attributes, `('POS',)` by default. Any form or lemma attribute that can be used as a search keyword, 
+      e.g. 'POS', 'Case', 'Number', 'NumType', 'Length'. Dual-use attributes have to be prefixed with 'f_' or 'l_', e.g. 'f_Gender'.
+    - `keepLetterCase` (bool) OPTIONAL : Case sensitivity of the search, see `formSearch()`.
+    - Attribute (keyword argument) OPTIONAL : Form or lemma database attributes that filter the forms before counting, see `formSearch()`.
+
+    [RETURNS]:
+    - `output` (dict) : Form counts, sorted from the most frequent group.
+      The keys are attribute values if `by` is a single attribute, or tuples of values in the order of `by`. `None` stands for an empty attribute.
+    OR
+    - `None` (NoneType) : Returned if search does not yield any results.
+    OR
+    - `message` (str) : Returned if search keywords or facet attributes are unknown or ambiguous.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    # PREPARATION
+    # Check for `query` value validity
+    if not isinstance(query, str) or any(character for character in query if character not in validQueryCharacters): return None
+
+    # Replace `Ў` for `У`
+    if query.startswith('ў'): query = 'у' + query[1:]
+    elif query.startswith('Ў'): query = 'У' + query[1:]
+
+    columns = _facetColumns((by,) if isinstance(by, str) else tuple(by), 'f')
+    if isinstance(columns, str): return columns
+    if not columns: return None
+    filterSQL = _searchFilterSQL(kwargs, query[:1] in ('*', '?', '['))
+    if filterSQL is None: return 'Ambiguous search keywords. Request `help(formSearch)` for details.'
+
+    # Assemble the statement
+    # matching forms are selected with the same conditions as in `formSearch()`, and only lemma facets require the join with Lemma table
+    formColumns = [column for table, column, _ in columns if table == 'Form']
+    facetSQL = ', '.join([f'Matched.{column}' if table == 'Form' else f'Lemma.{column}' for table, column, _ in columns])
+    statement = f'''SELECT {facetSQL}, COUNT(*) FROM 
+                    (SELECT {', '.join(['LemID'] + formColumns)} FROM Form
+                     WHERE {'Lowercase' if keepLetterCase == False else 'Form'} GLOB \"{query.lower() if keepLetterCase == False else query}\"
+                     {filterSQL}) AS Matched
+                    {'JOIN Lemma ON Lemma.ID = Matched.LemID' if any(table == 'Lemma' for table, _, _ in columns) else ''}
+                    GROUP BY {facetSQL} ORDER BY COUNT(*) DESC, {facetSQL}'''
+
+    # DATABASE QUERY
+    try:
+        with _connect() as connection:
+            response = _query(connection.cursor(), statement, 'all')
+
+    except sqlite3.Error as exception:
+        return exception
+
+    return _facetCounts(response, columns)
+
+
+@_timed('formByID')
 def formByID(formID, toConllu = False, **kwargs):
     '''
     Request a form's data by its form ID.
@@ -616,7 +2676,7 @@ def formByID(formID, toConllu = False, **kwargs):
     if not isinstance(formID, int): return None
 
     # RESET
-    connection, cursor, response, formValue, lemValue, varValue, features, output = [None] * 8
+    connection, cursor, response, formValue, lemValue, varValue, output = [None] * 7
 
     if toConllu == True:
         if 'includeForm' in kwargs.keys():
@@ -626,26 +2686,28 @@ def formByID(formID, toConllu = False, **kwargs):
 
     # QUERY DATABASE
     try:
-        with sqlite3.connect(defaults['databaseFile']) as connection:
+        with _connect() as connection:
             cursor = connection.cursor()
             response = ()
 
-            # request Form table row
-            cursor.execute(f'SELECT {DBcolumns['SQL']['form']} FROM Form WHERE ID = {formID}')
-            formValue = cursor.fetchone()
-            
-                # provide lemma and variant data for the result
-            if formValue:
-                cursor.execute(f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {formValue[1]}')
-                lemValue = cursor.fetchone()
-                    
-                response = (formValue, lemValue)
+            # read precomputed CoNLL-U values if `Conllu` table was built
+            if toConllu == True and _settings()['conlluTable'] == True:
+                output = _conlluValues(cursor, (formID,), includeForm).get(formID)
+
+            else:
+                # request Form table row
+                formValue = _query(cursor, f'SELECT {DBcolumns['SQL']['form']} FROM Form WHERE ID = {formID}', 'one')
+                
+                    # provide lemma and variant data for the result
+                if formValue:
+                    lemValue = _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {formValue[1]}', 'one')
+                        
+                    response = (formValue, lemValue)
 
-                if toConllu == False:
-                    cursor.execute(f'SELECT Variant FROM Variant WHERE ID = {formValue[2]}')
-                    varValue = cursor.fetchone()[0]
+                    if toConllu == False:
+                        varValue = _query(cursor, f'SELECT Variant FROM Variant WHERE ID = {formValue[2]}', 'one')[0]
 
-                    response += (varValue,)    
+                        response += (varValue,)    
 
     except sqlite3.Error as exception:
         return exception
@@ -660,39 +2722,7 @@ def formByID(formID, toConllu = False, **kwargs):
         elif toConllu == True:
             # check for structure validity
             if len(response) == 2 and isinstance(response[0], tuple) and isinstance(response[1], tuple):
-                output, features = ({}, {})
-
-                # FORM DATA
-                if includeForm == True: output['FORM'] = response[0][3] 
-                # detect non-empty values excluding redundant attributes
-                for i, value in [item for item in enumerate(response[0][5:]) if item[1]]:
-                    # rename Cas to Case (restricted word in SQLite)
-                    if i == 2: features['Case'] = value
-                    # integer to UD `Animacy` value string
-                    elif i == 8: features['Animacy'] = _boolly(value, 3)
-                    # integer to UD "boolean" string
-                    elif i == 9: features['Short'] = _boolly(value, 0)
-                    # add other values without modification
-                    else: features[DBcolumns['schema']['form'][5:][i]] = value
-    
-                # LEMMA DATA
-                output['LEMMA'] = response[1][1]
-                # detect non-empty values excluding redundant attributes
-                for i, value in [item for item in enumerate(response[1][2:]) if item[1]]:
-                    # UPOS value
-                    if i == 0: output['UPOS'] = value
-                    # convert `Type` label to POS-specific, e.g., NumType
-                    elif i == 1: features[f'{response[1][2].title()}Type'] = value
-                    # integer to UD `Animacy` value string
-                    elif i == 9: features['Animacy'] = _boolly(value, 3)
-                    # integers to UD "boolean" strings
-                    elif i in (10, 13, 15, 16): features[DBcolumns['schema']['lemma'][2:][i]] = _boolly(value, 0)
-                    # add other values without modification
-                    else: features[DBcolumns['schema']['lemma'][2:][i]] = value
-
-                # joining FEATS key-value pairs
-                if features: output['FEATS'] = '|'.join([''.join([key, '=', str(features[key])])for key in sorted(features.keys())])
-                else: output['FEATS'] = '_'
+                output = _conllify(response[0], response[1], includeForm)
         
     return output
 
@@ -742,35 +2772,22 @@ def lemmaSearch(query, keepLetterCase = False, fastMode = False, **kwargs):
     if query.startswith('ў'): query = 'у' + query[1:]
     elif query.startswith('Ў'): query = 'У' + query[1:]
     
-    # Parse keyword agruments, skipping unknown keywords
-    lemKwargs = {}
-    for keyword in kwargs.keys():
-        # substitute UD attributes that are reserved words in SQLite
-        if keyword.lower() == 'length': lemKwargs['Len'] = kwargs[keyword]
-        # mapping `AdjType`, `NumType`, `PronType` to `Type` column in Lemma table
-        elif 'type' in keyword.lower(): lemKwargs['Type'] = kwargs[keyword]
-        # collect lemma attributes
-        elif keyword.lower() in DBcolumns['search']['lemma'] or keyword.lower() in DBcolumns['search']['dual']: lemKwargs[keyword] = kwargs[keyword]
-                
-    # Generate SQL arguments as strings
-    lemSearchSQL = _generateSearchSQL(lemKwargs) if lemKwargs else ''
-    stopWordSQL = f'ID NOT IN ({defaults['stopWords']['String']})' if defaults['stopWords']['String'] else ''
+    # Generate SQL filters from keyword arguments
+    filterSQL = _lemmaFilterSQL(kwargs)
 
     # Assemble the statement
     statement = f'''SELECT {DBcolumns['SQL']['lemma'] if fastMode == False else 'ID'} FROM Lemma
                     WHERE {'Lowercase' if keepLetterCase == False else 'Lemma'} GLOB \"{query.lower() if keepLetterCase == False else query}\"
-                    {f' AND {lemSearchSQL} ' if lemSearchSQL else ''} 
-                    {f' AND {stopWordSQL} ' if stopWordSQL else ''} ORDER BY Lemma'''
+                    {filterSQL} ORDER BY Lemma'''
     
     # DATABASE QUERY
     try:
-        with sqlite3.connect(defaults['databaseFile']) as connection:
+        with _connect() as connection:
             cursor = connection.cursor()
             response = ()
 
             # request matching Lemma table rows
-            cursor.execute(statement) 
-            response = cursor.fetchall()
+            response = _query(cursor, statement, 'all')
 
     except sqlite3.Error as exception:
         return exception
@@ -787,6 +2804,56 @@ def lemmaSearch(query, keepLetterCase = False, fastMode = False, **kwargs):
     return output
 
 
+def lemmaFacets(query, by = ('POS',), keepLetterCase = False, **kwargs):
+    '''
+    Count the lemmas that match the query, grouped by the values of one or several attributes, e.g. by part of speech and gender.
+    Matching lemmas are counted with one `GROUP BY` statement instead of requesting their data; the query, filters, letter case and stop words work as in `lemmaSearch()`.
+
+    [ARGUMENTS]:
+    - `query` (str) : A lemma or glob pattern, see `lemmaSearch()`.
+    - `by` (str, tuple) OPTIONAL : Facet attribute or attributes, `('POS',)` by default. Any lemma attribute that can be used as a search keyword, e.g. 'POS', 'Gender', 'Aspect', 'Length'.
+    - `keepLetterCase` (bool) OPTIONAL : Case sensitivity of the search, see `lemmaSearch()`.
+    - Attribute (keyword argument) OPTIONAL : Lemma database attributes that filter the lemmas before counting, see `lemmaSearch()`.
+
+    [RETURNS]:
+    - `output` (dict) : Lemma counts, sorted from the most frequent group.
+      The keys are attribute values if `by` is a single attribute, or tuples of values in the order of `by`. `None` stands for an empty attribute.
+    OR
+    - `None` (NoneType) : Returned if search does not yield any results.
+    OR
+    - `message` (str) : Returned if a facet attribute is unknown.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    # PREPARATION
+    # Check for `query` value validity
+    if not isinstance(query, str) or any(character for character in query if character not in validQueryCharacters): return None
+
+    # Replace `Ў` for `У`
+    if query.startswith('ў'): query = 'у' + query[1:]
+    elif query.startswith('Ў'): query = 'У' + query[1:]
+
+    columns = _facetColumns((by,) if isinstance(by, str) else tuple(by), 'l')
+    if isinstance(columns, str): return columns
+    if not columns: return None
+
+    # Assemble the statement with the same conditions as in `lemmaSearch()`
+    facetSQL = ', '.join([column for _, column, _ in columns])
+    statement = f'''SELECT {facetSQL}, COUNT(*) FROM Lemma
+                    WHERE {'Lowercase' if keepLetterCase == False else 'Lemma'} GLOB \"{query.lower() if keepLetterCase == False else query}\"
+                    {_lemmaFilterSQL(kwargs)} GROUP BY {facetSQL} ORDER BY COUNT(*) DESC, {facetSQL}'''
+
+    # DATABASE QUERY
+    try:
+        with _connect() as connection:
+            response = _query(connection.cursor(), statement, 'all')
+
+    except sqlite3.Error as exception:
+        return exception
+
+    return _facetCounts(response, columns)
+
+
 def lemmaByID(lemID):
     '''
     Request a lemma's data by its lemma ID.
@@ -807,13 +2874,12 @@ def lemmaByID(lemID):
 
     # QUERY DATABASE
     try:
-        with sqlite3.connect(defaults['databaseFile']) as connection:
+        with _connect() as connection:
             cursor = connection.cursor()
             response = ()
 
             # request Lemma table row
-            cursor.execute(f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {lemID}')
-            response = cursor.fetchone()
+            response = _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {lemID}', 'one')
 
     except sqlite3.Error as exception:
         return exception
@@ -847,52 +2913,207 @@ def allForms(lemID):
     
     # QUERY DATABASE
     try:
-        with sqlite3.connect(defaults['databaseFile']) as connection:
+        with _connect() as connection:
             cursor = connection.cursor()
 
             # request Lemma table row 
-            cursor.execute(f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {lemID}')
-            lemValue = cursor.fetchone()
+            lemValue = _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID = {lemID}', 'one')
             
             if lemValue:
-                # request forms and their variants
+                # request forms together with their variants
                 response = {'lemma': lemValue, 'forms':[]}     
-                cursor.execute(f'SELECT {DBcolumns['SQL']['form']} FROM Form WHERE LemID = {lemValue[0]} ORDER BY ID')
-                formValues = cursor.fetchall()
+                formValues = _query(cursor, f'SELECT Variant.Variant, {DBcolumns['SQL']['joinedForm']} FROM Form JOIN Variant ON Variant.ID = Form.VarID WHERE Form.LemID = {lemValue[0]} ORDER BY Form.ID', 'all')
+
+                if formValues: response['forms'] = tuple([(formValue[0], formValue[1:]) for formValue in formValues])
+
+    except sqlite3.Error as exception:
+        return exception
+    
+    # ANNOTATE RESULTS
+    if response:
+        output = _paradigm(response)
+
+    return output
+
+
+def allFormsMany(lemIDs, chunkSize = 500):
+    '''
+    Request the full paradigms of many lemmas with the same result as `allForms()` for each lemma ID, but in two statements per chunk of lemma IDs instead of several statements per lemma.
+    Results are generated one by one in the order of the lemma IDs, so that only one chunk of paradigms is kept in memory at a time.
+
+    [ARGUMENTS]:
+    - `lemIDs` (iterable) : Lemma IDs as they are stored in the `ID` column of `Lemma` database table. Duplicate IDs are allowed.
+    - `chunkSize` (int) OPTIONAL : The number of lemmas requested with one statement.
+
+    [RETURNS]:
+    - `output` (generator) : `allForms()` output for each lemma ID: a dictionary with `LemmaData` and `Variants` keys, or `None` if the lemma ID does not exist.
+      If the database could not be read, `sqlite3.Error` exception is generated instead, and the generator stops.
+
+    [USAGE]:
+    for lemID, paradigm in zip(lemIDs, allFormsMany(lemIDs)): ...
+    '''
+    def generate():
+        for chunk in _chunks(lemIDs, chunkSize):
+            validIDs = sorted(set([lemID for lemID in chunk if isinstance(lemID, int)]))
+            responses = {}
+
+            if validIDs:
+                lemIDSQL = ', '.join([str(lemID) for lemID in validIDs])
+                try:
+                    with _connect() as connection:
+                        cursor = connection.cursor()
+                        # lemma rows, then forms with their variants grouped by lemma in the same order as in `allForms()`
+                        for lemValue in _query(cursor, f'SELECT {DBcolumns['SQL']['lemma']} FROM Lemma WHERE ID IN ({lemIDSQL})', 'all'): responses[lemValue[0]] = {'lemma': lemValue, 'forms': []}
+                        if responses:
+                            for formValue in _query(cursor, f'SELECT Variant.Variant, {DBcolumns['SQL']['joinedForm']} FROM Form JOIN Variant ON Variant.ID = Form.VarID WHERE Form.LemID IN ({lemIDSQL}) ORDER BY Form.LemID, Form.ID', 'all'):
+                                responses[formValue[2]]['forms'].append((formValue[0], formValue[1:]))
+                except sqlite3.Error as exception:
+                    yield exception
+                    return
+
+            # duplicate lemma IDs get independent results
+            for lemID in chunk: yield _paradigm(responses[lemID]) if isinstance(lemID, int) and lemID in responses else None
+
+    return _analyzerGenerator(generate())
+
+
+def _inflectionKwargs(kwargs):
+    '''
+    Map the keyword arguments of `inflect()` to `Form` table columns in the same way as form attributes of `formSearch()`.
+
+    [ARGUMENTS]:
+    - `kwargs` (dict) : Form attributes in `keyword = value` format.
+
+    [RETURNS]:
+    - `formKwargs` (dict) : Column-value pairs.
+    OR
+    - `message` (str) : Returned if a keyword is not a form attribute.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    formKwargs = {}
+    for keyword, value in kwargs.items():
+        keywordParts = keyword.lower().split('_')
+        # substitute UD attributes that are reserved words in SQLite
+        if keyword.lower() == 'case': formKwargs['Cas'] = value
+        elif keyword.lower() == 'length': formKwargs['Len'] = value
+        elif keyword.lower() in DBcolumns['search']['form']: formKwargs[keyword] = value
+        # dual-use attributes must be prefixed with 'f_'
+        elif len(keywordParts) == 2 and keywordParts[0] == 'f' and keywordParts[1] in DBcolumns['search']['dual']: formKwargs[keywordParts[1]] = value
+        else: return f'Unsupported inflection keyword: `{keyword}`. Request `help(inflect)` for details.'
+
+    return formKwargs
+
+
+def _inflection(formValue):
+    '''
+    Label an `(ID, Form, Accent)` row of `Form` table, omitting an empty accent.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    output = {'ID': formValue[0], 'Form': formValue[1]}
+    if formValue[2]: output['Accent'] = formValue[2]
+
+    return output
+
+
+def inflect(lemID, **kwargs):
+    '''
+    Find the forms of a lemma with the given grammatical features, e.g. the genitive plural of a noun, without requesting the lemma's whole paradigm. 
+    Only the lemma's rows of `Form` table are read, using the index on `LemID` column, with one statement.
+
+    [ARGUMENTS]:
+    - `lemID` (int) : Lemma ID as it is stored in the `ID` column of `Lemma` database table.
+    - Attribute (keyword argument) OPTIONAL : Form attributes in `keyword = value` format, the same as in `formSearch()`: `Case`, `Number`, `Mood`, `Short`, `f_Degree`, `f_Person`, `f_Gender`, `f_Tense`, `f_Animacy`, `f_VerbForm`, `length`.
+      Values are case sensitive and use their respective Python data types: Case = 'Gen', f_Person = 2, Short = True.
+
+    [RETURNS]:
+    - `output` (tuple) : Matching forms in form ID order, each represented by a dictionary with the following keys:
+        - `ID` (int) : Form ID.
+        - `Form` (str) : Form.
+        - `Accent` (str) OPTIONAL : Positions of stressed vowels, see `accentuate()`.
+    OR
+    - `None` (NoneType) : Returned if the lemma ID does not exist or has no matching forms.
+    OR
+    - `message` (str) : Returned if a keyword is not a form attribute.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+
+    [USAGE]:
+    inflect(120900, Case = 'Gen', Number = 'Plur')
+    '''
+    # CHECK ARGUMENT VALIDITY
+    if not isinstance(lemID, int): return None
+    formKwargs = _inflectionKwargs(kwargs)
+    if isinstance(formKwargs, str): return formKwargs
+
+    formSearchSQL = _generateSearchSQL(formKwargs) if formKwargs else ''
+
+    # QUERY DATABASE
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+            response = _query(cursor, f'SELECT ID, Form, Accent FROM Form WHERE LemID = {lemID}{f' AND {formSearchSQL}' if formSearchSQL else ''} ORDER BY ID', 'all')
+
+    except sqlite3.Error as exception:
+        return exception
+
+    return tuple([_inflection(formValue) for formValue in response]) if response else None
+
+
+def inflectMany(requests, chunkSize = 500):
+    '''
+    Find forms for many `(lemma ID, features)` pairs with the same result as `inflect()` for each pair. 
+    Pairs with the same features are resolved together, with one statement per chunk of lemma IDs.
+
+    [ARGUMENTS]:
+    - `requests` (iterable) : `(lemID, features)` pairs, where `features` is a dictionary of `inflect()` keyword arguments, e.g. `(120900, {'Case': 'Gen', 'Number': 'Plur'})`.
+    - `chunkSize` (int) OPTIONAL : The number of lemmas requested with one statement.
+
+    [RETURNS]:
+    - `output` (tuple) : `inflect()` output for each pair in the same order, `None` for invalid pairs.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    requests = list(requests)
+    output = [None] * len(requests)
 
-                if formValues:
-                    forms = ()
-                    for formValue in formValues:
-                        cursor.execute(f'SELECT Variant FROM Variant WHERE ID = {formValue[2]}')
-                        varValue = cursor.fetchone()[0]
-                        forms += ((varValue, formValue),)
+    # group requests by features
+    groups = {}
+    for index, request in enumerate(requests):
+        if not (isinstance(request, (tuple, list)) and len(request) == 2 and isinstance(request[0], int) and isinstance(request[1], dict)): continue
+        formKwargs = _inflectionKwargs(request[1])
+        if isinstance(formKwargs, str): output[index] = formKwargs; continue
+        groups.setdefault(_generateSearchSQL(formKwargs) if formKwargs else '', []).append((index, request[0]))
 
-                    response['forms'] = forms
+    # QUERY DATABASE
+    forms = {}
+    try:
+        with _connect() as connection:
+            cursor = connection.cursor()
+            for formSearchSQL, items in groups.items():
+                for chunk in _chunks(sorted(set([lemID for index, lemID in items])), chunkSize):
+                    lemIDSQL = ', '.join([str(lemID) for lemID in chunk])
+                    for formValue in _query(cursor, f'SELECT LemID, ID, Form, Accent FROM Form WHERE LemID IN ({lemIDSQL}){f' AND {formSearchSQL}' if formSearchSQL else ''} ORDER BY LemID, ID', 'all'):
+                        forms.setdefault((formSearchSQL, formValue[0]), []).append(formValue[1:])
 
     except sqlite3.Error as exception:
         return exception
-    
-    # ANNOTATE RESULTS
-    if response:
-        # check for structure validity
-        if isinstance(response, dict) and 'lemma' in response.keys() and 'forms' in response.keys():
-            output = {'LemmaData': {}, 'Variants': ()}
-            # annotate lemma attributes
-            output['LemmaData'] = _UDify(response['lemma'], 'l')
-            # generate form tuples (paradigms) grouped by variant
-            variants = {}
-            for form in response['forms']:
-                if form[0] not in variants.keys(): variants[form[0]] = (_UDify(form[1], 'f'),)
-                else: variants[form[0]] += (_UDify(form[1], 'f'),)           
-            # add form groups to the output
-            for variant in sorted(variants.keys()):
-                output['Variants'] += ({'Variant': variant, 'Paradigm': variants[variant]},)
 
-    return output
+    # every pair gets its own result dictionaries
+    for formSearchSQL, items in groups.items():
+        for index, lemID in items:
+            formValues = forms.get((formSearchSQL, lemID))
+            output[index] = tuple([_inflection(formValue) for formValue in formValues]) if formValues else None
+
+    return tuple(output)
 
 
 # PLAIN TEXT PROCESSING
 
+@_timed('tokenize')
 def tokenize(text):
     '''
     Converts a plain text in Belarusian into a tuple of word-level tokens. Tokens are segmented based on standard Belarusian number, date etc. formats. 
@@ -946,6 +3167,7 @@ def tokenize(text):
     return output
 
 
+@_timed('splitSentences')
 def splitSentences(tokens):
     '''
     Segmentation of a token list into groups corresponding to sentences. The end of a sentence is detected at either at sentence-end punctuation marks like '.', or at text emoticons like ':)'.
@@ -1002,6 +3224,7 @@ def splitSentences(tokens):
     else: return (tokens,)
 
 
+@_timed('annotateToken')
 def annotateToken(token, toConllu = False, extended = True):
     '''
     Annotate a token regardless of whether it is present in the database. `(U)POS` values and features are specified at search result level since there can be multiple matches for a token.
@@ -1031,6 +3254,20 @@ def annotateToken(token, toConllu = False, extended = True):
     # CHECK FOR `TOKENS` VALUE VALIDITY
     if not isinstance(token, str): return None
     
+    # CACHED ANNOTATION (see `setCacheSize()`)
+    tokenCache = _cacheState()
+    if tokenCache['Size']:
+        # annotations depend on the database file and stop words
+        cacheKey = (token, toConllu, extended, _settings().get('databaseFile'), _settings()['stopWords']['String'])
+        with tokenCache['Lock']:
+            cached = tokenCache['Cache'].get(cacheKey)
+            if cached is not None: tokenCache['Cache'].move_to_end(cacheKey)
+        if statsEnabled: _count('Cache', 'Hits' if cached is not None else 'Misses')
+        if cached is not None:
+            if statsEnabled: _count('Tokens', cached[0])
+            # a copy, since annotations are modified by `annotateSentence()` and by the caller
+            return copy.deepcopy(cached[1])
+
     # RESET
     output = {}
     
@@ -1051,30 +3288,57 @@ def annotateToken(token, toConllu = False, extended = True):
         results, resultData = [None] * 2
         resultID = 1
         
-        # first request with case sensitivity, repeat without sensitivity if there were no results
-        search = formSearch(query = token, keepLetterCase = True, fastMode = True)
-        if not search: search = formSearch(query = token, keepLetterCase = False, fastMode = True)    
-        # requesting data for each result    
-        if search:
-            results = {}
-            for result in search:
-                if toConllu == False:  results[resultID] = formByID(formID = result); resultID += 1
-                elif toConllu == True:
-                    # adding a result, while skipping duplicates where all features except word stress are the same, since CoNLL-U doesn't support it
-                    resultData = formByID(formID = result, toConllu = True, includeForm = False)
-                    if resultData not in results.values(): results[resultID] = resultData; resultID += 1
-        # add placeholder values for queries without matches
-        elif (not search) and (toConllu == True): results = {1: {'LEMMA': '_', 'UPOS': 'X', 'FEATS': '_'}}
+        # data prefetched in bulk by `annotateTokens()`, if any
+        prefetched = getattr(_threadData, 'prefetched', None)
+        if prefetched is not None and (prefetched['toConllu'] != toConllu or token not in prefetched['Lookup']): prefetched = None
+        # CoNLL-U values are read from the shared lexicon if it is loaded, see `shareLexicon()`; it stays readable until the results are formatted
+        with _usedLexicon(toConllu == True) as lexicon:
+            # case-sensitive matches or, if there are none, case-insensitive matches
+            # (tokens rejected by the form filter are not in the database)
+            if prefetched is not None: search = prefetched['Lookup'][token]
+            else: search = _lookupForm(token) if _knownForm(token) else None
+            # requesting data for each result    
+            if search and toConllu == True and prefetched is None and lexicon is None and _settings()['conlluTable'] == True:
+                # all matches are read in one statement and duplicates are skipped before they are labelled, see `_distinctConllu()`
+                distinct = _distinctConllu(search)
+                results = dict(enumerate(distinct, 1)) if isinstance(distinct, list) else {1: distinct}
+            elif search and toConllu == True:
+                results = {}
+                # `LEMMA`, `UPOS` & `FEATS` values of the added results
+                added = set()
+                for result in search:
+                    shared = prefetched is not None and result in prefetched['Forms']
+                    if shared: resultData = prefetched['Forms'][result]
+                    elif lexicon is not None and (conllu := _lexiconConllu(lexicon, result)) is not None: resultData = conllu
+                    else: resultData = formByID(formID = result, toConllu = True, includeForm = False)
 
-        return results
+                    # adding a result, while skipping duplicates where all features except word stress are the same, since CoNLL-U doesn't support it
+                    key = (resultData.get('LEMMA'), resultData.get('UPOS'), resultData.get('FEATS')) if isinstance(resultData, dict) else resultData
+                    if key in added: continue
+                    added.add(key)
+                    # prefetched values are shared by all tokens of the batch, so only the added ones are copied
+                    results[resultID] = dict(resultData) if shared else resultData; resultID += 1
+            elif search:
+                results = {}
+                for result in search:
+                    if prefetched is not None and result in prefetched['Forms']: resultData = copy.deepcopy(prefetched['Forms'][result])
+                    else: resultData = formByID(formID = result)
+                    results[resultID] = resultData; resultID += 1
+            # add placeholder values for queries without matches
+            elif (not search) and (toConllu == True): results = {1: {'LEMMA': '_', 'UPOS': 'X', 'FEATS': '_'}}
+
+            return results
 
     # GENERATE TOKEN ANNOTATION
+    # token category for statistics
+    category = 'other'
     if toConllu == False: output = {'Form': token, 'Results': {}}
     elif toConllu == True:  output = {'FORM': token, 'MISC': '_', 'Results': {}}
 
     if extended == False:
         # database lookup for word-like tokens
         if re.fullmatch(tokenCategories['word'], token):
+            category = 'word'
             output['Results'] = DBresults(token)
         else:
             # everything else is empty
@@ -1083,36 +3347,46 @@ def annotateToken(token, toConllu = False, extended = True):
     elif extended == True:
         # "cheap" checks first
         if token in tokenCategories['punct']:
+            category = 'punct'
             if toConllu == False: output['Results'][1] = {'POS': 'PUNCT'}
             elif toConllu == True: output['Results'][1] = {'LEMMA': token, 'UPOS': 'PUNCT', 'FEATS': '_'}
         elif token in tokenCategories['sym']:
+            category = 'sym'
             if toConllu == False: output['Results'][1] = {'POS': 'SYM'} 
             elif toConllu == True: output['Results'][1] = {'LEMMA': token, 'UPOS': 'SYM', 'FEATS': '_'}
         elif token.isdigit():
+            category = 'num'
             if toConllu == False: output['Results'][1] = {'POS': 'NUM'} 
             elif toConllu == True: output['Results'][1] = {'LEMMA': token, 'UPOS': 'NUM', 'FEATS': '_'}
         elif token in abbreviations['noStop']:
+            category = 'abbr'
             if toConllu == False: output['Results'][1] = {'Abbr': True} 
             elif toConllu == True: output['Results'][1] = {'LEMMA': '_', 'UPOS': 'X', 'FEATS': 'Abbr=Yes'}
         elif ('(' in token or ')' in token) and len(token) > 1:
             if re.fullmatch(tokenCategories['emo'], token):
+                category = 'emo'
                 if toConllu == False: output['Results'][1] = {'POS': 'SYM'} 
                 elif toConllu == True: output['Results'][1] = {'LEMMA': token, 'UPOS': 'SYM', 'FEATS': '_'}
         elif ' ' in token and len(token) > 4:
             if re.fullmatch(tokenCategories['numSpace'], token):
+                category = 'numSpace'
                 if toConllu == False: output['Results'][1] = {'POS': 'NUM'} 
                 elif toConllu == True: output['Results'][1] = {'LEMMA': token, 'UPOS': 'NUM', 'FEATS': '_'}
         # database lookup for word-like tokens
         elif re.fullmatch(tokenCategories['word'], token):
+            category = 'word'
             output['Results'] = DBresults(token)
         # checking against regex categories
         elif re.fullmatch(tokenCategories['num'], token): 
+            category = 'num'
             if toConllu == False: output['Results'][1] = {'POS': 'NUM'} 
             elif toConllu == True: output['Results'][1] = {'LEMMA': token, 'UPOS': 'NUM', 'FEATS': '_'}
         elif re.fullmatch(tokenCategories['code'], token):
+            category = 'code'
             if toConllu == False: output['Results'][1] = {'POS': 'PROPN'} 
             elif toConllu == True: output['Results'][1] = {'LEMMA': token, 'UPOS': 'PROPN', 'FEATS': '_'}
         elif re.fullmatch(tokenCategories['abbr'], token):
+            category = 'abbr'
             if toConllu == False: output['Results'][1] = {'Abbr': True} 
             elif toConllu == True: output['Results'][1] = {'LEMMA': '_', 'UPOS': 'X', 'FEATS': 'Abbr=Yes'}
         
@@ -1120,8 +3394,64 @@ def annotateToken(token, toConllu = False, extended = True):
         else: 
              if toConllu == True: output['Results'][1] = {'LEMMA': '_', 'UPOS': 'X', 'FEATS': '_'}
 
+    if statsEnabled: _count('Tokens', category)
+
     if (not output['Results']) and (toConllu == False): del output['Results']
 
+    if tokenCache['Size']:
+        with tokenCache['Lock']:
+            tokenCache['Cache'][cacheKey] = (category, copy.deepcopy(output))
+            if len(tokenCache['Cache']) > tokenCache['Size']: tokenCache['Cache'].popitem(last = False)
+
+    return output
+
+
+def _uncachedTokens(tokens, toConllu = False, extended = True):
+    '''
+    Select the tokens without a cached annotation for the given arguments of `annotateToken()`.
+
+    [RETURNS]:
+    - `output` (set) : Distinct tokens that are not cached, or all distinct tokens if the cache is disabled.
+
+    [USAGE]:
+    This function is used as an interim operation and is not intended for stand-alone use.
+    '''
+    tokenCache = _cacheState()
+    if not tokenCache['Size']: return set(tokens)
+    databaseFile, stopWords = (_settings().get('databaseFile'), _settings()['stopWords']['String'])
+    with tokenCache['Lock']: return set([token for token in tokens if (token, toConllu, extended, databaseFile, stopWords) not in tokenCache['Cache']])
+
+
+def annotateTokens(tokens, toConllu = False, extended = True):
+    '''
+    Annotate many tokens at once with the same result as `annotateToken()` for each token. Distinct word-like tokens are looked up in the database in bulk,
+    with a few statements for all of them instead of several statements per token, and tokens with cached annotations are not looked up at all (see `setCacheSize()`).
+
+    [ARGUMENTS]:
+    - `tokens` (tuple, list) : Word-level tokens.
+    - `toConllu` (bool) OPTIONAL: The structure of token annotation, see `annotateToken()`.
+    - `extended` (bool) OPTIONAL: This attribute indicates whether additional token types are included in the search, see `annotateToken()`.
+
+    [RETURNS]:
+    - `output` (tuple) : `annotateToken()` output for each token in the same order.
+
+    [USAGE]:
+    This operation is intended to be used after tokenization, e.g. for batches of tokens from many texts. Annotations of repeated tokens are independent copies.
+    '''
+    # CHECK FOR `TOKENS` VALUE VALIDITY
+    if not isinstance(tokens, (tuple, list)): return None
+
+    # BULK DATABASE LOOKUP
+    words = set([token for token in tokens if isinstance(token, str) and re.fullmatch(tokenCategories['word'], token)])
+    words = _uncachedTokens(words, toConllu, extended)
+
+    # prefetched data is read by `annotateToken()` in the same thread
+    _threadData.prefetched = _prefetch(words, toConllu) if words else None
+    try:
+        output = tuple([annotateToken(token, toConllu, extended) for token in tokens])
+    finally:
+        _threadData.prefetched = None
+
     return output
 
 
@@ -1171,6 +3501,105 @@ def annotateSentence(tokens, toConllu = False, extended = True):
     return output
 
 
+def annotateSentences(sentences, toConllu = False, extended = True, threads = 1):
+    '''
+    Annotate many sentences with the same result as `annotateSentence()` for each sentence, optionally on a pool of threads. 
+    Every thread uses its own database connection, and the token cache is shared. The threads run with the settings of the caller, i.e. of the `Analyzer` whose method is called.
+
+    [ARGUMENTS]:
+    - `sentences` (tuple, list) : Sentences as tuples of tokens, e.g. `splitSentences()` output.
+    - `toConllu` (bool) OPTIONAL: The structure of token annotation, see `annotateSentence()`.
+    - `extended` (bool) OPTIONAL: This attribute indicates whether additional token types are included in the search, see `annotateSentence()`.
+    - `threads` (int) OPTIONAL : The number of threads. With `1` (default), sentences are annotated in the calling thread.
+
+    [RETURNS]:
+    - `output` (tuple) : `annotateSentence()` output for each sentence in the same order.
+    OR
+    - `None` (NoneType) : Returned if the arguments are invalid.
+
+    [USAGE]:
+    Threads speed annotation up mostly on free-threaded Python builds, where regex and dictionary work of different sentences runs in parallel; with the GIL, only database reads overlap.
+    The pool is kept between calls with the same number of threads.
+    '''
+    # CHECK FOR ARGUMENT VALIDITY
+    if not isinstance(sentences, (tuple, list)) or not isinstance(threads, int) or threads < 1: return None
+
+    if threads == 1 or len(sentences) < 2: return tuple([annotateSentence(sentence, toConllu, extended) for sentence in sentences])
+
+    # sentences are annotated in chunks, a few per thread, to keep the pool overhead low
+    chunkSize = max(1, math.ceil(len(sentences) / (threads * 4)))
+    chunks = [sentences[start:start + chunkSize] for start in range(0, len(sentences), chunkSize)]
+    analyzer = _activeAnalyzer.get()
+
+    def annotateChunk(chunk):
+        token = _activeAnalyzer.set(analyzer)
+        try: return [annotateSentence(sentence, toConllu, extended) for sentence in chunk]
+        finally: _activeAnalyzer.reset(token)
+
+    output = []
+    for annotatedChunk in _threadPoolMap(threads, annotateChunk, chunks): output.extend(annotatedChunk)
+
+    return tuple(output)
+
+
+def _paragraphSentences(paragraph):
+    '''
+    Tokenize a paragraph, regroup abbreviations with `.` full stop marks and split the tokens into sentences.
+
+    [ARGUMENTS]:
+    - `paragraph` (str) : A stripped paragraph of plain text.
+
+    [RETURNS]:
+    - `sentences` (tuple) : `splitSentences()` output for the finalized token list.
+
+    [USAGE]:
+    This function is used as an interim operation in `annotateText()` and `annotateToArrays()` and is not intended for stand-alone use.
+    '''
+    tokensApprox = tokenize(paragraph)
+
+    # finalize token list
+    tokensToRegroup = ()
+    # search for abbreviations to regroup with `.` full stop marks
+    for i, token in [item for item in enumerate(tokensApprox) if (item[0] > 0) and (item[1] == '.')]:
+        if tokensApprox[i-1].lower() in abbreviations['stopNonFinal']: tokensToRegroup += (i - 1,)                   
+    # regroup tokens
+    if tokensToRegroup:
+        tokens = ()
+        for i, token in enumerate(tokensApprox):
+            if i in tokensToRegroup: tokens += (token + '.',)
+            elif i - 1 in tokensToRegroup: continue
+            else: tokens += (token,)
+    else: tokens = tokensApprox
+
+    return splitSentences(tokens)
+
+
+def _annotateParagraph(paragraph, toConllu = False, extended = True):
+    '''
+    Annotate one paragraph of `annotateText()` output.
+
+    [ARGUMENTS]:
+    - `paragraph` (str) : A stripped paragraph of plain text.
+    - `toConllu` (bool) OPTIONAL: The structure of token annotation, see `annotateText()`.
+    - `extended` (bool) OPTIONAL: This attribute indicates whether additional token types are included in the search, see `annotateText()`.
+
+    [RETURNS]:
+    - `output` (dict) : Paragraph annotation with `Text` and `Sentences` keys.
+
+    [USAGE]:
+    This function is used as an interim operation in `annotateText()` and `IncrementalAnnotator` and is not intended for stand-alone use.
+    '''
+    # GENERATE SENTENCE LEVEL ANNOTATION
+    sentences = {}
+    sentenceID = 1
+    
+    for sentence in _paragraphSentences(paragraph): 
+        sentences[sentenceID] = {'Text': ''.join(sentence), 'Tokens': annotateSentence(sentence, toConllu, extended)}
+        sentenceID += 1
+
+    return {'Text': paragraph, 'Sentences': sentences}
+
+
 def annotateText(text, toConllu = False, extended = True):
     '''
     Segment plain text into nested numbered paragraphs, sentences and word-level tokens, and provide token annotation. Paragraphs are segmented at `\n` new line character.
@@ -1200,104 +3629,414 @@ def annotateText(text, toConllu = False, extended = True):
     paragraphs = [paragraph.strip() for paragraph in text.split('\n') if paragraph]
     
     for paragraph in paragraphs:
-        tokensApprox = tokenize(paragraph)
-        sentenceID = 1
-        sentences = ()
+        output['Paragraphs'][paragraphID] = _annotateParagraph(paragraph, toConllu, extended)
+        paragraphID += 1 
 
-        # finalize token list
-        tokensToRegroup = ()
-        # search for abbreviations to regroup with `.` full stop marks
-        for i, token in [item for item in enumerate(tokensApprox) if (item[0] > 0) and (item[1] == '.')]:
-            if tokensApprox[i-1].lower() in abbreviations['stopNonFinal']: tokensToRegroup += (i - 1,)                   
-        # regroup tokens
-        if tokensToRegroup:
-            tokens = ()
-            for i, token in enumerate(tokensApprox):
-                if i in tokensToRegroup: tokens += (token + '.',)
-                elif i - 1 in tokensToRegroup: continue
-                else: tokens += (token,)
-        else: tokens = tokensApprox
-                    
-        # GENERATE SENTENCE LEVEL ANNOTATION
-        sentences = {}
-        sentenceID = 1
-        
-        for sentence in splitSentences(tokens): 
-            sentences[sentenceID] = {'Text': ''.join(sentence), 'Tokens': annotateSentence(sentence, toConllu, extended)}
-            sentenceID += 1
+    return output
 
-        output['Paragraphs'][paragraphID] = {'Text': paragraph, 'Sentences': sentences}
-        paragraphID += 1 
+
+def annotateFile(path, outputPath = None, toConllu = False, extended = True):
+    '''
+    Annotate a plain-text file of any size paragraph by paragraph, with the same result as `annotateText()` for the file's content.
+    The file is mapped into memory with `mmap`, paragraph boundaries are found by scanning for `\n` new line characters, and every paragraph is decoded as UTF-8 
+    only when it is annotated, so memory use does not depend on the file size. Annotated paragraphs are either generated one by one or written to a CoNLL-U file.
+
+    [ARGUMENTS]:
+    - `path` (str) : OS path to a UTF-8 plain-text file. Invalid UTF-8 sequences are replaced with `�`.
+    - `outputPath` (str) OPTIONAL : OS path to a CoNLL-U file. If specified, the file is written incrementally and has the same content as `generateConllu()` output 
+      for `annotateText()` output with `toConllu == True`.
+    - `toConllu` (bool) OPTIONAL: The structure of token annotation, see `annotateText()`. CoNLL-U structure is always used if `outputPath` is specified.
+    - `extended` (bool) OPTIONAL: This attribute indicates whether additional token types are included in the search, see `annotateText()`.
+
+    [RETURNS]:
+    - `output` (generator) : `(paragraphID, paragraph)` tuples, the items of `annotateText()` output's `Paragraphs` dictionary. Returned if `outputPath` is not specified.
+    OR
+    - `message` (str) : Confirmation message if `outputPath` is specified, or error message.
+
+    [USAGE]:
+    for paragraphID, paragraph in annotateFile('corpus.txt'): ...
+    '''
+    if not isinstance(path, str) or not os.path.isfile(path): return 'Invalid file path.'
+
+    def paragraphs():
+        with open(path, 'rb') as file:
+            # empty files can't be mapped
+            if os.fstat(file.fileno()).st_size == 0: return
+            with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as data:
+                start = 0
+                while start < len(data):
+                    end = data.find(b'\n', start)
+                    if end == -1: end = len(data)
+                    # empty paragraphs are skipped and the rest are stripped, as in `annotateText()`
+                    if end > start: yield data[start:end].decode('utf-8', errors = 'replace').strip()
+                    start = end + 1
+
+    def annotate(toConllu):
+        for paragraphID, paragraph in enumerate(paragraphs(), 1): yield (paragraphID, _annotateParagraph(paragraph, toConllu, extended))
+
+    if outputPath is None: return _analyzerGenerator(annotate(toConllu))
+
+    with open(outputPath, 'w', encoding = 'utf-8', newline = '') as file:
+        # `generateConllu()` output is stripped, so trailing whitespace of a paragraph is only written if another paragraph follows
+        pending = ''
+        for paragraphID, annotation in annotate(True):
+            rows = _conlluParagraph(paragraphID, annotation)
+            file.write(pending + rows.rstrip())
+            pending = rows[len(rows.rstrip()):]
+
+    return f'{os.path.abspath(outputPath)} was created.'
+
+
+@_timed('annotateToArrays')
+def annotateToArrays(text, extended = True, useNumpy = False):
+    '''
+    Segment and annotate plain text like `annotateText()`, but return the annotation as flat column arrays instead of nested dictionaries, e.g. as input for machine learning pipelines.
+    Tokens are numbered from 0 in text order, and their candidate analyses are stored in compressed sparse row (CSR) layout: the analyses of token `i` are 
+    at positions `CandidateOffsets[i]` to `CandidateOffsets[i + 1]` of the candidate arrays. `UPOS` and `FEATS` values are coded as integers, see `Vocabulary`.
+    Distinct tokens are looked up in the database in bulk, and no dictionaries are created per token.
+
+    [ARGUMENTS]:
+    - `text` (str) : Plain text with paragraphs and sentences.
+    - `extended` (bool) OPTIONAL: This attribute indicates whether additional token types are included in the search, see `annotateText()`.
+    - `useNumpy` (bool) OPTIONAL : Output array type.
+      [VALUE OPTIONS]:
+        - False DEFAULT : `array.array` from the standard library.
+        - True : Read-only NumPy arrays that share memory with the `array.array` buffers. Requires NumPy to be installed.
+
+    [RETURNS]:
+    - `output` (dict) : Column arrays with the following keys:
+        - `TokenStart`, `TokenEnd` (int32) : Character offsets of every token in `text`, the end is exclusive.
+        - `TokenSentence` (int32) : Sentence index of every token.
+        - `SpaceAfter` (uint8) : `0` for tokens followed by another token without a space in the same sentence (`SpaceAfter=No` in CoNLL-U), otherwise `1`.
+        - `SentenceParagraph` (int32) : Paragraph index of every sentence.
+        - `CandidateOffsets` (int32) : Start of every token's candidates in the candidate arrays, with the total number of candidates as the last item.
+        - `FormID`, `LemmaID` (int32) : Form and lemma IDs of every candidate; `0` for analyses of extended token types, e.g. punctuation marks, that are not in the database.
+        - `UPOS` (uint16), `FEATS` (int32) : Codes of every candidate's `UPOS` and `FEATS` values.
+        - `Vocabulary` (dict) : Lists of `UPOS` and `FEATS` values, indexed by their codes.
+      Tokens without matches have no candidates.
+    OR
+    - `None` (NoneType) : Returned if `text` is not a string.
+    OR
+    - `message` (str) : Returned if NumPy is requested but not installed.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    # check argument validity
+    if not isinstance(text, str): return None
+    # NumPy is an optional dependency, imported only when it is requested
+    if useNumpy == True:
+        try: import numpy
+        except ImportError: return 'NumPy is not installed.'
+
+    # SEGMENTATION
+    # paragraphs are split at `\n` new line character, the same way as in `annotateText()`
+    paragraphs = [_paragraphSentences(paragraph.strip()) for paragraph in text.split('\n') if paragraph]
+
+    # BULK DATABASE LOOKUP
+    # candidates of every distinct token as `(formID, lemID, upos, feats)` tuples
+    tokens = set([token for sentences in paragraphs for sentence in sentences for token in sentence if token != ' '])
+    # word-like tokens, except for abbreviations which `annotateToken()` checks first
+    words = set([token for token in tokens if re.fullmatch(tokenCategories['word'], token) and not (extended == True and token in abbreviations['noStop'])])
+    lookup = _lookupForms([word for word in words if _knownForm(word)])
+    if not isinstance(lookup, dict): return lookup
+    analyses = _formAnalyses([formID for formIDs in lookup.values() if formIDs for formID in formIDs])
+    if not isinstance(analyses, dict): return analyses
+
+    candidates = {}
+    for token in tokens:
+        if token in words: candidates[token] = tuple([(formID,) + analyses[formID] for formID in lookup.get(token) or () if formID in analyses])
+        else:
+            # extended token types are classified by `annotateToken()`, skipping placeholder results of unknown tokens
+            results = (annotateToken(token, True, extended).get('Results') or {}).values()
+            candidates[token] = tuple([(0, 0, result.get('UPOS', '_'), result['FEATS']) for result in results if result != {'LEMMA': '_', 'UPOS': 'X', 'FEATS': '_'}])
+
+    # COLUMN ARRAYS
+    output = {'TokenStart': array.array('i'), 'TokenEnd': array.array('i'), 'TokenSentence': array.array('i'), 'SpaceAfter': array.array('B'),
+              'SentenceParagraph': array.array('i'), 'CandidateOffsets': array.array('i', [0]),
+              'FormID': array.array('i'), 'LemmaID': array.array('i'), 'UPOS': array.array('H'), 'FEATS': array.array('i'),
+              'Vocabulary': {'UPOS': [], 'FEATS': []}}
+    codes = {'UPOS': {}, 'FEATS': {}}
+    position = 0
+    sentenceIndex = 0
+
+    for paragraphIndex, sentences in enumerate(paragraphs):
+        for sentence in sentences:
+            output['SentenceParagraph'].append(paragraphIndex)
+            for i, token in [item for item in enumerate(sentence) if item[1] != ' ']:
+                # tokens are substrings of the text in the same order
+                position = text.find(token, position)
+                output['TokenStart'].append(position)
+                position += len(token)
+                output['TokenEnd'].append(position)
+                output['TokenSentence'].append(sentenceIndex)
+                # the same `SpaceAfter` check as in `annotateSentence()`
+                output['SpaceAfter'].append(0 if i < len(sentence) - 1 and sentence[i + 1] != ' ' else 1)
+
+                for formID, lemID, upos, feats in candidates[token]:
+                    output['FormID'].append(formID)
+                    output['LemmaID'].append(lemID)
+                    for column, value in (('UPOS', upos), ('FEATS', feats)):
+                        if value not in codes[column]:
+                            codes[column][value] = len(output['Vocabulary'][column])
+                            output['Vocabulary'][column].append(value)
+                        output[column].append(codes[column][value])
+                output['CandidateOffsets'].append(len(output['FormID']))
+            sentenceIndex += 1
+
+    if useNumpy == True:
+        for key in [key for key in output if key != 'Vocabulary']:
+            output[key] = numpy.frombuffer(output[key], dtype = output[key].typecode) if output[key] else numpy.zeros(0, dtype = output[key].typecode)
+            # arrays over `array.array` buffers are writable unless they are flagged otherwise
+            output[key].setflags(write = False)
+
+    return output
+
+
+def iterLemmas(text, lemmaStrings = False, chunkSize = 5000):
+    '''
+    Lemmatize plain text without full annotation, e.g. for search indexing: tokens are paired with the lemmas of their forms straight from a bulk form lookup,
+    without requesting form data or building annotation dictionaries. Paragraphs and tokens are split as in `annotateText()`, and stop words are filtered.
+
+    [ARGUMENTS]:
+    - `text` (str) : Plain text.
+    - `lemmaStrings` (bool) OPTIONAL : Lemma format.
+      [VALUE OPTIONS]:
+        - False DEFAULT : Integer lemma IDs.
+        - True : Lemmas as they are stored in the `Lemma` column of `Lemma` table.
+    - `chunkSize` (int) OPTIONAL : The number of tokens whose new word types are looked up together.
+
+    [RETURNS]:
+    - `output` (generator) : `(token, lemmas)` tuples for all tokens except spaces in text order. `lemmas` is a tuple of the distinct lemmas of the token's matches:
+      case-sensitive matches if there are any, otherwise case-insensitive matches, as in `annotateToken()`. It is empty for non-word tokens, unknown words and stop words.
+      If the database could not be read, `sqlite3.Error` exception is generated instead, and the generator stops.
+    OR
+    - `None` (NoneType) : Returned if `text` is not a string.
+
+    [USAGE]:
+    for token, lemIDs in iterLemmas(text): ...
+    '''
+    if not isinstance(text, str): return None
+
+    def tokens():
+        for paragraph in text.split('\n'):
+            if paragraph: yield from [token for token in tokenize(paragraph.strip()) if token != ' ']
+
+    def generate():
+        # lemmas of every word type and lemma strings of every lemma ID, looked up once per call
+        lemmas, strings = ({}, {})
+        for chunk in _chunks(tokens(), chunkSize):
+            words = set([token for token in chunk if token not in lemmas and re.fullmatch(tokenCategories['word'], token)])
+
+            if words:
+                try:
+                    lookup = _lookupForms(words, lemmas = True)
+                    if isinstance(lookup, dict) and lemmaStrings == True:
+                        newIDs = set([lemID for lemIDs in lookup.values() if lemIDs for lemID in lemIDs if lemID not in strings])
+                        with _connect() as connection:
+                            cursor = connection.cursor()
+                            for idChunk in _chunks(sorted(newIDs)): strings.update(_query(cursor, f'SELECT ID, Lemma FROM Lemma WHERE ID IN ({', '.join([str(lemID) for lemID in idChunk])})', 'all'))
+                except sqlite3.Error as exception:
+                    lookup = exception
+
+                if not isinstance(lookup, dict):
+                    yield lookup
+                    return
+                for word, lemIDs in lookup.items():
+                    if not lemIDs: lemmas[word] = ()
+                    # homonymous lemmas have the same string
+                    elif lemmaStrings == True: lemmas[word] = tuple(dict.fromkeys([strings[lemID] for lemID in lemIDs if lemID in strings]))
+                    else: lemmas[word] = lemIDs
+
+            for token in chunk: yield (token, lemmas.get(token, ()))
+
+    return _analyzerGenerator(generate())
+
+
+def lemmatize(text, lemmaStrings = False):
+    '''
+    Lemmatize plain text without full annotation, see `iterLemmas()`.
+
+    [ARGUMENTS]:
+    - `text` (str) : Plain text.
+    - `lemmaStrings` (bool) OPTIONAL : Lemma format, see `iterLemmas()`.
+
+    [RETURNS]:
+    - `output` (tuple) : `(token, lemmas)` tuples for all tokens except spaces in text order.
+    OR
+    - `None` (NoneType) : Returned if `text` is not a string.
+    OR
+    - `exception` (sqlite3.Error) : Returned if the database could not be read.
+    '''
+    if not isinstance(text, str): return None
+
+    output = tuple(iterLemmas(text, lemmaStrings))
+    if output and isinstance(output[-1], sqlite3.Error): return output[-1]
 
     return output
 
 
+class IncrementalAnnotator:
+    '''
+    Re-annotate a document that is edited repeatedly, e.g. in a text editor, annotating only the paragraphs that changed since the previous call.
+    Paragraph annotations are kept by a hash of the paragraph text, so unchanged, moved and duplicated paragraphs are reused, and paragraph IDs are renumbered
+    in the order of the new text. The output of `update()` has the same structure and values as `annotateText()` output for the whole text.
+
+    [ARGUMENTS]:
+    - `toConllu` (bool) OPTIONAL: The structure of token annotation, see `annotateText()`.
+    - `extended` (bool) OPTIONAL: This attribute indicates whether additional token types are included in the search, see `annotateText()`.
+    - `analyzer` (Analyzer) OPTIONAL : The analyzer whose settings are used. If not specified, the module settings are used.
+
+    [RAISES]:
+    - `ValueError` : `analyzer` is not an `Analyzer`.
+
+    [USAGE]:
+        annotator = IncrementalAnnotator(toConllu = True)
+        annotation = annotator.update(text)
+        annotation = annotator.update(editedText)
+        annotator.counters['Annotated']
+    Every output holds its own copies of paragraph annotations, like `annotateText()` output, so they can be modified without affecting other paragraphs or later calls.
+    '''
+    def __init__(self, toConllu = False, extended = True, analyzer = None):
+        if analyzer is not None and not isinstance(analyzer, Analyzer): raise ValueError('Invalid analyzer.')
+
+        self.toConllu = toConllu
+        self.extended = extended
+        self.analyzer = analyzer
+        # paragraph annotations of the last text by hash, and the settings they were annotated with
+        self._paragraphs = {}
+        self._signature = None
+        # paragraphs of the last text and the number of paragraphs that were annotated rather than reused
+        self.counters = {'Paragraphs': 0, 'Annotated': 0}
+
+    def __repr__(self):
+        return f'IncrementalAnnotator(toConllu = {self.toConllu}, extended = {self.extended}, {len(self._paragraphs)} paragraphs)'
+
+    def update(self, newText):
+        '''
+        Annotate the current state of the document.
+
+        [ARGUMENTS]:
+        - `newText` (str) : The whole text of the document.
+
+        [RETURNS]:
+        - `output` (dict) : Segmented, tokenized and annotated text, see `annotateText()`.
+        OR
+        - `None` (NoneType) : Returned if `newText` is not a string.
+        '''
+        if not isinstance(newText, str): return None
+
+        token = _activeAnalyzer.set(self.analyzer) if self.analyzer is not None else None
+        try:
+            # annotations of different databases or stop words are not reused
+            signature = (_settings().get('databaseFile'), _settings()['stopWords']['String'])
+            if signature != self._signature: self._paragraphs, self._signature = ({}, signature)
+
+            output = {'Paragraphs': {}}
+            paragraphs = {}
+            annotated = 0
+            # paragraphs are split at `\n` new line character, the same way as in `annotateText()`
+            for paragraphID, paragraph in enumerate([paragraph.strip() for paragraph in newText.split('\n') if paragraph], 1):
+                key = hashlib.blake2b(paragraph.encode('utf-8'), digest_size = 16).digest()
+                annotation = paragraphs.get(key) or self._paragraphs.get(key)
+                if annotation is None:
+                    annotation = _annotateParagraph(paragraph, self.toConllu, self.extended)
+                    annotated += 1
+                paragraphs[key] = annotation
+                # kept annotations are never returned themselves, so that modifying the output doesn't change repeated paragraphs or the next output
+                output['Paragraphs'][paragraphID] = copy.deepcopy(annotation)
+        finally:
+            if token is not None: _activeAnalyzer.reset(token)
+
+        # only the paragraphs of the current text are kept
+        self._paragraphs = paragraphs
+        self.counters = {'Paragraphs': len(output['Paragraphs']), 'Annotated': annotated}
+
+        return output
 
 
 # CONLL-U TABLE OPERATIONS
 
-def generateConllu(annotatedText):
+def _conlluParagraph(paragraphID, paragraph):
     '''
-    Generate a tab-separated CoNLL-U table from annotated text in dictionary format, mapping the latter to the columns `ID`, `FORM`, `LEMMA`, `UPOS`, `XPOS`, `FEATS`, `HEAD`, `DEPREL`, `DEPS` & `MISC`. Only `ID`, `FORM`, `LEMMA`, `UPOS`, `MISC` columns are populated, the rest use the standard '_' placeholer.
+    Generate the CoNLL-U rows of one paragraph of annotated text, see `generateConllu()`.
 
     [ARGUMENTS]:
-    - `annotatedText` (dict) : Annotated text as outputted by `annotateText()` function with `toConllu == True`.
+    - `paragraphID` (int) : Paragraph ID.
+    - `paragraph` (dict) : Paragraph annotation with `Text` and `Sentences` keys, as in `annotateText()` output with `toConllu == True`.
 
     [RETURNS]:
-    - `output` (str) : Tab-separated CoNLL-U table.
+    - `output` (str) : CoNLL-U rows of the paragraph, each sentence followed by an empty line.
+
+    [USAGE]:
+    This function is used as an interim operation in `generateConllu()` and `annotateFile()` and is not intended for stand-alone use.
     '''
-    # check the validity of `annotatedText` value
-    if (not isinstance(annotatedText, dict)) or (isinstance(annotatedText, dict) and 'Paragraphs' not in annotatedText.keys()): return None
+    output = ''
 
-    # reset
-    output = '' 
+    outputParagraphID = f'p{str(paragraphID)}'
+    # add paragraph header row
+    output += f'newpar id = {outputParagraphID}\n'
+    
+    for sentenceID in sorted(paragraph['Sentences'].keys()):
+        outputSententenceID = f'{outputParagraphID}s{str(sentenceID)}'
+        # add sentence header row
+        output += f'# sent_id = {outputSententenceID}\n# text = {paragraph['Sentences'][sentenceID]['Text']}\n'
+        # add token rows
+        for tokenID in sorted(paragraph['Sentences'][sentenceID]['Tokens'].keys()):
+            # tokens with one search result use basic one-row structure
+            if len(paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results']) == 1:
+                output += '\t'.join(
+                    (str(tokenID),
+                    paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['FORM'],
+                    paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][1]['LEMMA'],
+                    paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][1]['UPOS'],
+                    '_',
+                    paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][1]['FEATS'],
+                    '_', '_', '_',
+                    paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['MISC'])) + '\n'
+
+            # tokens with multiple search results have the main row as the header and a node for each result
+            elif len(paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results']) > 1:
+                # add token header row
+                output += '\t'.join((str(tokenID), paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['FORM'], '_', '_', '_', '_', '_', '_', '_', paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['MISC'])) + '\n'
+                # add result nodes
+                for result in sorted(paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results'].keys()):
+                    outputResultID = '.'.join((str(tokenID), str(result)))
 
-    for paragraphID in sorted(annotatedText['Paragraphs'].keys()):
-        outputParagraphID = f'p{str(paragraphID)}'
-        # add paragraph header row
-        output += f'newpar id = {outputParagraphID}\n'
-        
-        for sentenceID in sorted(annotatedText['Paragraphs'][paragraphID]['Sentences'].keys()):
-            outputSententenceID = f'{outputParagraphID}s{str(sentenceID)}'
-            # add sentence header row
-            output += f'# sent_id = {outputSententenceID}\n# text = {annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Text']}\n'
-            # add token rows
-            for tokenID in sorted(annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'].keys()):
-                # tokens with one search result use basic one-row structure
-                if len(annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results']) == 1:
                     output += '\t'.join(
-                        (str(tokenID),
-                        annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['FORM'],
-                        annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][1]['LEMMA'],
-                        annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][1]['UPOS'],
-                        '_',
-                        annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][1]['FEATS'],
-                        '_', '_', '_',
-                        annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['MISC'])) + '\n'
+                        (outputResultID,
+                         '_',
+                         paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][result]['LEMMA'],
+                         paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][result]['UPOS'],
+                         '_',
+                         paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][result]['FEATS'],
+                         '_', '_', '_', '_')) + '\n'
 
-                # tokens with multiple search results have the main row as the header and a node for each result
-                elif len(annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results']) > 1:
-                    # add token header row
-                    output += '\t'.join((str(tokenID), annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['FORM'], '_', '_', '_', '_', '_', '_', '_', annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['MISC'])) + '\n'
-                    # add result nodes
-                    for result in sorted(annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results'].keys()):
-                        outputResultID = '.'.join((str(tokenID), str(result)))
+            # placeholder for the unlikely event of the absense of search results
+            elif len(paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['Results']) == 0:
+                output += '\t'.join((str(tokenID), paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['FORM'], '_', 'X', '_', '_', '_', '_', '_', paragraph['Sentences'][sentenceID]['Tokens'][tokenID]['MISC'])) + '\n'
+
+        # a sentence must be separated by an empty line
+        output += '\n'
+
+    return output
 
-                        output += '\t'.join(
-                            (outputResultID,
-                             '_',
-                             annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][result]['LEMMA'],
-                             annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][result]['UPOS'],
-                             '_',
-                             annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results'][result]['FEATS'],
-                             '_', '_', '_', '_')) + '\n'
 
-                # placeholder for the unlikely event of the absense of search results
-                elif len(annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['Results']) == 0:
-                    output += '\t'.join((str(tokenID), annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['FORM'], '_', 'X', '_', '_', '_', '_', '_', annotatedText['Paragraphs'][paragraphID]['Sentences'][sentenceID]['Tokens'][tokenID]['MISC'])) + '\n'
+@_timed('generateConllu')
+def generateConllu(annotatedText):
+    '''
+    Generate a tab-separated CoNLL-U table from annotated text in dictionary format, mapping the latter to the columns `ID`, `FORM`, `LEMMA`, `UPOS`, `XPOS`, `FEATS`, `HEAD`, `DEPREL`, `DEPS` & `MISC`. Only `ID`, `FORM`, `LEMMA`, `UPOS`, `MISC` columns are populated, the rest use the standard '_' placeholer.
+
+    [ARGUMENTS]:
+    - `annotatedText` (dict) : Annotated text as outputted by `annotateText()` function with `toConllu == True`.
+
+    [RETURNS]:
+    - `output` (str) : Tab-separated CoNLL-U table.
+    '''
+    # check the validity of `annotatedText` value
+    if (not isinstance(annotatedText, dict)) or (isinstance(annotatedText, dict) and 'Paragraphs' not in annotatedText.keys()): return None
 
-            # a sentence must be separated by an empty line
-            output += '\n'
+    # paragraphs are generated in the order of their IDs
+    output = ''.join([_conlluParagraph(paragraphID, annotatedText['Paragraphs'][paragraphID]) for paragraphID in sorted(annotatedText['Paragraphs'].keys())])
 
     return output.strip()
 
@@ -1375,6 +4114,373 @@ def completeConllu(incompleteConllu, extended = True):
     return output
 
 
+# ANNOTATED CORPUS FILES
+# binary snapshots of `annotateText()` output with `toConllu == True`: every distinct string is stored once in a string table, 
+# and paragraphs, sentences, tokens and results are rows of little-endian uint32 codes, so that a file can be read through `mmap` without parsing
+_annotatedHeader = '<4sIIIIIII'
+# code of an absent `UPOS` value
+_annotatedNone = 0xFFFFFFFF
+
+def saveAnnotated(annotation, path):
+    '''
+    Save annotated text with CoNLL-U structure to a compact binary file, see `loadAnnotated()`. 
+    Every distinct string, e.g. a lemma or `FEATS` value, is stored once, and tokens refer to strings by integer codes.
+
+    [ARGUMENTS]:
+    - `annotation` (dict) : Annotated text as outputted by `annotateText()` function with `toConllu == True`.
+    - `path` (str) : OS path to the target file.
+
+    [RETURNS]:
+    - `message` (str) : Confirmation or error message.
+    '''
+    # CHECK `ANNOTATION` VALUE VALIDITY
+    if not isinstance(annotation, dict) or not isinstance(annotation.get('Paragraphs'), dict): return 'Invalid annotation format.'
+
+    # STRING & ROW TABLES
+    strings = {}
+    def code(value):
+        if value not in strings: strings[value] = len(strings)
+        return strings[value]
+
+    tables = {'Paragraphs': array.array('I'), 'ParagraphStarts': array.array('I'), 'Sentences': array.array('I'), 'SentenceStarts': array.array('I'),
+              'Tokens': array.array('I'), 'TokenStarts': array.array('I'), 'Results': array.array('I')}
+    try:
+        for paragraphID, paragraph in annotation['Paragraphs'].items():
+            tables['Paragraphs'].extend((paragraphID, code(paragraph['Text'])))
+            tables['ParagraphStarts'].append(len(tables['Sentences']) // 2)
+            for sentenceID, sentence in paragraph['Sentences'].items():
+                tables['Sentences'].extend((sentenceID, code(sentence['Text'])))
+                tables['SentenceStarts'].append(len(tables['Tokens']) // 3)
+                for tokenID, token in sentence['Tokens'].items():
+                    # only CoNLL-U values are stored, so other keys can't be restored
+                    if set(token.keys()) != {'FORM', 'MISC', 'Results'}: return 'Invalid annotation format. Annotated text with CoNLL-U structure is expected.'
+                    tables['Tokens'].extend((tokenID, code(token['FORM']), code(token['MISC'])))
+                    tables['TokenStarts'].append(len(tables['Results']) // 4)
+                    for resultID, result in token['Results'].items():
+                        if not set(result.keys()) <= {'LEMMA', 'UPOS', 'FEATS'} or not {'LEMMA', 'FEATS'} <= set(result.keys()): return 'Invalid annotation format. Annotated text with CoNLL-U structure is expected.'
+                        tables['Results'].extend((resultID, code(result['LEMMA']), code(result['UPOS']) if 'UPOS' in result else _annotatedNone, code(result['FEATS'])))
+    # IDs have to be non-negative integers, and values strings
+    except (KeyError, TypeError, AttributeError, OverflowError):
+        return 'Invalid annotation format. Annotated text with CoNLL-U structure is expected.'
+    if not all(isinstance(value, str) for value in strings): return 'Invalid annotation format. Annotated text with CoNLL-U structure is expected.'
+
+    # the last start of each table is the number of rows of the next level
+    tables['ParagraphStarts'].append(len(tables['Sentences']) // 2)
+    tables['SentenceStarts'].append(len(tables['Tokens']) // 3)
+    tables['TokenStarts'].append(len(tables['Results']) // 4)
+
+    blob = bytearray()
+    stringOffsets = array.array('I', [0])
+    for value in strings:
+        blob += value.encode('utf-8')
+        stringOffsets.append(len(blob))
+
+    # GENERATE FILE
+    with open(path, 'wb') as file:
+        file.write(struct.pack(_annotatedHeader, b'SLAN', 1, len(tables['Paragraphs']) // 2, len(tables['Sentences']) // 2, len(tables['Tokens']) // 3, len(tables['Results']) // 4, len(strings), len(blob)))
+        for table in [stringOffsets] + [tables[key] for key in ('Paragraphs', 'ParagraphStarts', 'Sentences', 'SentenceStarts', 'Tokens', 'TokenStarts', 'Results')]:
+            if sys.byteorder == 'big': table.byteswap()
+            file.write(table.tobytes())
+        file.write(blob)
+
+    return f'{os.path.abspath(path)} was created.'
+
+
+class AnnotatedCorpus:
+    '''
+    Read-only access to a file created by `saveAnnotated()`. The file is mapped into memory with `mmap`, and only the requested sentences are decoded, 
+    so any sentence of a large corpus can be read without loading the whole file.
+
+    [USAGE]:
+    Opened with `loadAnnotated(path, lazy = True)`. The number of sentences is `len(corpus)`, `corpus.sentence(index)` returns one sentence, 
+    and `corpus.annotation()` the whole annotated text. Close the corpus with `corpus.close()` or use it as a context manager.
+    '''
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            self._file.close()
+            raise
+        self._view = memoryview(self._map)
+
+        headerSize = struct.calcsize(_annotatedHeader)
+        if len(self._map) < headerSize: self.close(); raise ValueError('Invalid file format.')
+        magic, version, paragraphs, sentences, tokens, results, strings, blobSize = struct.unpack_from(_annotatedHeader, self._map)
+        if magic != b'SLAN' or version != 1: self.close(); raise ValueError('Invalid file format.')
+        self.counts = {'Paragraphs': paragraphs, 'Sentences': sentences, 'Tokens': tokens, 'Results': results, 'Strings': strings}
+
+        # uint32 tables in file order
+        sizes = (('StringOffsets', strings + 1), ('Paragraphs', paragraphs * 2), ('ParagraphStarts', paragraphs + 1), ('Sentences', sentences * 2), ('SentenceStarts', sentences + 1),
+                 ('Tokens', tokens * 3), ('TokenStarts', tokens + 1), ('Results', results * 4))
+        if len(self._map) != headerSize + sum([size for _, size in sizes]) * 4 + blobSize: self.close(); raise ValueError('Invalid file format.')
+        self._tables = {}
+        position = headerSize
+        for name, size in sizes:
+            table = self._view[position:position + size * 4]
+            # tables are little-endian, so they are only copied on big-endian platforms
+            if sys.byteorder == 'big':
+                table = array.array('I', table)
+                table.byteswap()
+            else: table = table.cast('I')
+            self._tables[name] = table
+            position += size * 4
+        self._blob = self._view[position:]
+
+        # the paragraph of every sentence
+        self._paragraphIndex = array.array('I')
+        starts = self._tables['ParagraphStarts']
+        for paragraph in range(paragraphs): self._paragraphIndex.extend([paragraph] * (starts[paragraph + 1] - starts[paragraph]))
+
+    def __len__(self):
+        return self.counts['Sentences']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __repr__(self):
+        return f'AnnotatedCorpus({self.counts["Paragraphs"]} paragraphs, {self.counts["Sentences"]} sentences, {self.counts["Tokens"]} tokens)'
+
+    def close(self):
+        '''
+        Release the memory map and the file.
+        '''
+        if getattr(self, '_tables', None) is not None:
+            for table in self._tables.values():
+                if isinstance(table, memoryview): table.release()
+            self._blob.release()
+            self._tables = None
+        if getattr(self, '_view', None) is not None: self._view.release(); self._view = None
+        if getattr(self, '_map', None) is not None: self._map.close(); self._map = None
+        self._file.close()
+
+    def _string(self, code):
+        if code == _annotatedNone: return None
+        offsets = self._tables['StringOffsets']
+        return str(self._blob[offsets[code]:offsets[code + 1]], 'utf-8')
+
+    def _sentence(self, index, string):
+        '''
+        Decode a sentence, reading strings with `string(code)`.
+        '''
+        sentences, starts, tokens, tokenStarts, results = [self._tables[name] for name in ('Sentences', 'SentenceStarts', 'Tokens', 'TokenStarts', 'Results')]
+        output = {'Text': string(sentences[index * 2 + 1]), 'Tokens': {}}
+        for token in range(starts[index], starts[index + 1]):
+            tokenResults = {}
+            for result in range(tokenStarts[token] * 4, tokenStarts[token + 1] * 4, 4):
+                if results[result + 2] != _annotatedNone: tokenResults[results[result]] = {'LEMMA': string(results[result + 1]), 'UPOS': string(results[result + 2]), 'FEATS': string(results[result + 3])}
+                else: tokenResults[results[result]] = {'LEMMA': string(results[result + 1]), 'FEATS': string(results[result + 3])}
+            output['Tokens'][tokens[token * 3]] = {'FORM': string(tokens[token * 3 + 1]), 'MISC': string(tokens[token * 3 + 2]), 'Results': tokenResults}
+
+        return output
+
+    def sentence(self, index):
+        '''
+        Read one sentence by its position in the corpus.
+
+        [ARGUMENTS]:
+        - `index` (int) : Sentence position from 0 to `len(corpus) - 1`, counted across paragraphs.
+
+        [RETURNS]:
+        - `output` (tuple) : Paragraph ID, sentence ID and the sentence as in `annotateText()` output, i.e. a dictionary with `Text` and `Tokens` keys.
+        OR
+        - `None` (NoneType) : Returned if the index is out of range.
+        '''
+        if not isinstance(index, int) or not 0 <= index < self.counts['Sentences']: return None
+
+        return (self._tables['Paragraphs'][self._paragraphIndex[index] * 2], self._tables['Sentences'][index * 2], self._sentence(index, self._string))
+
+    def annotation(self):
+        '''
+        Read the whole annotated text.
+
+        [RETURNS]:
+        - `output` (dict) : Annotated text in the same structure as `annotateText()` output with `toConllu == True`.
+        '''
+        output = {'Paragraphs': {}}
+        # every string is decoded once
+        strings = [self._string(code) for code in range(self.counts['Strings'])]
+        paragraphs, starts = (self._tables['Paragraphs'], self._tables['ParagraphStarts'])
+        for paragraph in range(self.counts['Paragraphs']):
+            output['Paragraphs'][paragraphs[paragraph * 2]] = {'Text': strings[paragraphs[paragraph * 2 + 1]],
+                                                               'Sentences': {self._tables['Sentences'][index * 2]: self._sentence(index, strings.__getitem__) for index in range(starts[paragraph], starts[paragraph + 1])}}
+
+        return output
+
+
+def loadAnnotated(path, lazy = False):
+    '''
+    Load annotated text from a file created by `saveAnnotated()`. `generateConllu()` output of the loaded annotation is identical to that of the saved one.
+
+    [ARGUMENTS]:
+    - `path` (str) : OS path to the file.
+    - `lazy` (bool) OPTIONAL : Loading mode.
+      [VALUE OPTIONS]:
+        - False DEFAULT : The whole annotated text is read.
+        - True : An `AnnotatedCorpus` object is returned, which reads sentences from the memory-mapped file on request.
+
+    [RETURNS]:
+    - `output` (dict) : Annotated text in the same structure as `annotateText()` output with `toConllu == True`.
+    OR
+    - `corpus` (AnnotatedCorpus) : Returned if `lazy == True`.
+    OR
+    - `message` (str) : Error message.
+    '''
+    if not isinstance(path, str) or not os.path.isfile(path): return 'Invalid file path.'
+
+    try: corpus = AnnotatedCorpus(path)
+    except ValueError: return 'Invalid file format.'
+    if lazy == True: return corpus
+
+    with corpus: return corpus.annotation()
+
+
+
+# ANALYZER
+
+def _analyzerMethod(function):
+    '''
+    Turn a module function into an `Analyzer` method that runs with the settings, connections and token cache of the analyzer.
+
+    [USAGE]:
+    This function is used to define `Analyzer` methods and is not intended for stand-alone use.
+    '''
+    @functools.wraps(function)
+    def method(self, *args, **kwargs):
+        token = _activeAnalyzer.set(self)
+        try: return function(*args, **kwargs)
+        finally: _activeAnalyzer.reset(token)
+    return method
+
+
+class Analyzer:
+    '''
+    An immutable set of search and annotation settings with its own database connections and token cache. 
+    Its methods have the same arguments and output as the module functions of the same name, but use the settings of the analyzer instead of `defaults`,
+    so analyzers with different databases or stop words can be used at the same time and from many threads. The settings can't be changed; create a new analyzer instead.
+    Module functions keep using `defaults`, the module-level token cache (see `setCacheSize()`) and connections.
+
+    [ARGUMENTS]:
+    - `databaseFile` (str) OPTIONAL : Database file path. If not specified, the current `defaults['databaseFile']` value is used.
+    - `stopWords` (NoneType, tuple, str, bool) OPTIONAL : Stop-word list source.
+      [VALUE OPTIONS]:
+        - `None` DEFAULT : The current default stop words.
+        - IDs (tuple) : Lemma IDs in integer format.
+        - File path (str) : OS path to a TXT file with comma-separated lemma IDs.
+        - `False` : No stop words.
+    - `cacheSize` (int) OPTIONAL : The maximum number of token annotations in the analyzer's cache, `0` (default) disables the cache.
+
+    [RAISES]:
+    - `ValueError` : The database file or the stop-word file does not exist, or an argument has an unsupported format.
+
+    [USAGE]:
+        analyzer = Analyzer(stopWords = False, cacheSize = 10000)
+        analyzer.annotateText('Добры дзень!')
+        analyzer.config['stopWords']['List']
+    '''
+    __slots__ = ('_state',)
+
+    def __init__(self, databaseFile = None, stopWords = None, cacheSize = 0):
+        databaseFile = os.path.abspath(databaseFile) if databaseFile else defaults.get('databaseFile')
+        if not databaseFile or not os.path.exists(databaseFile): raise ValueError(f'Invalid database file path: {databaseFile}')
+
+        # stop words
+        if stopWords is None: lemIDlist = defaults['stopWords']['List']
+        elif stopWords is False: lemIDlist = []
+        elif isinstance(stopWords, str):
+            if not os.path.exists(stopWords): raise ValueError(f'Invalid stop-word file path: {stopWords}')
+            with open(stopWords, 'r', encoding = 'utf-8') as file: lemIDlist = [int(lemID.strip()) for lemID in file.read().split(',') if lemID.strip().isdigit()]
+        elif isinstance(stopWords, (tuple, list, set, frozenset)): lemIDlist = [lemID for lemID in stopWords if isinstance(lemID, int)]
+        else: raise ValueError('Unsupported stop-word list format.')
+        lemIDlist = tuple(sorted(set(lemIDlist)))
+
+        if not isinstance(cacheSize, int) or cacheSize < 0: raise ValueError('Invalid cache size.')
+
+        # is there a precomputed CoNLL-U table? (see `buildConlluTable()`)
+        conlluTable = False
+        try:
+            connection = sqlite3.connect(databaseFile)
+            conlluTable = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'Conllu'").fetchone() is not None
+            connection.close()
+        except sqlite3.Error: pass
+
+        config = types.MappingProxyType({'databaseFile': databaseFile,
+                                         'stopWords': types.MappingProxyType({'List': lemIDlist, 'String': ', '.join([str(lemID) for lemID in lemIDlist])}),
+                                         'conlluTable': conlluTable})
+        object.__setattr__(self, '_state', {'Config': config, 'Connections': threading.local(), 'Cache': {'Cache': OrderedDict(), 'Accents': OrderedDict(), 'Size': cacheSize, 'Lock': threading.Lock()}})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Analyzer settings can not be changed, create a new analyzer instead.')
+
+    def __delattr__(self, name):
+        raise AttributeError('Analyzer settings can not be changed, create a new analyzer instead.')
+
+    def __repr__(self):
+        return f'Analyzer(databaseFile = {self.config['databaseFile']!r}, stopWords = {len(self.config['stopWords']['List'])} lemmas, cacheSize = {self._state['Cache']['Size']})'
+
+    @property
+    def config(self):
+        '''
+        Read-only settings: `databaseFile`, `stopWords` (`List` and `String`, see `defaults`) and `conlluTable`.
+        '''
+        return self._state['Config']
+
+    def clearCache(self):
+        '''
+        Remove all annotations from the analyzer's token cache.
+
+        [RETURNS]:
+        - `message` (str) : Confirmation message.
+        '''
+        with self._state['Cache']['Lock']:
+            self._state['Cache']['Cache'].clear()
+            self._state['Cache']['Accents'].clear()
+
+        return 'The token cache was cleared.'
+
+    formSearch = _analyzerMethod(formSearch)
+    formSearchMany = _analyzerMethod(formSearchMany)
+    formFacets = _analyzerMethod(formFacets)
+    formByID = _analyzerMethod(formByID)
+    lemmaSearch = _analyzerMethod(lemmaSearch)
+    lemmaFacets = _analyzerMethod(lemmaFacets)
+    lemmaByID = _analyzerMethod(lemmaByID)
+    allForms = _analyzerMethod(allForms)
+    allFormsMany = _analyzerMethod(allFormsMany)
+    inflect = _analyzerMethod(inflect)
+    inflectMany = _analyzerMethod(inflectMany)
+    annotateToken = _analyzerMethod(annotateToken)
+    annotateTokens = _analyzerMethod(annotateTokens)
+    annotateSentence = _analyzerMethod(annotateSentence)
+    annotateSentences = _analyzerMethod(annotateSentences)
+    annotateText = _analyzerMethod(annotateText)
+    annotateFile = _analyzerMethod(annotateFile)
+    annotateToArrays = _analyzerMethod(annotateToArrays)
+    iterLemmas = _analyzerMethod(iterLemmas)
+    lemmatize = _analyzerMethod(lemmatize)
+    accentuateText = _analyzerMethod(accentuateText)
+    completeConllu = _analyzerMethod(completeConllu)
+    warmup = _analyzerMethod(warmup)
+    saveCache = _analyzerMethod(saveCache)
+    loadCache = _analyzerMethod(loadCache)
+
+
 # STARTUP
+# copy the database into memory and enable the token cache if set in `config.ini`
+if defaults['memoryDatabase'] == True: loadMemoryDatabase()
+if defaults['tokenCacheSize']: setCacheSize(defaults['tokenCacheSize'])
+
+# enable the slow-query log if a threshold is set in `config.ini`
+if defaults['slowQueryThreshold'] is not None: setSlowQueryLog(defaults['slowQueryThreshold'], defaults['slowQueryFile'])
+
+# load the form filter snapshot, or build and save it, if the filter is enabled in `config.ini`
+if defaults['formFilter'] == True and 'databaseFile' in defaults:
+    if loadFormFilter().startswith('The form filter was not loaded'):
+        if isinstance(buildFormFilter(), str): saveFormFilter()
+
 if __name__ == 'slounik' or __name__ == 'main':
     print(f'+ Imported `slounik`\n Working directory: {os.getcwd()}')
\ No newline at end of file
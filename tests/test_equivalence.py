@@ -0,0 +1,106 @@
+'''
+Equivalence tests for `slounik` on the synthetic fixture dictionary and corpus of the benchmark suite (see `benchmarks/fixture.py`).
+
+Bulk, streaming and incremental functions have to return the same output as the plain functions they replace; these tests compare them on the same fixture.
+
+Usage:
+    python -m unittest discover tests
+'''
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import slounik
+import fixture
+
+
+class EquivalenceTest(unittest.TestCase):
+    '''
+    Compare outputs on a small fixture dictionary with the module settings pointing to it.
+    '''
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.databasePath = os.path.join(cls.directory.name, 'dictionary.db')
+        dictionary = fixture.buildDictionary(cls.databasePath, lemmas = 2000, seed = 0)
+        cls.vocabulary = dictionary['Vocabulary']
+        cls.text = fixture.buildCorpus(cls.vocabulary, paragraphs = 30, seed = 0)
+
+        cls.defaults = {key: slounik.defaults.get(key) for key in ('databaseFile', 'conlluTable')}
+        slounik.defaults['databaseFile'] = cls.databasePath
+        slounik.defaults['conlluTable'] = False
+        slounik.dropFormFilter()
+        slounik.setCacheSize(0)
+
+    @classmethod
+    def tearDownClass(cls):
+        slounik.dropLexicon()
+        for key, value in cls.defaults.items():
+            if value is None: slounik.defaults.pop(key, None)
+            else: slounik.defaults[key] = value
+        cls.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def testAnnotatedRoundTrip(self):
+        annotation = slounik.annotateText(self.text, True)
+        path = self.path('corpus.slan')
+        slounik.saveAnnotated(annotation, path)
+
+        self.assertEqual(slounik.loadAnnotated(path), annotation)
+        with slounik.loadAnnotated(path, lazy = True) as corpus:
+            self.assertEqual(corpus.annotation(), annotation)
+            sentences = [(paragraphID, sentenceID, sentence) for paragraphID, paragraph in annotation['Paragraphs'].items() for sentenceID, sentence in paragraph['Sentences'].items()]
+            self.assertEqual([corpus.sentence(index) for index in range(len(corpus))], sentences)
+        self.assertEqual(slounik.generateConllu(slounik.loadAnnotated(path)), slounik.generateConllu(annotation))
+
+    def testIncrementalAnnotator(self):
+        paragraphs = self.text.split('\n')
+        # unchanged, edited, moved and duplicated paragraphs
+        edits = ('\n'.join(paragraphs),
+                 '\n'.join(paragraphs[:5] + ['Новы абзац, Google.'] + paragraphs[5:]),
+                 '\n'.join(paragraphs[10:] + paragraphs[:10] + paragraphs[:2]),
+                 '')
+        for toConllu in (False, True):
+            annotator = slounik.IncrementalAnnotator(toConllu)
+            for text in edits: self.assertEqual(annotator.update(text), slounik.annotateText(text, toConllu))
+
+    def testAnnotateFile(self):
+        path = self.path('corpus.txt')
+        with open(path, 'w', encoding = 'utf-8', newline = '') as file: file.write(self.text)
+
+        for toConllu in (False, True):
+            self.assertEqual(dict(slounik.annotateFile(path, toConllu = toConllu)), slounik.annotateText(self.text, toConllu)['Paragraphs'])
+
+        outputPath = self.path('corpus.conllu')
+        slounik.annotateFile(path, outputPath)
+        with open(outputPath, encoding = 'utf-8', newline = '') as file: self.assertEqual(file.read(), slounik.generateConllu(slounik.annotateText(self.text, True)))
+
+    def testFormSearchMany(self):
+        words = sorted(self.vocabulary)[::50]
+        queries = words + [word.upper() for word in words[:5]] + ['ба*', '*ам', 'б?л*', '[бв]а*', 'xyz']
+        for keepLetterCase in (False, True):
+            for fastMode in (False, True):
+                output = slounik.formSearchMany(queries, keepLetterCase, fastMode)
+                self.assertEqual(output, {query: slounik.formSearch(query, keepLetterCase, fastMode) for query in queries})
+        self.assertEqual(slounik.formSearchMany(words, POS = 'NOUN', Case = 'Gen'), {query: slounik.formSearch(query, POS = 'NOUN', Case = 'Gen') for query in words})
+
+    def testSharedLexicon(self):
+        expected = [slounik.annotateText(self.text, toConllu) for toConllu in (False, True)]
+        analyzer = slounik.Analyzer(stopWords = (1, 2, 3, 50, 100))
+        expectedStopWords = analyzer.annotateText(self.text, True)
+
+        self.assertIsInstance(slounik.shareLexicon(), str)
+        try:
+            self.assertEqual([slounik.annotateText(self.text, toConllu) for toConllu in (False, True)], expected)
+            self.assertEqual(analyzer.annotateText(self.text, True), expectedStopWords)
+        finally:
+            slounik.dropLexicon()
+
+
+if __name__ == '__main__':
+    unittest.main()